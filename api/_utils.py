@@ -4,19 +4,38 @@ Shared utilities for Vercel serverless functions
 import sys
 import os
 import json
+import time
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.depression_calculator import DepressionCalculator
+from src.snapshot import SnapshotStore
+from src.static_artifacts import DEFAULT_OUT_DIR, ArtifactReader
+from src.dashboard_service import DashboardService
+from src.config_watcher import watch_config
+from src.metrics import REQUEST_DURATION
+from src.log import get_logger
 
-def get_calculator():
-    """Get calculator instance (creates new one each time since serverless is stateless)"""
+logger = get_logger("vercel")
+
+# Warm containers keep module globals between invocations, so the resolved
+# config path and the current snapshot (parsed config + computed payloads)
+# are reused until teams_config.json (or its event log) changes
+_config_path = None
+_store = None
+_watcher = None
+
+def resolve_config_path():
+    """Find teams_config.json (resolved once per container)"""
+    global _config_path
+    if _config_path is not None:
+        return _config_path
+    
     # In Vercel, includeFiles copies files to the function's directory
     # The function runs from /var/task/ (or similar), and includeFiles puts files at the project root
     # So from api/_utils.py, we need to go up two levels to get to the project root
-    
-    # Calculate base paths
     current_file = os.path.abspath(__file__)  # /var/task/api/_utils.py (or similar)
     api_dir = os.path.dirname(current_file)   # /var/task/api
     project_root = os.path.dirname(api_dir)    # /var/task
@@ -26,45 +45,99 @@ def get_calculator():
         # Primary: project root (where includeFiles puts it)
         os.path.join(project_root, "teams_config.json"),
         # Fallback: relative to current working directory
-        "teams_config.json",
+        os.path.abspath("teams_config.json"),
         # Fallback: relative to api directory (unlikely but try)
         os.path.join(api_dir, "teams_config.json"),
     ]
     
-    config_path = None
     for path in possible_paths:
         if os.path.exists(path):
-            config_path = path
-            print(f"✅ Found teams_config.json at: {config_path}")
-            break
+            logger.info("✅ Found teams_config.json at: %s", path)
+            _config_path = path
+            return _config_path
     
-    if not config_path:
-        # If none found, use the primary path and let DepressionCalculator handle the error
-        # But log helpful debugging info
-        config_path = possible_paths[0]
-        print(f"⚠️ teams_config.json not found. Tried paths:")
-        for path in possible_paths:
-            print(f"  - {path} (exists: {os.path.exists(path)})")
-        print(f"Current __file__: {current_file}")
-        print(f"Current working directory: {os.getcwd()}")
-        try:
-            if os.path.exists(project_root):
-                print(f"Project root contents: {os.listdir(project_root)[:10]}")
-        except:
-            pass
+    # If none found, use the primary path and let DepressionCalculator handle the error
+    # (not cached, so the next invocation looks again). Log helpful debugging info
+    # (rate-limited, since every invocation ends up here until the file appears)
+    try:
+        root_contents = os.listdir(project_root)[:10] if os.path.exists(project_root) else None
+    except OSError:
+        root_contents = None
+    logger.warning("⚠️ teams_config.json not found. Tried paths: %s; __file__: %s; working directory: %s; "
+                   "project root contents: %s", ", ".join(possible_paths), current_file, os.getcwd(), root_contents)
+    return possible_paths[0]
+
+def _rebuild(paths):
+    logger.info("🔄 Detected change in %s, rebuilding calculator", ', '.join(os.path.basename(p) for p in paths))
+    _store.rebuild()
+
+def get_snapshot():
+    """Get the current snapshot, rebuilding only when a watched file changes"""
+    global _store, _watcher
+    config_path = resolve_config_path()
+    if _store is None or _store.config_path != config_path:
+        _store = SnapshotStore(config_path)
+        # The backend's watcher, checked on each invocation instead of from a thread
+        _watcher = watch_config(config_path, _rebuild)
+    _watcher.check()
+    return _store.get()
+
+def get_calculator():
+    """Get the calculator of the current snapshot (shared across warm invocations, treat as read-only)"""
+    return get_snapshot().calculator
+
+_service = None
+_service_config_path = None
+
+def get_service():
+    """DashboardService shared by all routes in this container"""
+    global _service, _service_config_path
+    config_path = resolve_config_path()
+    if _service is None or _service_config_path != config_path:
+        # Pre-built artifacts (scripts/build_static_artifacts.py) are preferred while they match the config
+        artifacts = ArtifactReader(os.path.join(os.path.dirname(config_path), DEFAULT_OUT_DIR), config_path)
+        _service = DashboardService(get_snapshot, artifacts=artifacts)
+        _service_config_path = config_path
+    return _service
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type'
+}
+
+def make_handler(route):
+    """Build the Vercel handler class for a read-only route of DashboardService"""
     
-    return DepressionCalculator(config_path)
+    class RouteHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            """Handle GET request"""
+            started = time.perf_counter()
+            query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            result = get_service().handle(route, query, self.headers)
+            self.send_response(result.status)
+            for key, value in dict(result.headers, **CORS_HEADERS).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(result.body)
+            REQUEST_DURATION.observe(time.perf_counter() - started, route=f"/api/{route}",
+                                     method="GET", status=result.status)
+        
+        def do_OPTIONS(self):
+            """Handle CORS preflight"""
+            self.send_response(200)
+            for key, value in CORS_HEADERS.items():
+                self.send_header(key, value)
+            self.end_headers()
+    
+    RouteHandler.__name__ = RouteHandler.__qualname__ = 'handler'
+    return RouteHandler
 
 def json_response(data, status_code=200):
     """Create JSON response for Vercel"""
     return {
         'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type'
-        },
+        'headers': dict({'Content-Type': 'application/json', 'Cache-Control': 'no-store'}, **CORS_HEADERS),
         'body': json.dumps(data)
     }
 
@@ -77,8 +150,3 @@ def error_response(error, status_code=500, details=None):
     if details:
         data['details'] = details
     return json_response(data, status_code)
-
-
-
-
-
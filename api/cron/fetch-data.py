@@ -1,6 +1,8 @@
 """
-Vercel Cron job to fetch sports data every 6 hours
-This updates teams_config.json via GitHub API
+Vercel Cron job to fetch sports data
+Each trigger fetches as many sources as fit in CRON_BUDGET_SECONDS and checkpoints
+its cursor, so a slow upstream can't push the function past its execution limit;
+the next trigger resumes where this one stopped
 """
 from http.server import BaseHTTPRequestHandler
 import sys
@@ -10,6 +12,11 @@ from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from src.sports_api import SportsDataFetcher
+from src.checkpoint_store import CheckpointStore
+from src.incremental_fetch import run_incremental_fetch
+
+# Leave headroom under the platform limit (10s on the Hobby plan) for startup and the response
+CRON_BUDGET_SECONDS = float(os.environ.get('CRON_BUDGET_SECONDS', 7))
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -21,14 +28,13 @@ class handler(BaseHTTPRequestHandler):
                 "teams_config.json"
             )
             
-            # Fetch data
-            fetcher = SportsDataFetcher()
-            fetcher.update_config_file(config_path)
-            
-            # Note: In Vercel, we can't directly commit to git
-            # The config file will be updated in the deployment
-            # For persistent updates, you'd need to use GitHub API to commit
-            # or use Vercel KV/Environment variables
+            # Results and the cursor are checkpointed after every source; the
+            # config file is also updated where the filesystem is writable
+            store = CheckpointStore()
+            try:
+                summary = run_incremental_fetch(SportsDataFetcher(), config_path, store, CRON_BUDGET_SECONDS)
+            finally:
+                store.close()
             
             response = {
                 'statusCode': 200,
@@ -37,9 +43,9 @@ class handler(BaseHTTPRequestHandler):
                 },
                 'body': json.dumps({
                     "success": True,
-                    "message": "Data fetched successfully",
-                    "timestamp": datetime.now().isoformat(),
-                    "note": "Config updated. Changes will persist in next deployment."
+                    "message": "Fetch run finished" if summary["finished"] else "Fetch run paused, resuming on next trigger",
+                    "run": summary,
+                    "timestamp": datetime.now().isoformat()
                 })
             }
             
@@ -68,8 +74,3 @@ class handler(BaseHTTPRequestHandler):
                 self.send_header(key, value)
             self.end_headers()
             self.wfile.write(error_response['body'].encode())
-
-
-
-
-
@@ -0,0 +1,11 @@
+"""
+Vercel serverless function for /api/dashboard
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _utils import make_handler
+
+# Shared with the Flask backend via src/dashboard_service.py
+handler = make_handler("dashboard")
@@ -0,0 +1,27 @@
+"""
+Vercel serverless function for /api/metrics
+"""
+from http.server import BaseHTTPRequestHandler
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _utils import CORS_HEADERS
+from src.metrics import CONTENT_TYPE, render
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        """Prometheus metrics for this container (each warm instance keeps its own counters)"""
+        body = render().encode('utf-8')
+        self.send_response(200)
+        for key, value in dict({'Content-Type': CONTENT_TYPE, 'Cache-Control': 'no-store'}, **CORS_HEADERS).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_OPTIONS(self):
+        """Handle CORS preflight"""
+        self.send_response(200)
+        for key, value in CORS_HEADERS.items():
+            self.send_header(key, value)
+        self.end_headers()
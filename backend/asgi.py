@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+ASGI entry point for the backend
+/api/stream subscribers wait on the event loop; every other route runs the Flask app on WEB_THREADS threads
+"""
+
+import os
+
+try:
+    from .app import STREAM_BUSY_RETRY, app as flask_app, broker, stream_hello
+except ImportError:
+    # Started from backend/ (start.sh)
+    from app import STREAM_BUSY_RETRY, app as flask_app, broker, stream_hello
+
+from src.asgi import make_asgi_app
+
+app = make_asgi_app(flask_app, broker, stream_hello,
+                    threads=int(os.environ.get('WEB_THREADS', 8)),
+                    busy_retry=STREAM_BUSY_RETRY)
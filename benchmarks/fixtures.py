@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark fixtures
+Synthetic configs and a synthetic upstream archive (ESPN team/schedule, OpenF1
+sessions/results) so the benchmarks never need the network
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Dict
+
+from src.upstream import PayloadArchive
+
+ESPN_BASE = "https://site.api.espn.com/apis/site/v2/sports"
+OPENF1_BASE = "https://api.openf1.org/v1"
+
+# (sport path, ESPN team id) for every team SportsDataFetcher.SOURCES asks about
+ESPN_TEAMS = [
+    ("football/nfl", 6),
+    ("basketball/nba", 6),
+    ("basketball/nba", 9),
+    ("baseball/mlb", 13),
+    ("basketball/mens-college-basketball", 153),
+    ("football/college-football", 153),
+]
+
+SPORTS = ["NFL", "NBA", "MLB", "NCAA Basketball", "NCAA Football"]
+LOCATIONS = ["home", "away"]
+
+
+def synthetic_config(num_teams: int, history: int, seed: int = 7) -> Dict:
+    """teams_config.json with num_teams teams, each with history recent games"""
+    rng = random.Random(seed)
+    teams = []
+    for i in range(num_teams):
+        streak = [rng.choice("WWLLT" if i % 5 == 0 else "WL") for _ in range(history)]
+        margins = [rng.randint(1, 30) * (1 if r == "W" else -1 if r == "L" else 0) for r in streak]
+        teams.append({
+            "name": f"Team {i:05d}",
+            "sport": SPORTS[i % len(SPORTS)],
+            "record": {"wins": rng.randint(0, 60), "losses": rng.randint(0, 60), "ties": 0},
+            "expected_performance": rng.randint(1, 10),
+            "jasons_expectations": rng.randint(1, 10),
+            "rivals": [f"Team {(i + k) % num_teams:05d}" for k in (1, 2, 3)],
+            "recent_rivalry_losses": [f"Team {(i + 1) % num_teams:05d}"] if i % 3 == 0 else [],
+            "recent_streak": streak,
+            "recent_opponents": [f"Team {rng.randrange(num_teams):05d}" for _ in streak],
+            "recent_opponent_records": [{"wins": rng.randint(0, 60), "losses": rng.randint(0, 60)} for _ in streak],
+            "recent_game_locations": [rng.choice(LOCATIONS) for _ in streak],
+            "recent_score_margins": margins,
+            "recent_overtime_games": [rng.random() < 0.1 for _ in streak],
+            "recent_comeback_wins": [r == "W" and rng.random() < 0.1 for r in streak],
+            "recent_comeback_losses": [r == "L" and rng.random() < 0.1 for r in streak],
+            "recent_blowout_losses": [m <= -20 for m in margins],
+            "recent_blowout_wins": [m >= 20 for m in margins],
+            "season_progress": rng.random(),
+            "interest_level": rng.choice([0.5, 1.0]),
+        })
+    return {
+        "teams": teams,
+        "f1_driver": {
+            "name": "Max Verstappen", "sport": "F1", "championship_position": 3,
+            "expected_performance": 10, "jasons_expectations": 10,
+            "recent_races": ["1", "DNF", "4", "2", "1"][:max(1, min(history, 5))], "recent_dnfs": 1,
+            "rivals": ["Lando Norris"],
+        },
+        "fantasy_team": {
+            "name": "Jason's Fantasy Squad", "record": {"wins": 5, "losses": 4},
+            "expected_performance": 7, "jasons_expectations": 8, "recent_streak": ["W", "L", "W"],
+        },
+    }
+
+
+def _team_payload(wins: int, losses: int) -> Dict:
+    stats = [{"name": "wins", "value": wins}, {"name": "losses", "value": losses}, {"name": "ties", "value": 0}]
+    return {"team": {"record": {"items": [{"type": "total", "stats": stats}]}}}
+
+
+def _schedule_payload(team_id: int, games: int, rng: random.Random) -> Dict:
+    events = []
+    start = datetime.now() - timedelta(days=7 * games)
+    for g in range(games):
+        us, them = rng.randint(70, 130), rng.randint(70, 130)
+        home = g % 2 == 0
+        events.append({
+            "id": f"{team_id}{g:04d}",
+            "date": (start + timedelta(days=7 * g)).strftime("%Y-%m-%dT%H:%MZ"),
+            "competitions": [{
+                "status": {"type": {"name": "STATUS_FINAL", "completed": True}},
+                "competitors": [
+                    {"team": {"id": str(team_id), "displayName": "Us"}, "homeAway": "home" if home else "away",
+                     "score": {"value": us}, "winner": us > them},
+                    {"team": {"id": "999", "displayName": f"Opponent {g % 12}"},
+                     "homeAway": "away" if home else "home", "score": {"value": them}, "winner": them > us},
+                ],
+            }],
+        })
+    return {"events": events}
+
+
+def build_upstream_archive(root: str, schedule_games: int = 80, races: int = 10, seed: int = 7) -> PayloadArchive:
+    """Archive holding one run with every response a full fetch asks for"""
+    rng = random.Random(seed)
+    archive = PayloadArchive(root)
+    run_id = "synthetic"
+    archive.start_run(run_id, 0)
+
+    def put(url: str, payload):
+        archive.record(run_id, url, 200, "application/json", json.dumps(payload).encode("utf-8"))
+
+    for sport, team_id in ESPN_TEAMS:
+        put(f"{ESPN_BASE}/{sport}/teams/{team_id}", _team_payload(rng.randint(0, 60), rng.randint(0, 60)))
+        put(f"{ESPN_BASE}/{sport}/teams/{team_id}/schedule", _schedule_payload(team_id, schedule_games, rng))
+
+    # OpenF1 uses the same "current season" rule as F1API
+    year = datetime.now().year - (1 if datetime.now().month < 3 else 0)
+    sessions = []
+    for r in range(races):
+        key = 9000 + r
+        day = datetime(year, 3, 1) + timedelta(days=14 * r)
+        sessions.append({"session_key": key, "date_start": day.isoformat(),
+                         "date_end": (day + timedelta(hours=2)).isoformat()})
+        put(f"{OPENF1_BASE}/results?session_key={key}", [
+            {"driver_number": n, "position": p, "points": max(0, 26 - 2 * p), "status": ""}
+            for p, n in enumerate(rng.sample(range(1, 30), 20), start=1)
+        ])
+    put(f"{OPENF1_BASE}/sessions?year={year}&session_type=Race", sessions)
+    return archive
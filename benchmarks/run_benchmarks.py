@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks
+Times the fetch path (against a local fake upstream), config updates, the
+calculator on synthetic configs and every API route under concurrent load,
+then compares the results with a stored baseline
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import fnmatch
+import platform
+import statistics
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List
+
+# Add parent directory to path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from benchmarks.fixtures import build_upstream_archive, synthetic_config
+from src.fake_upstream import FakeUpstreamServer
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# A benchmark regresses when it is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.5
+
+
+def _compared_time(result: Dict) -> float:
+    """Sequential benchmarks compare their fastest run (least affected by machine noise),
+    concurrent ones their median latency"""
+    return result.get("min_s", result["median_s"])
+
+# Synthetic config sizes: (teams, games of history per team)
+SCALES = [(100, 20), (1000, 50), (5000, 100)]
+QUICK_SCALES = [(100, 20), (1000, 50)]
+
+ROUTES = ["depression", "teams", "recent-games", "upcoming-events", "dashboard"]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict:
+    """Time fn repeat times (after warmup calls)"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return {
+        "runs": repeat,
+        "median_s": statistics.median(samples),
+        "p95_s": _percentile(samples, 95),
+        "min_s": min(samples),
+    }
+
+
+def measure_concurrent(fn: Callable[[], object], requests: int, workers: int) -> Dict:
+    """Call fn requests times from workers threads; latency percentiles plus throughput"""
+    fn()
+
+    def timed(_):
+        started = time.perf_counter()
+        fn()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        samples = list(pool.map(timed, range(requests)))
+    wall = time.perf_counter() - started
+    return {
+        "runs": requests,
+        "workers": workers,
+        "median_s": statistics.median(samples),
+        "p95_s": _percentile(samples, 95),
+        "p99_s": _percentile(samples, 99),
+        "throughput_rps": requests / wall if wall else None,
+    }
+
+
+def write_config(directory: str, config: Dict) -> str:
+    path = os.path.join(directory, "teams_config.json")
+    with open(path, "w") as f:
+        json.dump(config, f)
+    return path
+
+
+def bench_fetch(tmp: str, quick: bool) -> Dict[str, Dict]:
+    from src.sports_api import SportsDataFetcher
+    from src.upstream import UpstreamSession
+
+    repeat = 3 if quick else 10
+    results = {}
+    config_path = write_config(tmp, synthetic_config(20, 10))
+    with FakeUpstreamServer(build_upstream_archive(os.path.join(tmp, "archive")), latency=0.002) as server:
+        def fetcher():
+            return SportsDataFetcher(session=UpstreamSession(base_url=server.url))
+
+        results["fetch.fetch_all_data"] = measure(lambda: fetcher().fetch_all_data(), repeat)
+        results["fetch.update_config_file"] = measure(lambda: fetcher().update_config_file(config_path), repeat)
+    return results
+
+
+def bench_calculator(tmp: str, quick: bool) -> Dict[str, Dict]:
+    from src.depression_calculator import DepressionCalculator
+
+    results = {}
+    for teams, history in (QUICK_SCALES if quick else SCALES):
+        directory = os.path.join(tmp, f"calc-{teams}")
+        os.makedirs(directory)
+        config_path = write_config(directory, synthetic_config(teams, history))
+        # Small configs are cheap but noisy; time them more often
+        repeat = 20 if teams <= 100 else 3 if quick or teams >= 5000 else 5
+        label = f"[teams={teams},history={history}]"
+        results[f"calculator.construct{label}"] = measure(
+            lambda: DepressionCalculator(config_path, use_espn_api=False), repeat)
+        calc = DepressionCalculator(config_path, use_espn_api=False)
+        results[f"calculator.total_depression{label}"] = measure(calc.calculate_total_depression, repeat)
+    return results
+
+
+def bench_endpoints(tmp: str, quick: bool) -> Dict[str, Dict]:
+    from src.snapshot import SnapshotStore
+    from src.dashboard_service import DashboardService
+
+    directory = os.path.join(tmp, "endpoints")
+    os.makedirs(directory)
+    store = SnapshotStore(write_config(directory, synthetic_config(100, 20)), use_espn_api=False)
+    service = DashboardService(store.get)
+    requests, workers = (200, 8) if quick else (2000, 16)
+    headers = {"Accept-Encoding": "gzip"}
+    results = {}
+    for route in ROUTES:
+        results[f"endpoint.{route}"] = measure_concurrent(
+            lambda: service.handle(route, {}, headers), requests, workers)
+    return results
+
+
+SUITES = {
+    "fetch": bench_fetch,
+    "calculator": bench_calculator,
+    "endpoints": bench_endpoints,
+}
+
+
+def compare(results: Dict[str, Dict], baseline: Dict) -> List[str]:
+    """Benchmarks that regressed past their threshold"""
+    thresholds = baseline.get("thresholds", {})
+    default = baseline.get("default_threshold", DEFAULT_THRESHOLD)
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        # Thresholds are keyed by benchmark name or a glob ("endpoint.*")
+        threshold = next((t for pattern, t in thresholds.items() if fnmatch.fnmatchcase(name, pattern)), default)
+        current, previous = _compared_time(result), _compared_time(base)
+        limit = previous * (1 + threshold)
+        if current > limit:
+            regressions.append(f"{name}: {current * 1000:.2f}ms > {limit * 1000:.2f}ms "
+                               f"(baseline {previous * 1000:.2f}ms)")
+    return regressions
+
+
+def main():
+    """Run the benchmark suites and check them against the baseline"""
+    parser = argparse.ArgumentParser(description="Run performance benchmarks")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="Only run this suite (repeatable)")
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs and fewer runs")
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Save these results as the new baseline")
+    args = parser.parse_args()
+
+    # Anything that builds its own fetcher (e.g. live snapshot sections) must stay offline
+    os.environ.setdefault("UPSTREAM_BASE_URL", "http://127.0.0.1:9")
+
+    tmp = tempfile.mkdtemp(prefix="dashboard-bench-")
+    results = {}
+    try:
+        for name in args.suite or sorted(SUITES):
+            print(f"⏱️  Running {name} benchmarks...", file=sys.stderr)
+            results.update(SUITES[name](tmp, args.quick))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "results": results,
+    }
+    for name, result in sorted(results.items()):
+        extra = f"  {result['throughput_rps']:.0f} req/s" if result.get("throughput_rps") else ""
+        print(f"  {name:<60} median {result['median_s'] * 1000:9.2f}ms  "
+              f"p95 {result['p95_s'] * 1000:9.2f}ms{extra}", file=sys.stderr)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                previous = json.load(f)
+        baseline = {
+            "default_threshold": previous.get("default_threshold", DEFAULT_THRESHOLD),
+            "thresholds": previous.get("thresholds", {}),
+            "generated_at": report["generated_at"],
+            "platform": report["platform"],
+            "results": dict(previous.get("results", {}), **{
+                name: {key: round(r[key], 6) for key in ("median_s", "min_s") if key in r}
+                for name, r in results.items()}),
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"✅ Baseline updated: {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️  No baseline to compare against (run with --update-baseline)", file=sys.stderr)
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f))
+    if regressions:
+        print("❌ Performance regressions:", file=sys.stderr)
+        for line in regressions:
+            print(f"   {line}", file=sys.stderr)
+        return 1
+    print("✅ No regressions against the baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-import { useState, useEffect, useMemo } from 'react';
+import { useState, useEffect, useMemo, useRef } from 'react';
 import { Analytics } from '@vercel/analytics/react';
 import Header from './components/Header';
 import DepressionScoreCard from './components/DepressionScoreCard';
@@ -7,7 +7,7 @@ import GameTimeline from './components/GameTimeline';
 import DepressionBreakdown from './components/DepressionBreakdown';
 import UpcomingEvents from './components/UpcomingEvents';
 import ErrorFallback from './components/ErrorFallback';
-import { fetchDepression, fetchTeams, fetchRecentGames, fetchUpcomingEvents } from './api';
+import { fetchDashboard, subscribeToUpdates } from './api';
 import type { DepressionData, TeamsData, RecentGamesData, UpcomingEventsData } from './types';
 import { LoadingIcon } from './utils/icons';
 
@@ -18,23 +18,21 @@ function App() {
   const [upcomingEventsData, setUpcomingEventsData] = useState<UpcomingEventsData | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const loadedVersion = useRef<number | null>(null);
 
-  const loadData = async () => {
+  const loadData = async (version?: number) => {
     try {
       setLoading(true);
       setError(null);
       
-      const [depression, teams, games, upcoming] = await Promise.all([
-        fetchDepression(),
-        fetchTeams(),
-        fetchRecentGames(),
-        fetchUpcomingEvents(),
-      ]);
+      // One request, one consistent snapshot for all four sections
+      const dashboard = await fetchDashboard(undefined, version);
+      loadedVersion.current = dashboard.version;
       
-      setDepressionData(depression);
-      setTeamsData(teams);
-      setGamesData(games);
-      setUpcomingEventsData(upcoming);
+      setDepressionData(dashboard.depression ?? null);
+      setTeamsData(dashboard.teams ?? null);
+      setGamesData(dashboard.recent_games ?? null);
+      setUpcomingEventsData(dashboard.upcoming_events ?? null);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to load data');
       console.error('Error loading data:', err);
@@ -46,10 +44,26 @@ function App() {
   useEffect(() => {
     loadData();
     
-    // Auto-refresh every 60 seconds
-    const interval = setInterval(loadData, 60000);
+    // Reload (keyed to the new version, past any cached copy) when the backend
+    // pushes a new snapshot; poll every 60 seconds only while the update
+    // stream is unavailable
+    let interval: ReturnType<typeof setInterval> | null = null;
+    const onSnapshot = (version: number) => {
+      if (version !== loadedVersion.current) loadData(version);
+    };
+    const unsubscribe = subscribeToUpdates(onSnapshot, (connected) => {
+      if (connected && interval) {
+        clearInterval(interval);
+        interval = null;
+      } else if (!connected && !interval) {
+        interval = setInterval(() => loadData(), 60000);
+      }
+    });
     
-    return () => clearInterval(interval);
+    return () => {
+      unsubscribe();
+      if (interval) clearInterval(interval);
+    };
   }, []);
 
   const teamKey = (name: string, sport: string) =>
@@ -125,7 +139,7 @@ function App() {
   }
 
   if (error && !depressionData) {
-    return <ErrorFallback error={error} onRetry={loadData} />;
+    return <ErrorFallback error={error} onRetry={() => loadData()} />;
   }
 
   return (
@@ -133,7 +147,7 @@ function App() {
       <div className="max-w-7xl mx-auto px-3 sm:px-4 py-4 sm:py-8">
         <Header
           lastUpdated={depressionData?.timestamp || null}
-          onRefresh={loadData}
+          onRefresh={() => loadData()}
         />
 
         {/* Hero Depression Score Card */}
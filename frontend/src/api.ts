@@ -1,10 +1,72 @@
-import type { DepressionData, TeamsData, RecentGamesData, UpcomingEventsData } from './types';
+import type {
+  DepressionData,
+  TeamsData,
+  RecentGamesData,
+  UpcomingEventsData,
+  DashboardData,
+  DashboardSection,
+} from './types';
 
 // API base URL - points to Railway backend
 // Set VITE_API_URL environment variable in Vercel to your Railway backend URL
 // Example: https://depression-dashboard-production.up.railway.app
 const API_BASE = import.meta.env.VITE_API_URL || 'https://depression-dashboard-production.up.railway.app';
 
+// Fetch several sections in one request, all from the same backend snapshot.
+// Passing the snapshot version announced on /api/stream keys the request to it,
+// so a cached copy of an older snapshot is never returned.
+export async function fetchDashboard(sections?: DashboardSection[], version?: number): Promise<DashboardData> {
+  const params: string[] = [];
+  if (sections && sections.length) params.push(`sections=${sections.join(',')}`);
+  if (version !== undefined) params.push(`v=${version}`);
+  const query = params.length ? `?${params.join('&')}` : '';
+  const response = await fetch(`${API_BASE}/api/dashboard${query}`);
+  if (!response.ok) {
+    let errorMessage = `Failed to fetch dashboard data (${response.status})`;
+    if (response.status === 502) {
+      errorMessage = 'Backend server is down (502). Please check Railway deployment.';
+    } else {
+      try {
+        const errorData = await response.json();
+        if (errorData.message) {
+          errorMessage = `${errorMessage}: ${errorData.message}`;
+        }
+      } catch {
+        // Ignore JSON parse errors
+      }
+    }
+    throw new Error(errorMessage);
+  }
+  return response.json();
+}
+
+// Subscribe to backend push events (/api/stream). Calls onSnapshot with the
+// current snapshot version on connect and whenever new data is published, and
+// onConnectionChange when the stream goes up or down.
+// Returns an unsubscribe function.
+export function subscribeToUpdates(
+  onSnapshot: (version: number) => void,
+  onConnectionChange: (connected: boolean) => void,
+): () => void {
+  if (typeof EventSource === 'undefined') {
+    onConnectionChange(false);
+    return () => {};
+  }
+  const source = new EventSource(`${API_BASE}/api/stream`);
+  source.addEventListener('open', () => onConnectionChange(true));
+  source.addEventListener('error', () => onConnectionChange(false));
+  const handleVersion = (event: MessageEvent) => {
+    try {
+      onSnapshot(JSON.parse(event.data).version);
+    } catch {
+      // Ignore malformed events
+    }
+  };
+  source.addEventListener('hello', handleVersion);
+  source.addEventListener('snapshot', handleVersion);
+  return () => source.close();
+}
+
 export async function fetchDepression(): Promise<DepressionData> {
   const response = await fetch(`${API_BASE}/api/depression`);
   if (!response.ok) {
@@ -89,6 +151,17 @@ export async function fetchUpcomingEvents(): Promise<UpcomingEventsData> {
   return response.json();
 }
 
+interface RefreshJobStatus {
+  job_id: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  status_url?: string;
+  sources?: Record<string, string>;
+  error?: string | null;
+}
+
+const REFRESH_POLL_INTERVAL_MS = 1500;
+const REFRESH_MAX_WAIT_MS = 3 * 60 * 1000;
+
 export async function refreshData(): Promise<void> {
   const response = await fetch(`${API_BASE}/api/refresh`, { method: 'POST' });
   if (!response.ok) {
@@ -107,5 +180,23 @@ export async function refreshData(): Promise<void> {
     }
     throw new Error(errorMessage);
   }
-}
 
+  // The backend runs the refresh as a background job; poll until it finishes
+  let job: RefreshJobStatus = await response.json();
+  const statusUrl = `${API_BASE}${job.status_url ?? `/api/refresh/${job.job_id}`}`;
+  const startedAt = Date.now();
+  while (job.status === 'queued' || job.status === 'running') {
+    if (Date.now() - startedAt > REFRESH_MAX_WAIT_MS) {
+      throw new Error('Refresh is taking too long, please try again later');
+    }
+    await new Promise((resolve) => setTimeout(resolve, REFRESH_POLL_INTERVAL_MS));
+    const statusResponse = await fetch(statusUrl);
+    if (!statusResponse.ok) {
+      throw new Error(`Failed to check refresh status (${statusResponse.status})`);
+    }
+    job = await statusResponse.json();
+  }
+  if (job.status === 'failed') {
+    throw new Error(`Refresh failed: ${job.error ?? 'Unknown error'}`);
+  }
+}
@@ -76,3 +76,15 @@ export interface UpcomingEventsData {
   timestamp: string;
 }
 
+
+export type DashboardSection = 'depression' | 'teams' | 'recent_games' | 'upcoming_events';
+
+export interface DashboardData {
+  success: boolean;
+  version: number;
+  timestamp: string;
+  depression?: DepressionData;
+  teams?: TeamsData;
+  recent_games?: RecentGamesData;
+  upcoming_events?: UpcomingEventsData;
+}
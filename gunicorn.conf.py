@@ -0,0 +1,15 @@
+"""
+Gunicorn settings for the Flask backend
+Picked up automatically when gunicorn is started from the repository root
+"""
+import os
+
+# The app is backend/asgi.py on uvicorn workers: /api/stream subscribers
+# wait on the event loop, so an idle subscriber holds no thread. Every
+# other route runs the Flask app on WEB_THREADS threads per worker, where
+# blocking calls (SQLite, flock, requests, nba_api) are fine. With
+# WEB_WORKER_CLASS=gthread and backend.app:app each stream holds a thread.
+worker_class = os.environ.get("WEB_WORKER_CLASS", "uvicorn_worker.UvicornWorker")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("WEB_THREADS", 8))
+timeout = int(os.environ.get("WEB_TIMEOUT", 120))
@@ -3,6 +3,9 @@ import type {
   TeamsData,
   RecentGamesData,
   UpcomingEventsData,
+  DashboardData,
+  DashboardSection,
+  TeamsDelta,
 } from './types';
 
 // Base URL for the existing backend.
@@ -22,16 +25,57 @@ async function handleResponse<T>(response: Response): Promise<T> {
   return response.json() as Promise<T>;
 }
 
+// Fetch several sections in one request, all from the same backend snapshot
+export async function fetchDashboard(sections?: DashboardSection[]): Promise<DashboardData> {
+  const query = sections && sections.length ? `?sections=${sections.join(',')}` : '';
+  const res = await fetch(`${API_BASE}/api/dashboard${query}`);
+  return handleResponse<DashboardData>(res);
+}
+
 export async function fetchDepression(): Promise<DepressionData> {
   const res = await fetch(`${API_BASE}/api/depression`);
   return handleResponse<DepressionData>(res);
 }
 
-export async function fetchTeams(): Promise<TeamsData> {
-  const res = await fetch(`${API_BASE}/api/teams`);
+// Optional sparse fieldset (e.g. ['depression_points', 'record']) and float
+// rounding, so list screens only download what they render
+export async function fetchTeams(options?: { fields?: string[]; precision?: number }): Promise<TeamsData> {
+  const params: string[] = [];
+  if (options?.fields?.length) params.push(`fields=${options.fields.join(',')}`);
+  if (options?.precision !== undefined) params.push(`precision=${options.precision}`);
+  const query = params.length ? `?${params.join('&')}` : '';
+  const res = await fetch(`${API_BASE}/api/teams${query}`);
   return handleResponse<TeamsData>(res);
 }
 
+// Bring a previously fetched TeamsData up to date by downloading only the
+// teams that changed since its version (falls back to a full fetch).
+export async function syncTeams(previous?: TeamsData | null): Promise<TeamsData> {
+  if (!previous || previous.version === undefined) {
+    return fetchTeams();
+  }
+  const res = await fetch(`${API_BASE}/api/teams?since=${previous.version}`);
+  const delta = await handleResponse<TeamsDelta>(res);
+  if (delta.full) {
+    return { success: true, teams: delta.teams, version: delta.version, timestamp: delta.timestamp };
+  }
+  if (delta.teams.length === 0 && delta.removed.length === 0) {
+    return previous;
+  }
+
+  const keyOf = (team: { name: string; sport: string }) => `${team.sport}:${team.name}`;
+  const removed = new Set(delta.removed.map((r) => r.key));
+  const changed = new Map(delta.teams.map((team) => [keyOf(team), team]));
+  const teams = previous.teams
+    .filter((team) => !removed.has(keyOf(team)))
+    .map((team) => changed.get(keyOf(team)) ?? team);
+  const known = new Set(previous.teams.map(keyOf));
+  delta.teams.forEach((team) => {
+    if (!known.has(keyOf(team))) teams.push(team);
+  });
+  return { success: true, teams, version: delta.version, timestamp: delta.timestamp };
+}
+
 export async function fetchRecentGames(): Promise<RecentGamesData> {
   const res = await fetch(`${API_BASE}/api/recent-games`);
   return handleResponse<RecentGamesData>(res);
@@ -42,12 +86,32 @@ export async function fetchUpcomingEvents(): Promise<UpcomingEventsData> {
   return handleResponse<UpcomingEventsData>(res);
 }
 
-export async function refreshData(): Promise<void> {
-  const res = await fetch(`${API_BASE}/api/refresh`, { method: 'POST' });
-  await handleResponse<unknown>(res);
+interface RefreshJobStatus {
+  job_id: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  status_url?: string;
+  sources?: Record<string, string>;
+  error?: string | null;
 }
 
+const REFRESH_POLL_INTERVAL_MS = 1500;
+const REFRESH_MAX_WAIT_MS = 3 * 60 * 1000;
 
+export async function refreshData(): Promise<void> {
+  const res = await fetch(`${API_BASE}/api/refresh`, { method: 'POST' });
+  let job = await handleResponse<RefreshJobStatus>(res);
 
-
-
+  // The backend runs the refresh as a background job; poll until it finishes
+  const statusUrl = `${API_BASE}${job.status_url ?? `/api/refresh/${job.job_id}`}`;
+  const startedAt = Date.now();
+  while (job.status === 'queued' || job.status === 'running') {
+    if (Date.now() - startedAt > REFRESH_MAX_WAIT_MS) {
+      throw new Error('Refresh is taking too long, please try again later');
+    }
+    await new Promise((resolve) => setTimeout(resolve, REFRESH_POLL_INTERVAL_MS));
+    job = await handleResponse<RefreshJobStatus>(await fetch(statusUrl));
+  }
+  if (job.status === 'failed') {
+    throw new Error(`Refresh failed: ${job.error ?? 'Unknown error'}`);
+  }
+}
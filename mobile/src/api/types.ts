@@ -38,6 +38,17 @@ export interface DepressionData {
 export interface TeamsData {
   success: boolean;
   teams: Team[];
+  version?: number;
+  timestamp: string;
+}
+
+export interface TeamsDelta {
+  success: boolean;
+  version: number;
+  since: number;
+  full: boolean;
+  teams: (Team & { version: number })[];
+  removed: { key: string; name: string; sport: string; version: number }[];
   timestamp: string;
 }
 
@@ -83,3 +94,15 @@ export interface UpcomingEventsData {
 
 
 
+
+export type DashboardSection = 'depression' | 'teams' | 'recent_games' | 'upcoming_events';
+
+export interface DashboardData {
+  success: boolean;
+  version: number;
+  timestamp: string;
+  depression?: DepressionData;
+  teams?: TeamsData;
+  recent_games?: RecentGamesData;
+  upcoming_events?: UpcomingEventsData;
+}
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Build static API artifacts
+Runs the calculator once after a data update and writes the API responses as
+versioned JSON files (see src/static_artifacts.py)
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# Add parent directory to path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from src.static_artifacts import DEFAULT_OUT_DIR, build_artifacts
+
+def main():
+    """Build static artifacts from teams_config.json"""
+    parser = argparse.ArgumentParser(description="Pre-render API responses as static JSON files")
+    parser.add_argument("--config", default=os.path.join(parent_dir, "teams_config.json"),
+                        help="Path to teams_config.json")
+    parser.add_argument("--out", default=os.path.join(parent_dir, DEFAULT_OUT_DIR),
+                        help="Output directory")
+    parser.add_argument("--no-espn-api", action="store_true",
+                        help="Don't call the ESPN fantasy API while scoring")
+    args = parser.parse_args()
+    
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Building static artifacts...")
+    
+    try:
+        manifest = build_artifacts(args.config, args.out, use_espn_api=not args.no_espn_api)
+        for name, entry in manifest["files"].items():
+            print(f"  {entry['path']} ({entry['bytes']} bytes, etag {entry['etag']})")
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ✅ Static artifacts version {manifest['version']} written to {args.out}")
+        return 0
+    except Exception as e:
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ❌ Error building static artifacts: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Fake upstream server
+Serves archived ESPN/OpenF1/fantasy responses locally so fetches can be run and
+benchmarked without network (point the fetcher at it with UPSTREAM_BASE_URL)
+"""
+
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from src.fake_upstream import FakeUpstreamServer
+from src.upstream import PayloadArchive, default_archive_dir
+
+def main():
+    """Run the fake upstream server in the foreground"""
+    parser = argparse.ArgumentParser(description="Serve recorded upstream responses over local HTTP")
+    parser.add_argument("--archive", default=default_archive_dir(os.path.join(parent_dir, "teams_config.json")),
+                        help="Archive directory recorded by fetch_all_data.py")
+    parser.add_argument("--run", help="Serve this run only (default: latest capture of each URL)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="Status code for injected failures")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of connections closed without a response")
+    parser.add_argument("--bytes-per-second", type=float, help="Throttle response bodies")
+    parser.add_argument("--requests-per-second", type=float, help="Answer 429 beyond this request rate")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible error injection")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.archive):
+        print(f"❌ No archive at {args.archive} (run scripts/fetch_all_data.py once to record one)")
+        return 1
+
+    server = FakeUpstreamServer(
+        PayloadArchive(args.archive), run_id=args.run, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status, drop_rate=args.drop_rate,
+        bytes_per_second=args.bytes_per_second, requests_per_second=args.requests_per_second,
+        seed=args.seed, host=args.host, port=args.port,
+    )
+    print(f"🎭 Serving {args.archive} at {server.url}")
+    print(f"   export UPSTREAM_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Stats: {server.stats}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
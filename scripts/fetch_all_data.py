@@ -6,6 +6,7 @@ Runs on schedule to update teams_config.json with latest sports data
 
 import sys
 import os
+import argparse
 from datetime import datetime
 
 # Add parent directory to path
@@ -13,16 +14,51 @@ parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
 
 from src.sports_api import SportsDataFetcher
+from src.game_store import GameStore, default_game_store_path
+from src.event_log import EventLog
+from src.upstream import PayloadArchive, default_archive_dir
+from src.profiling import ProfileStore, default_profile_dir
+from src.refresh_jobs import RefreshLock, default_refresh_job_path
 
 def main():
     """Fetch all sports data and update config file"""
+    parser = argparse.ArgumentParser(description="Fetch all sports data into teams_config.json")
+    parser.add_argument("--profile", action="store_true", help="Save a cProfile capture of the fetch (same as PROFILE=fetch)")
+    parser.add_argument("--deadline", type=float, default=None,
+                        help="Overall time limit in seconds; lowest-priority sources are skipped when it runs out "
+                             "(default FETCH_DEADLINE_SECONDS, unset: no limit)")
+    parser.add_argument("--ingest", choices=["team", "league"], default=None,
+                        help="Per-team ESPN calls, or league-wide scoreboard and standings "
+                             "(default FETCH_INGEST_MODE, else team)")
+    args = parser.parse_args()
     config_path = os.path.join(parent_dir, "teams_config.json")
+    profiles = ProfileStore(default_profile_dir(config_path), targets="fetch" if args.profile else None)
+    
+    # Shared with the backend's refresh jobs, so the two never fetch at once
+    refresh_lock = RefreshLock(default_refresh_job_path(config_path) + ".lock")
+    if not refresh_lock.acquire():
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ⏭️ A refresh is already running, skipping")
+        return 0
     
     print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting data fetch...")
     
     try:
-        fetcher = SportsDataFetcher()
-        fetcher.update_config_file(config_path)
+        # Game history accumulates in games.sqlite3 next to the config
+        game_store = GameStore(default_game_store_path(config_path))
+        # Fetched data is appended to the event log, then folded into the config in one write
+        event_log = EventLog(config_path)
+        # Raw responses are archived for offline replay (scripts/replay_archive.py)
+        archive = PayloadArchive(default_archive_dir(config_path))
+        fetcher = SportsDataFetcher(game_store=game_store, event_log=event_log, archive=archive,
+                                    ingest_mode=args.ingest)
+        with profiles.maybe("fetch", "fetch_all_data"):
+            report = fetcher.update_config_file(config_path, deadline=args.deadline)
+        if report and report["skipped"]:
+            print(f"⏱️ Deadline reached, skipped: {', '.join(report['skipped'])}")
+        event_log.compact()
+        event_log.close()
+        archive.close()
+        game_store.close()
         print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] ✅ Data fetch complete!")
         return 0
     except Exception as e:
@@ -30,6 +66,8 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        refresh_lock.release()
 
 if __name__ == "__main__":
     sys.exit(main())
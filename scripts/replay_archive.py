@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Replay the upstream payload archive
+Re-runs the current parsers and calculator over archived ESPN/OpenF1 responses,
+one worker process per run, without touching the network
+"""
+
+import sys
+import os
+import json
+import copy
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Add parent directory to path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from src.sports_api import PARSER_VERSION, SportsDataFetcher
+from src.upstream import PayloadArchive, ReplaySession, default_archive_dir
+from src.game_store import GameStore
+from src.depression_calculator import DepressionCalculator
+from src.payloads import build_depression_payload, build_team_entries
+
+def replay_run(archive_dir, run, base_config):
+    """Parse one archived run and score it (runs in a worker process)"""
+    archive = PayloadArchive(archive_dir)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Games go to a scratch store so the replayed history is what gets scored
+            game_store = GameStore(os.path.join(tmp, "games.sqlite3"))
+            fetcher = SportsDataFetcher(game_store=game_store, session=ReplaySession(archive, run["run_id"]))
+            data = fetcher.fetch_all_data()
+
+            config = copy.deepcopy(base_config)
+            for key, _, _ in fetcher.SOURCES:
+                fetcher.apply_source(config, key, data.get(key))
+            config_path = os.path.join(tmp, "teams_config.json")
+            with open(config_path, "w") as f:
+                json.dump(config, f)
+
+            calc = DepressionCalculator(config_path, use_espn_api=False, game_store=game_store)
+            depression = build_depression_payload(calc)
+            game_store.close()
+    finally:
+        archive.close()
+    return {
+        "run_id": run["run_id"],
+        "captured_at": run["started_at"],
+        "captured_parser_version": run["parser_version"],
+        "parser_version": PARSER_VERSION,
+        "score": depression["score"],
+        "level": depression["level"],
+        "teams": [
+            {key: entry[key] for key in ("name", "sport", "wins", "losses", "recent_streak", "depression_points")}
+            for entry in build_team_entries(calc)
+        ],
+    }
+
+def main():
+    """Replay archived runs and print one JSON line per run"""
+    parser = argparse.ArgumentParser(description="Re-derive data from archived upstream responses")
+    parser.add_argument("--config", default=os.path.join(parent_dir, "teams_config.json"),
+                        help="teams_config.json supplying expectations, rivals, etc.")
+    parser.add_argument("--archive", help="Archive directory (default: upstream_archive/ next to the config)")
+    parser.add_argument("--run", action="append", dest="runs", help="Only replay this run ID (repeatable)")
+    parser.add_argument("--since", help="Only replay runs captured on or after this ISO date")
+    parser.add_argument("--stale-only", action="store_true",
+                        help="Only replay runs captured with an older parser version")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--out", help="Write JSON lines here instead of stdout")
+    args = parser.parse_args()
+
+    archive_dir = args.archive or default_archive_dir(args.config)
+    if not os.path.isdir(archive_dir):
+        print(f"❌ No archive at {archive_dir}", file=sys.stderr)
+        return 1
+    archive = PayloadArchive(archive_dir)
+    runs = archive.runs(since=args.since)
+    archive.close()
+    if args.runs:
+        runs = [r for r in runs if r["run_id"] in args.runs]
+    if args.stale_only:
+        runs = [r for r in runs if r["parser_version"] != PARSER_VERSION]
+
+    with open(args.config) as f:
+        base_config = json.load(f)
+
+    started = datetime.now()
+    print(f"Replaying {len(runs)} runs with parser version {PARSER_VERSION} on {args.workers} workers...",
+          file=sys.stderr)
+    out = open(args.out, "w") if args.out else sys.stdout
+    failures = 0
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = [pool.submit(replay_run, archive_dir, run, base_config) for run in runs]
+            for run, future in zip(runs, futures):
+                try:
+                    out.write(json.dumps(future.result()) + "\n")
+                except Exception as e:
+                    failures += 1
+                    print(f"❌ Run {run['run_id']} failed: {e}", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"✅ Replayed {len(runs) - failures}/{len(runs)} runs in {elapsed:.1f}s", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
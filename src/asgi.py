@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+ASGI Adapter
+Serves /api/stream on the event loop and every other route through the Flask (WSGI) app on a thread pool
+"""
+
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import parse_qs
+
+from .event_stream import EventBroker, parse_event_id, retry_later
+
+STREAM_PATH = "/api/stream"
+
+STREAM_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),  # Don't let proxies buffer the stream
+    (b"access-control-allow-origin", b"*"),  # Same as CORS(app) on the Flask routes
+]
+
+
+def _request_headers(scope: Dict) -> Dict[str, str]:
+    headers = {}
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").lower()
+        value = value.decode("latin-1")
+        headers[name] = f"{headers[name]},{value}" if name in headers else value
+    return headers
+
+
+def wsgi_environ(scope: Dict, body: bytes) -> Dict:
+    """PEP 3333 environ for an ASGI HTTP request"""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in _request_headers(scope).items():
+        if name == "content-type":
+            environ["CONTENT_TYPE"] = value
+        elif name == "content-length":
+            environ["CONTENT_LENGTH"] = value
+        else:
+            environ["HTTP_" + name.upper().replace("-", "_")] = value
+    return environ
+
+
+def _run_wsgi(app: Callable, environ: Dict) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    """Call a WSGI app to completion: (status, headers, body)"""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+
+    result = app(environ, start_response)
+    try:
+        body = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return started["status"], started["headers"], body
+
+
+class WSGIBridge:
+    """
+    Runs a WSGI app for ASGI requests, one request per pool thread.
+
+    Responses are buffered, which suits every route except the stream
+    (served by StreamEndpoint instead).
+    """
+
+    def __init__(self, app: Callable, threads: int = 8):
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable):
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        environ = wsgi_environ(scope, b"".join(chunks))
+        loop = asyncio.get_running_loop()
+        status, headers, body = await loop.run_in_executor(self._executor, _run_wsgi, self.app, environ)
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+class StreamEndpoint:
+    """
+    GET /api/stream on the event loop.
+
+    Each subscriber is a coroutine waiting in EventBroker.astream, so idle
+    subscribers cost a socket, not a thread. Over the broker's
+    max_subscribers a client gets a 200 that only says when to retry:
+    EventSource reconnects after that, whereas a 503 would close it for
+    good.
+    """
+
+    def __init__(self, broker: EventBroker, hello: Callable[[], Dict], busy_retry: float = 10.0):
+        self.broker = broker
+        self.hello = hello
+        self.busy_retry = busy_retry
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable):
+        await send({"type": "http.response.start", "status": 200, "headers": STREAM_HEADERS})
+        if self.broker.full:
+            await send({"type": "http.response.body", "body": retry_later(self.busy_retry).encode()})
+            return
+
+        headers = _request_headers(scope)
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        last_event_id = parse_event_id(headers.get("last-event-id") or (query.get("last_event_id") or [None])[0])
+        # The current snapshot may still have to be built the first time
+        hello = await asyncio.get_running_loop().run_in_executor(None, self.hello)
+
+        messages = self.broker.astream(last_event_id, hello=hello)
+        sender = asyncio.ensure_future(self._send_all(messages, send))
+        disconnected = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        try:
+            await asyncio.wait({sender, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (sender, disconnected):
+                task.cancel()
+            await asyncio.gather(sender, disconnected, return_exceptions=True)
+            await messages.aclose()
+        if sender.done() and not sender.cancelled() and sender.exception() is None:
+            # Reached max_stream_seconds: end the response, the client reconnects
+            await send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    async def _send_all(messages, send: Callable):
+        async for message in messages:
+            await send({"type": "http.response.body", "body": message.encode(), "more_body": True})
+
+    @staticmethod
+    async def _wait_for_disconnect(receive: Callable):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+
+def make_asgi_app(wsgi_app: Callable, broker: EventBroker, hello: Callable[[], Dict],
+                  threads: int = 8, busy_retry: float = 10.0) -> Callable:
+    """ASGI app: /api/stream on the event loop, everything else through wsgi_app
+
+    Args:
+        wsgi_app: The Flask app
+        broker: Broker the stream subscribes to
+        hello: Returns the current state for new or resyncing subscribers
+        threads: Threads for WSGI requests
+        busy_retry: Seconds a client over the subscriber cap waits before reconnecting
+    """
+    bridge = WSGIBridge(wsgi_app, threads=threads)
+    stream = StreamEndpoint(broker, hello, busy_retry=busy_retry)
+
+    async def app(scope: Dict, receive: Callable, send: Callable):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        elif scope["type"] != "http":
+            raise ValueError(f"Unsupported ASGI scope: {scope['type']}")
+        elif scope["path"] == STREAM_PATH and scope["method"] == "GET":
+            await stream(scope, receive, send)
+        else:
+            await bridge(scope, receive, send)
+
+    return app
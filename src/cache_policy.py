@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Cache Policy
+Cache-Control lifetimes derived from data freshness and the game schedule
+"""
+
+import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# How often scheduled fetches update the data (GitHub Action / cron: every 6 hours)
+DATA_UPDATE_INTERVAL = int(os.environ.get("DATA_UPDATE_INTERVAL", 6 * 3600))
+
+# Typical game length per sport, to estimate when the next result lands
+GAME_DURATIONS = {
+    "NFL": 3.5 * 3600,
+    "NCAA Football": 3.5 * 3600,
+    "NBA": 2.5 * 3600,
+    "NCAA Basketball": 2.25 * 3600,
+    "MLB": 3 * 3600,
+    "F1": 2 * 3600,
+}
+DEFAULT_GAME_DURATION = 3 * 3600
+
+MIN_TTL = 30              # never cache for less than this
+LIVE_TTL = 60             # while one of Jason's games is being played
+BROWSER_MAX_AGE = 300     # browsers revalidate sooner than the CDN (cheap with ETags)
+MAX_STALE_WHILE_REVALIDATE = 3600
+
+# Query parameter that keys a request to a snapshot version (?v=<version>).
+# Clients told about a new snapshot (/api/stream) refetch with it, which
+# is a new cache key, so CDN copies of older versions never need a purge
+VERSION_PARAM = "v"
+
+
+def _event_window(event: Dict) -> Optional[Tuple[float, float]]:
+    """(start, estimated end) of an upcoming event, in epoch seconds"""
+    start = event.get("datetime") or ""
+    if not start:
+        return None
+    try:
+        from dateutil import parser as date_parser
+        parsed = date_parser.parse(start)
+    except Exception:
+        return None
+    # Naive datetimes are local time, like the rest of the payloads
+    start_ts = parsed.timestamp()
+    return start_ts, start_ts + GAME_DURATIONS.get(event.get("sport"), DEFAULT_GAME_DURATION)
+
+
+def next_game_end(events: Iterable[Dict], now: float) -> Tuple[Optional[float], bool]:
+    """Earliest upcoming game end, and whether a game is in progress right now"""
+    next_end = None
+    live = False
+    for event in events:
+        window = _event_window(event)
+        if window is None or window[1] <= now:
+            continue
+        start, end = window
+        if start <= now:
+            live = True
+        if next_end is None or end < next_end:
+            next_end = end
+    return next_end, live
+
+
+def freshness_lifetime(last_modified: float, events: Optional[List[Dict]] = None,
+                       now: Optional[float] = None) -> int:
+    """Seconds a response stays fresh
+
+    Data changes when the next scheduled fetch runs or when the next game
+    ends (its result gets picked up), whichever comes first; while a game
+    is being played responses are only cached briefly.
+    """
+    now = time.time() if now is None else now
+    candidates = [last_modified + DATA_UPDATE_INTERVAL - now]
+    if events:
+        game_end, live = next_game_end(events, now)
+        if live:
+            return LIVE_TTL
+        if game_end is not None:
+            candidates.append(game_end - now)
+    return int(max(MIN_TTL, min(min(candidates), DATA_UPDATE_INTERVAL)))
+
+
+def cache_control(ttl: int) -> str:
+    """Cache-Control for a shared (CDN) and private cache with the given lifetime"""
+    swr = min(max(ttl, MIN_TTL), MAX_STALE_WHILE_REVALIDATE)
+    return f"public, max-age={min(ttl, BROWSER_MAX_AGE)}, s-maxage={ttl}, stale-while-revalidate={swr}"
+
+
+def requested_version(query: Mapping[str, str]) -> Optional[int]:
+    """Snapshot version a request is keyed to (VERSION_PARAM), if any"""
+    try:
+        return int(query.get(VERSION_PARAM))
+    except (TypeError, ValueError):
+        return None
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: float) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since (RFC 9110: If-None-Match wins)"""
+    if_none_match = headers.get("If-None-Match")
+    if if_none_match:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        # Weak comparison, so W/ prefixes added by proxies still match
+        return "*" in tags or etag in [t[2:] if t.startswith("W/") else t for t in tags]
+    since = parse_http_date(headers.get("If-Modified-Since"))
+    # HTTP dates have one-second resolution
+    return since is not None and int(last_modified) <= since
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Store
+Small SQLite-backed key-value store for state that must survive between runs
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict
+
+# Serverless functions can only write to /tmp; override with CHECKPOINT_DB
+DEFAULT_CHECKPOINT_DB = os.environ.get(
+    "CHECKPOINT_DB",
+    os.path.join("/tmp" if os.path.isdir("/tmp") else ".", "depression_dashboard_checkpoints.sqlite3"),
+)
+
+
+class CheckpointStore:
+    """
+    JSON values by key in a single SQLite table.
+
+    Every ``set`` commits immediately, so whatever was written before a
+    process gets killed (e.g. a serverless timeout) is still there on the
+    next run. Stands in for a hosted KV store (Vercel KV, Redis) with the
+    same get/set/delete shape.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " updated_at TEXT NOT NULL)"
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO kv (key, value, updated_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (key, json.dumps(value), datetime.now().isoformat()),
+            )
+
+    def set_many(self, values: Dict[str, Any]):
+        """Write several keys in one transaction (all or nothing)"""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO kv (key, value, updated_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                    [(key, json.dumps(value), now) for key, value in values.items()],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+
+    def items(self, prefix: str = "") -> Dict[str, Any]:
+        """All values whose key starts with prefix"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM kv WHERE key LIKE ? ESCAPE '\\' ORDER BY key",
+                (prefix.replace("%", r"\%").replace("_", r"\_") + "%",),
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
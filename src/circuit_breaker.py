@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker
+Per-host failure tracking, negative caching of failed URLs and last-good responses for upstream calls
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+
+# Consecutive failures that open a host's circuit
+FAILURE_THRESHOLD = int(os.environ.get("UPSTREAM_BREAKER_THRESHOLD", 3))
+# Seconds an open circuit fails fast before letting one probe request through
+RESET_TIMEOUT = float(os.environ.get("UPSTREAM_BREAKER_RESET", 30))
+# Seconds a failed URL is answered from the negative cache
+NEGATIVE_TTL = float(os.environ.get("UPSTREAM_NEGATIVE_TTL", 60))
+# Successful responses kept for serving while their upstream is unavailable
+LAST_GOOD_SIZE = 128
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(requests.exceptions.ConnectionError):
+    """Raised instead of calling an upstream that is known to be failing
+
+    A ConnectionError, so every existing ``except requests.RequestException``
+    (and ``except Exception``) path treats it like the outage it stands for.
+    """
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class _Circuit:
+    __slots__ = ("state", "failures", "opened_at", "probing")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    """
+    Per-key (host) circuit breaker.
+
+    ``failure_threshold`` consecutive failures open a key's circuit: calls
+    fail immediately with CircuitOpenError. After ``reset_timeout`` the
+    circuit goes half-open and lets exactly one probe through; its success
+    closes the circuit, its failure re-opens it for another timeout.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def before(self, key: str) -> bool:
+        """Raise CircuitOpenError unless a call to key may go ahead
+
+        Returns True if the call is the half-open probe: the caller must then
+        report success or failure, or ``release`` the probe if the call ended
+        without saying anything about the host (e.g. its deadline ran out).
+        """
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.state == CLOSED:
+                return False
+            if circuit.state == OPEN:
+                if self._clock() - circuit.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"Circuit open for {key}")
+                circuit.state = HALF_OPEN
+                circuit.probing = False
+            if circuit.probing:
+                raise CircuitOpenError(f"Circuit half-open for {key}, probe in flight")
+            circuit.probing = True
+            return True
+
+    def release(self, key: str):
+        """Let another probe through after one that ended with neither success nor failure"""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is not None and circuit.state == HALF_OPEN:
+                circuit.probing = False
+
+    def success(self, key: str):
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is not None:
+                circuit.state = CLOSED
+                circuit.failures = 0
+                circuit.probing = False
+
+    def failure(self, key: str):
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            circuit.failures += 1
+            circuit.probing = False
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = OPEN
+                circuit.opened_at = self._clock()
+
+    def state(self, key: str) -> str:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                return CLOSED
+            if circuit.state == OPEN and self._clock() - circuit.opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return circuit.state
+
+    def call(self, key: str, fn: Callable, *args, **kwargs):
+        """Run fn under key's circuit (for clients that don't go through UpstreamSession, e.g. nba_api)"""
+        probe = self.before(key)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.failure(key)
+            raise
+        except BaseException:
+            if probe:
+                self.release(key)
+            raise
+        self.success(key)
+        return result
+
+
+class NegativeCache:
+    """URLs that just failed; asking again within ``ttl`` fails fast"""
+
+    def __init__(self, ttl: float = NEGATIVE_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def check(self, url: str):
+        """Raise UpstreamUnavailable if url failed within the last ttl seconds"""
+        with self._lock:
+            expires = self._expires.get(url)
+            if expires is None:
+                return
+            if self._clock() < expires:
+                raise UpstreamUnavailable(f"{url} failed recently")
+            del self._expires[url]
+
+    def add(self, url: str):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._expires[url] = self._clock() + self.ttl
+
+    def discard(self, url: str):
+        with self._lock:
+            self._expires.pop(url, None)
+
+
+class LastGoodCache:
+    """Most recent successful (status, content type, body) per URL, LRU-bounded"""
+
+    def __init__(self, max_entries: int = LAST_GOOD_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, Optional[str], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, url: str, status: int, content_type: Optional[str], body: bytes):
+        with self._lock:
+            self._entries[url] = (status, content_type, body)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, url: str) -> Optional[Tuple[int, Optional[str], bytes]]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+
+class UpstreamGuard:
+    """The breaker, negative cache and last-good responses one or more sessions share"""
+
+    def __init__(self, breaker: Optional[CircuitBreaker] = None, negative: Optional[NegativeCache] = None,
+                 last_good: Optional[LastGoodCache] = None):
+        self.breaker = breaker or CircuitBreaker()
+        self.negative = negative or NegativeCache()
+        self.last_good = last_good or LastGoodCache()
+
+
+# Shared by every live UpstreamSession in the process, so one outage is noticed once
+DEFAULT_GUARD = UpstreamGuard()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Config File Watcher
+Detects changes to teams_config.json (and other state files) on disk
+"""
+
+import os
+import sys
+import time
+import struct
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .event_log import default_event_log_path
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+# inotify event masks (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def watched_paths(config_path: str) -> List[str]:
+    """Files whose changes mean a new snapshot: the config, its event log and WATCH_EXTRA_PATHS
+
+    WATCH_EXTRA_PATHS is os.pathsep-separated.
+    """
+    extra = [p for p in os.environ.get("WATCH_EXTRA_PATHS", "").split(os.pathsep) if p]
+    return [config_path, default_event_log_path(config_path)] + extra
+
+
+def watch_config(config_path: str, on_change: Callable[[List[str]], None], **kwargs) -> "ConfigWatcher":
+    """A ConfigWatcher over watched_paths(config_path)
+
+    The backend ``start``s it; serverless handlers, which can't keep a
+    thread running between invocations, call ``check`` on each request.
+    """
+    return ConfigWatcher(watched_paths(config_path), on_change, **kwargs)
+
+
+def _load_inotify():
+    """Return the libc handle if inotify is usable on this platform, else None"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class ConfigWatcher:
+    """
+    Watches a set of files and calls ``on_change`` (from a background thread)
+    whenever any of them is written, replaced or removed.
+
+    Uses inotify on Linux and falls back to mtime polling everywhere else
+    (or when inotify cannot be initialised, e.g. watch limits reached).
+    Bursts of events are debounced so a single ``json.dump`` that issues
+    several writes only triggers one rebuild.
+    """
+
+    def __init__(self, paths: Iterable[str], on_change: Callable[[List[str]], None],
+                 poll_interval: float = 2.0, debounce: float = 0.5,
+                 use_inotify: bool = True):
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+        self.backend = None  # "inotify" or "polling" once started
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._checked: Optional[Dict[str, Optional[Tuple[int, int]]]] = None
+
+    def start(self):
+        """Start watching in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        fd = self._init_inotify() if self.use_inotify else None
+        if fd is not None:
+            self.backend = "inotify"
+            target, args = self._run_inotify, (fd,)
+        else:
+            self.backend = "polling"
+            # Baseline taken now, so a write right after start() isn't missed
+            target, args = self._run_polling, (self._stat_all(),)
+        self._thread = threading.Thread(target=target, args=args, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop watching and wait for the thread to exit"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def check(self) -> List[str]:
+        """Stat the files once, without a thread; calls on_change if any changed since the last check
+
+        The first check only records the files' state.
+        """
+        current = self._stat_all()
+        last, self._checked = self._checked, current
+        if last is None:
+            return []
+        changed = [p for p in self.paths if current[p] != last[p]]
+        if changed:
+            self._fire(changed)
+        return changed
+
+    def _fire(self, changed: List[str]):
+        try:
+            self.on_change(sorted(set(changed)))
+        except Exception as e:
+            logger.error("Error in config watcher callback: %s", e)
+
+    # mtime polling ----------------------------------------------------
+
+    def _stat_all(self) -> Dict[str, Optional[Tuple[int, int]]]:
+        stats = {}
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                stats[path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stats[path] = None
+        return stats
+
+    def _run_polling(self, last: Dict[str, Optional[Tuple[int, int]]]):
+        while not self._stop.wait(self.poll_interval):
+            current = self._stat_all()
+            changed = [p for p in self.paths if current[p] != last[p]]
+            if changed:
+                # Wait for writers to finish, then re-stat so we report the final state
+                if self._stop.wait(self.debounce):
+                    break
+                current = self._stat_all()
+                self._fire(changed)
+            last = current
+
+    # inotify ----------------------------------------------------------
+
+    def _init_inotify(self) -> Optional[int]:
+        libc = _load_inotify()
+        if libc is None:
+            return None
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return None
+        # Watch parent directories so atomic replace-by-rename is also seen
+        for directory in sorted({os.path.dirname(p) for p in self.paths}):
+            if libc.inotify_add_watch(fd, directory.encode(), WATCH_MASK) < 0:
+                os.close(fd)
+                return None
+        return fd
+
+    def _read_events(self, fd: int) -> List[str]:
+        names = {os.path.basename(p): p for p in self.paths}
+        changed = []
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _wd, _mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            if name in names:
+                changed.append(names[name])
+        return changed
+
+    def _run_inotify(self, fd: int):
+        import select
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 1.0)
+                if not ready:
+                    continue
+                changed = self._read_events(fd)
+                if not changed:
+                    continue
+                # Coalesce the rest of the burst
+                deadline = time.monotonic() + self.debounce
+                while not self._stop.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    ready, _, _ = select.select([fd], [], [], remaining)
+                    if ready:
+                        changed.extend(self._read_events(fd))
+                self._fire(changed)
+        finally:
+            os.close(fd)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Dashboard Service
+Framework-agnostic request handling shared by the Flask backend and the Vercel functions
+"""
+
+from typing import Callable, Dict, Mapping, Optional
+
+from .snapshot import SECTIONS, Snapshot, serialize
+from .static_artifacts import ArtifactReader
+from .response_encoding import EncodingError, encode_response, parse_fields, parse_precision
+from .cache_policy import cache_control, freshness_lifetime, http_date, is_not_modified, requested_version
+from .metrics import record_cache
+from .tracing import span
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Route name -> snapshot section
+ROUTES = {
+    "depression": "depression",
+    "teams": "teams",
+    "recent-games": "recent_games",
+    "upcoming-events": "upcoming_events",
+}
+
+
+class ServiceResponse:
+    """Status, headers and body bytes, ready for any HTTP framework"""
+
+    def __init__(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None,
+                 content_type: str = "application/json"):
+        self.status = status
+        self.body = body
+        self.headers = dict(headers or {})
+        if content_type and status != 304:
+            self.headers["Content-Type"] = content_type
+
+
+def error(status: int, message: str, **extra) -> ServiceResponse:
+    return ServiceResponse(status, serialize(dict({"success": False, "error": message}, **extra)))
+
+
+class DashboardService:
+    """
+    Answers the read-only API routes from the current snapshot.
+
+    Both deployments call ``handle``; snapshot lookup, static artifacts,
+    field selection, content negotiation, compression, ETags, caching
+    headers and conditional requests all live here so they behave the
+    same on Railway (Flask) and Vercel.
+    """
+
+    def __init__(self, get_snapshot: Callable[[], Snapshot], artifacts: Optional[ArtifactReader] = None):
+        self._get_snapshot = get_snapshot
+        self._artifacts = artifacts
+
+    def handle(self, route: str, query: Mapping[str, str], headers: Mapping[str, str]) -> ServiceResponse:
+        """Handle GET /api/<route>
+
+        Args:
+            route: "depression", "teams", "recent-games", "upcoming-events" or "dashboard"
+            query: Query parameters (first value of each)
+            headers: Request headers (case-insensitive mapping)
+        """
+        with span(f"GET /api/{route}", route=route) as current:
+            response = self._handle(route, query, headers)
+            current.set_attribute("status", response.status)
+        return response
+
+    def _handle(self, route: str, query: Mapping[str, str], headers: Mapping[str, str]) -> ServiceResponse:
+        try:
+            fields = parse_fields(query.get("fields"))
+            precision = parse_precision(query.get("precision"))
+        except EncodingError as e:
+            return error(400, str(e))
+
+        try:
+            if route == "dashboard":
+                result = self._dashboard_body(query)
+            elif route == "teams" and query.get("since") is not None:
+                result = self._teams_delta_body(query["since"])
+            elif route in ROUTES:
+                result = self._section_body(ROUTES[route])
+            else:
+                return error(404, f"Unknown route: {route}")
+            if isinstance(result, ServiceResponse):
+                return result
+            body, last_modified, events = result
+
+            with span("encode_response", bytes_in=len(body)):
+                encoded = encode_response(
+                    body,
+                    accept=headers.get("Accept"),
+                    accept_encoding=headers.get("Accept-Encoding"),
+                    fields=fields,
+                    precision=precision,
+                )
+            response_headers = dict(encoded.headers, ETag=encoded.etag)
+            response_headers["Last-Modified"] = http_date(last_modified)
+            if self._behind(query):
+                # Keyed to a version this worker hasn't built yet: don't let
+                # the older data stick to the newer version's cache key
+                response_headers["Cache-Control"] = "no-store"
+            else:
+                response_headers["Cache-Control"] = cache_control(freshness_lifetime(last_modified, events))
+            not_modified = is_not_modified(headers, encoded.etag, last_modified)
+            # Client revalidations: a hit is a 304 (the client's cached copy is still good)
+            if headers.get("If-None-Match") or headers.get("If-Modified-Since"):
+                record_cache("conditional", not_modified)
+            if not_modified:
+                return ServiceResponse(304, b"", response_headers)
+            return ServiceResponse(200, encoded.body, response_headers, content_type=encoded.media_type)
+        except Exception as e:
+            logger.exception("Error in /api/%s", route)
+            return error(500, str(e))
+
+    # Body helpers return (json body, last modified epoch, upcoming events for the
+    # cache lifetime) or an error ServiceResponse
+
+    def _section_body(self, section: str):
+        if self._artifacts is not None:
+            artifact = self._artifacts.get(section)
+            last_modified = self._artifacts.last_modified()
+            hit = artifact is not None and last_modified is not None
+            record_cache("static_artifact", hit)
+            if hit:
+                return artifact[0], last_modified, self._artifacts.upcoming_events()
+        snapshot = self._get_snapshot()
+        body = snapshot.section(section)[1]
+        return body, snapshot.section_modified(section), self._snapshot_events(snapshot)
+
+    def _teams_delta_body(self, since: str):
+        try:
+            since = int(since)
+        except ValueError:
+            return error(400, "since must be an integer version")
+        snapshot = self._get_snapshot()
+        return snapshot.teams_delta_json(since), snapshot.data_updated_at, self._snapshot_events(snapshot)
+
+    def _dashboard_body(self, query: Mapping[str, str]):
+        requested = query.get("sections")
+        sections = [s.strip() for s in requested.split(",") if s.strip()] if requested else list(SECTIONS)
+        unknown = [s for s in sections if s not in SECTIONS]
+        if unknown:
+            return error(400, f"Unknown sections: {', '.join(unknown)}", available_sections=list(SECTIONS))
+        snapshot = self._get_snapshot()
+        body = snapshot.dashboard_json(sections)
+        last_modified = max(snapshot.section_modified(name) for name in sections)
+        return body, last_modified, self._snapshot_events(snapshot)
+
+    def _behind(self, query: Mapping[str, str]) -> bool:
+        """Whether the request asks for a newer snapshot version than the current one"""
+        version = requested_version(query)
+        return version is not None and version > self._get_snapshot().version
+
+    @staticmethod
+    def _snapshot_events(snapshot: Snapshot):
+        # Only use upcoming events that are already computed; never fetch for a header
+        upcoming = snapshot.cached_section("upcoming_events")
+        return upcoming.get("events") if upcoming else None
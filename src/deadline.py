@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Deadlines
+An overall time limit for a fetch run, carried in a context variable down to every upstream call
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional, Union
+
+import requests
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised instead of starting an upstream call after the run's deadline has passed
+
+    A Timeout, so the parsers' existing ``except requests.RequestException``
+    paths treat it like the slow upstream it usually stands for.
+    """
+
+
+class Deadline:
+    """A point in (monotonic) time that a run and everything it calls must finish by"""
+
+    __slots__ = ("expires_at", "_clock")
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.expires_at = clock() + max(0.0, seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self._clock() >= self.expires_at
+
+    def share(self, parts: int, minimum: float = 0.0) -> "Deadline":
+        """A sub-deadline for the next of ``parts`` equal shares of the remaining time
+
+        Time a share doesn't use is left for the ones after it. The share is
+        at least ``minimum`` (while that much remains), so when time is short
+        the earlier, higher-priority parts get it and the later ones go without.
+        """
+        remaining = self.remaining()
+        seconds = min(remaining, max(remaining / max(1, parts), minimum))
+        return Deadline(seconds, self._clock)
+
+    def timeout(self, requested: Union[float, tuple, None]):
+        """requests' ``timeout`` argument, shortened to the time left (tuples clamp each part)"""
+        remaining = self.remaining()
+        if isinstance(requested, tuple):
+            return tuple(remaining if part is None else min(part, remaining) for part in requested)
+        return remaining if requested is None else min(requested, remaining)
+
+
+def as_deadline(value: Union[float, Deadline, None]) -> Optional[Deadline]:
+    """A Deadline from seconds (or an existing Deadline); None stays None"""
+    if value is None or isinstance(value, Deadline):
+        return value
+    return Deadline(value)
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("dashboard_deadline", default=None)
+
+
+def current() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def scope(deadline: Optional[Deadline]):
+    """Make deadline the current one for the with-block
+
+    An outer deadline that expires sooner still wins, so nesting can only
+    tighten the limit. None leaves the current deadline in place.
+    """
+    outer = _current.get()
+    if deadline is None or (outer is not None and outer.expires_at <= deadline.expires_at):
+        yield outer
+        return
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def check(what: str):
+    """Raise DeadlineExceeded if the current deadline has passed"""
+    deadline = _current.get()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded(f"Deadline passed before {what}")
+
+
+def clamp_timeout(requested: Union[float, tuple, None], what: str = "request"):
+    """requested, shortened to the current deadline; raises DeadlineExceeded if none is left"""
+    deadline = _current.get()
+    if deadline is None:
+        return requested
+    if deadline.expired:
+        raise DeadlineExceeded(f"Deadline passed before {what}")
+    return deadline.timeout(requested)
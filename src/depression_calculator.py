@@ -4,6 +4,7 @@ Depression Dashboard
 Calculates depression level based on favorite teams' performance
 """
 
+import os
 import json
 import argparse
 from datetime import datetime, timedelta
@@ -11,12 +12,30 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 import math
 
+try:
+    from .log import get_logger
+except ImportError:
+    # Fall back to a sibling import (when run as a script from src/)
+    from log import get_logger
+
+logger = get_logger(__name__)
+
 try:
     from .espn_fantasy import ESPNFantasyClient, get_espn_credentials_instructions
     ESPN_AVAILABLE = True
 except ImportError:
     ESPN_AVAILABLE = False
-    print("Warning: ESPN Fantasy integration not available. Install espn-api library.")
+    logger.warning("ESPN Fantasy integration not available. Install espn-api library.")
+
+try:
+    from .game_store import BLOWOUT_MARGIN, RECENT_GAMES_WINDOW, GameStore, default_game_store_path
+    from .event_log import APPLIED_SEQ_KEY, config_lock, default_event_log_path, replay_tail
+    from .tracing import traced
+except ImportError:
+    # Fall back to a sibling import (when run as a script from src/)
+    from game_store import BLOWOUT_MARGIN, RECENT_GAMES_WINDOW, GameStore, default_game_store_path
+    from event_log import APPLIED_SEQ_KEY, config_lock, default_event_log_path, replay_tail
+    from tracing import traced
 
 
 def calculate_time_weight(days_ago: float, hours_ago: float = None, decay_rate: float = 0.3, sport: str = None) -> float:
@@ -90,6 +109,11 @@ def get_event_timestamps(events: List[str], days_back: int = 5) -> List[Tuple[st
     return result
 
 
+def _iso_date(value: str) -> str:
+    """Normalize ESPN dates ("2024-10-13T20:25Z") so datetime.fromisoformat can parse them"""
+    return value[:-1] + "+00:00" if value.endswith("Z") else value
+
+
 @dataclass
 class Team:
     """Represents a sports team"""
@@ -177,6 +201,7 @@ class Team:
                 return current_month in [2, 3, 4, 5, 6, 7]
         return False
     
+    @traced("score", lambda entity: {"entity": entity.name, "kind": "team"})
     def calculate_depression(self) -> Dict[str, float]:
         """Calculate depression contribution from this team"""
         score = 0.0
@@ -658,6 +683,7 @@ class F1Driver:
     recent_dnf_timestamps: List[str] = field(default_factory=list)  # ISO format dates
     notes: str = ""
     
+    @traced("score", lambda entity: {"entity": entity.name, "kind": "f1_driver"})
     def calculate_depression(self) -> Dict[str, float]:
         """Calculate depression contribution from F1 performance"""
         score = 0.0
@@ -815,6 +841,7 @@ class FantasyTeam:
     recent_streak: List[str]
     recent_streak_timestamps: List[str] = field(default_factory=list)  # ISO format dates
     
+    @traced("score", lambda entity: {"entity": entity.name, "kind": "fantasy_team"})
     def calculate_depression(self) -> Dict[str, float]:
         """Calculate depression contribution from fantasy team"""
         score = 0.0
@@ -913,7 +940,14 @@ class FantasyTeam:
 class DepressionCalculator:
     """Main calculator class"""
     
-    def __init__(self, config_path: str = "teams_config.json", use_espn_api: bool = True):
+    def __init__(self, config_path: str = "teams_config.json", use_espn_api: bool = True, game_store=None):
+        """
+        Args:
+            config_path: Path to teams_config.json
+            use_espn_api: Fetch the fantasy team live from ESPN when credentials are configured
+            game_store: GameStore to read recent games from; defaults to games.sqlite3
+                next to the config if it exists (otherwise the config's game lists are used)
+        """
         self.config_path = config_path
         self.config = self.load_config()
         self.teams = []
@@ -921,9 +955,27 @@ class DepressionCalculator:
         self.fantasy_team = None
         self.use_espn_api = use_espn_api
         self.espn_client = None
+        if game_store is None:
+            game_store = GameStore.open_existing(default_game_store_path(config_path))
+        self.game_store = game_store
         self.load_data()
     
     def load_config(self) -> Dict:
+        """Load configuration, plus any ingest events not yet compacted into it"""
+        log_path = default_event_log_path(self.config_path)
+        config = self._read_config()
+        if not os.path.exists(log_path):
+            return config
+        # A compaction between reading the config and the log means the
+        # config we read is stale; read both again
+        for _ in range(3):
+            replayed = replay_tail(config, log_path)
+            if replayed is not None:
+                return replayed
+            config = self._read_config()
+        return config
+    
+    def _read_config(self) -> Dict:
         """Load configuration from JSON file"""
         try:
             with open(self.config_path, 'r') as f:
@@ -931,7 +983,7 @@ class DepressionCalculator:
             
             # Validate config structure
             if not isinstance(config, dict):
-                print(f"Error: Config file {self.config_path} is not a valid JSON object")
+                logger.error("Config file %s is not a valid JSON object", self.config_path)
                 return {"teams": [], "fantasy_team": {}, "f1_driver": {}}
             
             # Ensure required top-level keys exist
@@ -944,20 +996,26 @@ class DepressionCalculator:
             
             return config
         except FileNotFoundError:
-            print(f"Config file {self.config_path} not found. Using defaults.")
+            logger.info("Config file %s not found. Using defaults.", self.config_path)
             return {"teams": [], "fantasy_team": {}, "f1_driver": {}}
         except json.JSONDecodeError as e:
-            print(f"Error: Config file {self.config_path} is not valid JSON: {e}")
-            print("Please check the file for syntax errors.")
+            logger.error("Config file %s is not valid JSON (check it for syntax errors): %s", self.config_path, e)
             return {"teams": [], "fantasy_team": {}, "f1_driver": {}}
         except Exception as e:
-            print(f"Error loading config file {self.config_path}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Error loading config file %s: %s", self.config_path, e, exc_info=True)
             return {"teams": [], "fantasy_team": {}, "f1_driver": {}}
     
-    def save_config(self):
-        """Save current state to config file"""
+    def save_config(self) -> bool:
+        """Save current state to config file
+        
+        Written under the event log's lock, so it can't interleave with a
+        compaction. Events logged since this calculator was loaded are
+        folded in on top, as readers would replay them anyway.
+        
+        Returns:
+            False if the log was compacted past this state (the config on
+            disk is newer; reload and edit again) or the write failed
+        """
         config = {
             "teams": [],
             "fantasy_team": {},
@@ -1028,8 +1086,55 @@ class DepressionCalculator:
                 "recent_streak": self.fantasy_team.recent_streak
             }
         
-        with open(self.config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        # Keep the event log position so compacted events aren't replayed over this state
+        if APPLIED_SEQ_KEY in self.config:
+            config[APPLIED_SEQ_KEY] = self.config[APPLIED_SEQ_KEY]
+        
+        tmp_path = f"{self.config_path}.tmp"
+        try:
+            with config_lock(self.config_path):
+                config = replay_tail(config, default_event_log_path(self.config_path))
+                if config is None:
+                    logger.error("Config %s was compacted since it was loaded; not overwriting it", self.config_path)
+                    return False
+                with open(tmp_path, 'w') as f:
+                    json.dump(config, f, indent=2)
+                os.replace(tmp_path, self.config_path)
+            return True
+        except OSError as e:
+            logger.error("Error saving config file %s: %s", self.config_path, e)
+            return False
+    
+    def apply_game_history(self, team: Team):
+        """Replace a team's per-game lists with a bounded window from the game store"""
+        if self.game_store is None:
+            return
+        try:
+            games = self.game_store.recent_games(team.name, team.sport, RECENT_GAMES_WINDOW)
+            rivalry_losses = self.game_store.rivalry_losses(team.name, team.sport, team.rivals)
+        except Exception as e:
+            logger.error("Error reading game history for %s: %s", team.name, e)
+            return
+        
+        if games:
+            # Positive = win margin, negative = loss margin
+            margins = [
+                int(g['score_margin'] or 0) * (-1 if g['result'] == 'L' else 1)
+                for g in games
+            ]
+            team.recent_streak = [g['result'] for g in games]
+            team.recent_streak_timestamps = [_iso_date(g['date']) for g in games]
+            team.recent_opponents = [g['opponent'] for g in games]
+            team.recent_game_locations = ['home' if g['is_home'] else 'away' for g in games]
+            team.recent_score_margins = margins
+            team.recent_overtime_games = [g['is_overtime'] for g in games]
+            team.recent_blowout_losses = [m <= -BLOWOUT_MARGIN for m in margins]
+            team.recent_blowout_wins = [m >= BLOWOUT_MARGIN for m in margins]
+        if games or rivalry_losses:
+            # The store has this team's history: no rivalry losses there means none,
+            # not "keep whatever the config last said"
+            team.recent_rivalry_losses = [g['opponent'] for g in rivalry_losses]
+            team.recent_rivalry_loss_timestamps = [_iso_date(g['date']) for g in rivalry_losses]
     
     def load_data(self):
         """Load teams and data from config"""
@@ -1049,10 +1154,10 @@ class DepressionCalculator:
                 
                 # Ensure required fields exist
                 if "name" not in team_data:
-                    print(f"Warning: Team missing name field, skipping")
+                    logger.warning("Team missing name field, skipping")
                     continue
                 if "sport" not in team_data:
-                    print(f"Warning: Team {team_data.get('name', 'Unknown')} missing sport field, skipping")
+                    logger.warning("Team %s missing sport field, skipping", team_data.get('name', 'Unknown'))
                     continue
                 
                 team = Team(
@@ -1098,14 +1203,13 @@ class DepressionCalculator:
                 interest_level=team_data.get("interest_level", 1.0),
                 notes=team_data.get("notes", "")
                 )
+                self.apply_game_history(team)
                 self.teams.append(team)
             except KeyError as e:
-                print(f"Error loading team {team_data.get('name', 'Unknown')}: Missing required field {e}")
+                logger.error("Error loading team %s: Missing required field %s", team_data.get('name', 'Unknown'), e)
                 continue
             except Exception as e:
-                print(f"Error loading team {team_data.get('name', 'Unknown')}: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.error("Error loading team %s: %s", team_data.get('name', 'Unknown'), e, exc_info=True)
                 continue
         
         # Load F1 driver
@@ -1123,9 +1227,7 @@ class DepressionCalculator:
                     notes=f1_data.get("notes", "")
                 )
             except Exception as e:
-                print(f"Error loading F1 driver: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.error("Error loading F1 driver: %s", e, exc_info=True)
         
         # Load fantasy team
         fantasy_data = self.config.get("fantasy_team", {})
@@ -1138,8 +1240,7 @@ class DepressionCalculator:
                         self._load_fantasy_from_espn(espn_config, fantasy_data)
                         return  # Successfully loaded from API
                     except Exception as e:
-                        print(f"Warning: Failed to load fantasy data from ESPN API: {e}")
-                        print("Falling back to manual config data...")
+                        logger.warning("Failed to load fantasy data from ESPN API, falling back to manual config data: %s", e)
             
             # Fall back to manual config
             try:
@@ -1159,9 +1260,7 @@ class DepressionCalculator:
                     recent_streak=fantasy_data.get("recent_streak", [])
                 )
             except Exception as e:
-                print(f"Error loading fantasy team: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.error("Error loading fantasy team: %s", e, exc_info=True)
     
     def _load_fantasy_from_espn(self, espn_config: Dict, fantasy_data: Dict):
         """Load fantasy team data from ESPN API"""
@@ -1194,11 +1293,10 @@ class DepressionCalculator:
             recent_streak=team_data.get("recent_streak", [])
         )
         
-        print(f"✓ Loaded fantasy team '{team_data['name']}' from ESPN API")
-        print(f"  Record: {team_data['record']}")
+        logger.info("✓ Loaded fantasy team '%s' from ESPN API (record %s)", team_data['name'], team_data['record'])
         if team_data.get("matchup"):
             matchup = team_data["matchup"]
-            print(f"  Current Week {matchup['week']} Matchup: vs {matchup['opponent']}")
+            logger.info("Current Week %s Matchup: vs %s", matchup['week'], matchup['opponent'])
     
     def refresh_fantasy_data(self):
         """Refresh fantasy team data from ESPN API"""
@@ -1208,7 +1306,7 @@ class DepressionCalculator:
             if espn_config.get("league_id") and espn_config.get("year"):
                 self._load_fantasy_from_espn(espn_config, fantasy_data)
             else:
-                print("ESPN API not configured. Add 'espn' section to fantasy_team in config.")
+                logger.info("ESPN API not configured. Add 'espn' section to fantasy_team in config.")
         else:
             fantasy_data = self.config.get("fantasy_team", {})
             espn_config = fantasy_data.get("espn", {})
@@ -1435,7 +1533,9 @@ def main():
         try:
             from .sports_api import SportsDataFetcher
             print("Fetching latest data from APIs...")
-            fetcher = SportsDataFetcher()
+            from .upstream import PayloadArchive, default_archive_dir
+            fetcher = SportsDataFetcher(game_store=GameStore(default_game_store_path(args.config)),
+                                        archive=PayloadArchive(default_archive_dir(args.config)))
             fetcher.update_config_file(args.config)
             print("Data updated successfully!\n")
         except ImportError:
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Ingest Event Log
+Append-only JSONL log of fetched data, folded into teams_config.json by a compactor
+"""
+
+import os
+import json
+import time
+import fcntl
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    from .log import get_logger
+except ImportError:
+    # Fall back to a sibling import (when run as a script from src/)
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+EVENT_LOG_SUFFIX = ".events.jsonl"
+
+# Config key recording the last event folded into the config
+APPLIED_SEQ_KEY = "event_log_seq"
+
+# First line of a compacted log; carries the sequence number forward
+CHECKPOINT_EVENT = "checkpoint"
+
+# Bytes read per step when scanning back from the end of the log
+TAIL_CHUNK = 8192
+
+# Event types
+TEAM_EVENT = "team"
+RACE_EVENT = "race"
+FANTASY_EVENT = "fantasy"
+
+
+def default_event_log_path(config_path: str) -> str:
+    """teams_config.events.jsonl next to teams_config.json (override with EVENT_LOG_PATH)"""
+    if os.environ.get("EVENT_LOG_PATH"):
+        return os.environ["EVENT_LOG_PATH"]
+    root, _ = os.path.splitext(os.path.abspath(config_path))
+    return root + EVENT_LOG_SUFFIX
+
+
+@contextmanager
+def _flock(lock_path: str):
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def config_lock(config_path: str):
+    """Process lock shared with EventLog appends and compaction
+
+    Hold it around any other read-modify-write of teams_config.json, so
+    the write can't interleave with a compaction rewriting the same file.
+    """
+    return _flock(default_event_log_path(config_path) + ".lock")
+
+
+def source_event(source: str, data: Dict) -> Dict:
+    """Normalized event for one fetched source (see SportsDataFetcher.SOURCES)"""
+    if source == "fantasy":
+        return {"type": FANTASY_EVENT, "source": source, "data": data}
+    return {"type": RACE_EVENT if source == "verstappen" else TEAM_EVENT, "source": source, "data": data}
+
+
+def apply_event(config: Dict, event: Dict):
+    """Fold one event into the materialized config"""
+    try:
+        from .sports_api import SportsDataFetcher
+    except ImportError:
+        from sports_api import SportsDataFetcher
+    if event["type"] == FANTASY_EVENT:
+        SportsDataFetcher.apply_fantasy(config, event["data"], quiet=True)
+    elif event["type"] in (TEAM_EVENT, RACE_EVENT):
+        SportsDataFetcher.apply_source(config, event["source"], event["data"])
+
+
+def read_events(path: str) -> List[Dict]:
+    """All complete events in the log (a torn last line from a crash is ignored)"""
+    events = []
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    logger.warning("⚠️ Skipping corrupt event log line in %s", path)
+    except FileNotFoundError:
+        pass
+    return events
+
+
+def last_event_seq(path: str) -> Optional[int]:
+    """Sequence number of the last complete event (or checkpoint), None for an empty or missing log
+
+    Reads back from the end of the file, so it costs one line rather than
+    the whole log. A torn last line is skipped, like read_events does.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        pending = None  # bytes up to a line end; None until the last newline is found
+        while pos > 0:
+            step = min(TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            if pending is None:
+                cut = chunk.rfind(b"\n")
+                if cut < 0:
+                    continue  # still inside a torn last line
+                chunk, pending = chunk[:cut + 1], b""
+            lines = (chunk + pending).split(b"\n")
+            # The first piece may be the end of a line that starts further back
+            for line in reversed(lines[0 if pos == 0 else 1:-1]):
+                if not line.strip():
+                    continue
+                try:
+                    return int(json.loads(line)["seq"])
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("⚠️ Skipping corrupt event log line in %s", path)
+            pending = lines[0] + b"\n"
+    return None
+
+
+def replay_tail(config: Dict, path: str) -> Optional[Dict]:
+    """Apply the events the config hasn't absorbed yet (snapshot + tail replay)
+
+    Returns:
+        The updated config, or None if the log was compacted past this config
+        (the config on disk is newer than the one passed in; re-read it)
+    """
+    applied = int(config.get(APPLIED_SEQ_KEY, 0))
+    events = read_events(path)
+    if events and events[0].get("type") == CHECKPOINT_EVENT and events[0]["seq"] > applied:
+        return None
+    for event in events:
+        if event["seq"] > applied and event.get("type") != CHECKPOINT_EVENT:
+            apply_event(config, event)
+            config[APPLIED_SEQ_KEY] = event["seq"]
+    return config
+
+
+class EventLog:
+    """
+    Appends ingest events to a JSONL file.
+
+    Writers in any process serialize on an flock'd ``.lock`` file next to
+    the log, so sequence numbers stay unique and compaction can swap the
+    log out safely. Each append is written and flushed immediately (visible
+    to readers and surviving a process crash); ``fsync`` is batched every
+    ``fsync_every`` events or ``fsync_interval`` seconds, and on ``sync()``.
+    """
+
+    def __init__(self, config_path: str, path: Optional[str] = None,
+                 fsync_every: int = 32, fsync_interval: float = 1.0):
+        """
+        Args:
+            config_path: teams_config.json the log is compacted into
+            path: Log file; defaults to default_event_log_path(config_path)
+            fsync_every: fsync after this many unsynced events
+            fsync_interval: ... or when the oldest unsynced event is this many seconds old
+        """
+        self.config_path = config_path
+        self.path = path or default_event_log_path(config_path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._inode = None
+        self._tail = None  # (inode, size, mtime, last seq) as of this process's last write
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    @contextmanager
+    def _exclusive(self):
+        """Thread and process lock around log writes"""
+        with self._lock:
+            with _flock(self.path + ".lock"):
+                yield
+
+    def _open(self):
+        """(Re)open the log for appending if it was replaced by a compaction"""
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if self._file is None or inode != self._inode:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self.path, "ab")
+            self._inode = os.fstat(self._file.fileno()).st_ino
+
+    def _truncate_torn_tail(self):
+        """Drop a partial last line left by a crashed writer, so new lines start clean"""
+        size = os.fstat(self._file.fileno()).st_size
+        if not size:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(max(0, size - 64 * 1024))
+            tail = f.read()
+        if tail.endswith(b"\n"):
+            return
+        cut = tail.rfind(b"\n")
+        self._file.truncate(size - len(tail) + cut + 1 if cut >= 0 else max(0, size - len(tail)))
+
+    def _applied_seq(self) -> int:
+        try:
+            with open(self.config_path) as f:
+                return int(json.load(f).get(APPLIED_SEQ_KEY, 0))
+        except (OSError, ValueError, AttributeError):
+            return 0
+
+    def _file_key(self):
+        stat = os.fstat(self._file.fileno())
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _last_seq(self) -> int:
+        """Last sequence number in the log; call under _exclusive with the log open"""
+        # Unchanged since our own last write: no other process appended or compacted
+        if self._tail is not None and self._tail[:3] == self._file_key():
+            return self._tail[3]
+        seq = last_event_seq(self.path)
+        # A missing log (fresh checkout, deleted file) continues after what the config has absorbed
+        return self._applied_seq() if seq is None else seq
+
+    def _remember_tail(self, seq: int):
+        self._tail = self._file_key() + (seq,)
+
+    def _maybe_fsync(self, force: bool = False):
+        if self._file is None or not self._unsynced:
+            return
+        if force or self._unsynced >= self.fsync_every or time.monotonic() - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_fsync = time.monotonic()
+
+    def append(self, event: Dict) -> int:
+        """Append one event; returns its sequence number"""
+        return self.append_many([event])[-1]
+
+    def append_many(self, events: List[Dict]) -> List[int]:
+        """Append several events under one lock acquisition"""
+        with self._exclusive():
+            self._open()
+            self._truncate_torn_tail()
+            seq = self._last_seq()
+            lines = []
+            seqs = []
+            for event in events:
+                seq += 1
+                seqs.append(seq)
+                record = dict(event, seq=seq, ts=datetime.now().isoformat())
+                lines.append(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            self._remember_tail(seq)
+            self._unsynced += len(lines)
+            self._maybe_fsync()
+        return seqs
+
+    def sync(self):
+        """fsync anything appended since the last fsync"""
+        with self._lock:
+            self._maybe_fsync(force=True)
+
+    def pending(self) -> int:
+        """Events not yet folded into the config"""
+        applied = self._applied_seq()
+        return sum(1 for e in read_events(self.path) if e["seq"] > applied and e.get("type") != CHECKPOINT_EVENT)
+
+    def compact(self) -> int:
+        """Fold the log into the config, then truncate the log
+
+        The config is written atomically first and records the last applied
+        sequence number, so a crash between the two steps only means those
+        events are skipped as already applied on the next replay.
+
+        Returns:
+            Number of events folded in
+        """
+        try:
+            from .sports_api import SportsDataFetcher
+        except ImportError:
+            from sports_api import SportsDataFetcher
+
+        with self._exclusive():
+            events = [e for e in read_events(self.path) if e.get("type") != CHECKPOINT_EVENT]
+            config = SportsDataFetcher.load_config(self.config_path)
+            if config is None:
+                return 0
+            applied = int(config.get(APPLIED_SEQ_KEY, 0))
+            tail = [e for e in events if e["seq"] > applied]
+            if not tail:
+                return 0
+            for event in tail:
+                apply_event(config, event)
+            last_seq = tail[-1]["seq"]
+            config[APPLIED_SEQ_KEY] = last_seq
+            if not SportsDataFetcher.save_config(self.config_path, config):
+                return 0
+
+            # Replace the log with a checkpoint line so sequence numbers keep increasing
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                checkpoint = {"seq": last_seq, "type": CHECKPOINT_EVENT, "ts": datetime.now().isoformat()}
+                f.write(json.dumps(checkpoint, separators=(",", ":")).encode("utf-8") + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._unsynced = 0
+            self._open()
+            self._remember_tail(last_seq)
+            return len(tail)
+
+    def close(self):
+        with self._lock:
+            self._maybe_fsync(force=True)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class EventLogCompactor:
+    """Background thread that compacts the log every ``interval`` seconds"""
+
+    def __init__(self, log: EventLog, interval: float = 300.0):
+        self.log = log
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-log-compactor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                folded = self.log.compact()
+                if folded:
+                    logger.info("🗜️ Compacted %s ingest events into %s", folded, os.path.basename(self.log.config_path))
+            except Exception as e:
+                logger.error("Error compacting event log: %s", e)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Server-Sent Events Broker
+Pushes small delta events (scores, levels, games, refresh progress) to clients
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+
+EventId = Tuple[int, int]
+
+
+def format_event_id(event_id: EventId) -> str:
+    return f"{event_id[0]}-{event_id[1]}"
+
+
+def parse_event_id(value: Optional[str]) -> Optional[EventId]:
+    """An id from Last-Event-ID ("<snapshot version>-<n>"), None if missing or malformed"""
+    try:
+        version, index = str(value).split("-", 1)
+        return int(version), int(index)
+    except (TypeError, ValueError):
+        return None
+
+
+def format_sse(event_id: Optional[EventId], event: str, data: Dict) -> str:
+    """Format one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {format_event_id(event_id)}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def retry_later(seconds: float) -> str:
+    """Whole SSE body for a subscriber turned away: EventSource reconnects
+    after seconds (any non-200 status would make it give up for good)"""
+    return f"retry: {int(seconds * 1000)}\n\n"
+
+
+class EventBroker:
+    """
+    Fan-out of events to any number of SSE subscribers.
+
+    Events go into one shared ring buffer; a subscriber is only a cursor
+    (the last id it has seen) waiting on a shared condition, so idle
+    subscribers cost no queue or buffer of their own. ``astream`` waits on
+    an asyncio event loop instead, so idle subscribers don't hold a thread
+    either.
+
+    Event ids are "<snapshot version>-<n>": the version of the snapshot
+    the event belongs to (or the newest one, for refresh progress) and a
+    counter within it. Snapshot versions are the same in every worker, so
+    a client can resume with ``Last-Event-ID`` on any of them. When the
+    buffer doesn't reach back to that id (another worker's stream, a
+    restart, or an old id), the client gets a fresh "snapshot" event with
+    the current state and reloads instead of silently missing changes.
+    """
+
+    def __init__(self, history: int = 256, heartbeat: float = 15.0, max_stream_seconds: float = 300.0,
+                 max_subscribers: Optional[int] = None):
+        self.heartbeat = heartbeat
+        self.max_stream_seconds = max_stream_seconds
+        self.max_subscribers = max_subscribers
+        self._events = deque(maxlen=history)  # (id, event, data)
+        self._last_id: EventId = (0, 0)
+        self._subscribers = 0
+        self._cond = threading.Condition()
+        self._async_waiters = set()  # (loop, asyncio.Event) of astream subscribers
+
+    @property
+    def last_id(self) -> EventId:
+        return self._last_id
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._subscribers
+
+    @property
+    def full(self) -> bool:
+        """Whether another stream would go over max_subscribers"""
+        return self.max_subscribers is not None and self._subscribers >= self.max_subscribers
+
+    def publish(self, event: str, data: Dict, version: Optional[int] = None) -> EventId:
+        """Add an event and wake all waiting subscribers
+
+        Args:
+            version: Snapshot version the event belongs to; None files it
+                under the newest version published so far
+        """
+        with self._cond:
+            last_version, index = self._last_id
+            if version is not None and version > last_version:
+                self._last_id = (version, 0)
+            else:
+                self._last_id = (last_version, index + 1)
+            self._events.append((self._last_id, event, data))
+            self._cond.notify_all()
+            for loop, woken in self._async_waiters:
+                try:
+                    loop.call_soon_threadsafe(woken.set)
+                except RuntimeError:
+                    pass  # loop already closed
+            return self._last_id
+
+    def events_after(self, last_id: EventId) -> List[Tuple[EventId, str, Dict]]:
+        """Buffered events newer than last_id (oldest first)"""
+        with self._cond:
+            return [e for e in self._events if e[0] > last_id]
+
+    def can_resume(self, last_id: EventId) -> bool:
+        """Whether every event after last_id is still buffered (or there are none)"""
+        with self._cond:
+            if last_id >= self._last_id:
+                return True
+            return bool(self._events) and self._events[0][0] <= last_id
+
+    def wait_for_events(self, last_id: EventId, timeout: float) -> List[Tuple[EventId, str, Dict]]:
+        """Block until there are events newer than last_id or timeout passes"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._last_id > last_id, timeout)
+            return [e for e in self._events if e[0] > last_id]
+
+    async def wait_for_events_async(self, last_id: EventId, timeout: float) -> List[Tuple[EventId, str, Dict]]:
+        """wait_for_events for a subscriber on an asyncio event loop (holds no thread)"""
+        woken = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), woken)
+        with self._cond:
+            if self._last_id > last_id:
+                woken.set()
+            else:
+                self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(woken.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._async_waiters.discard(waiter)
+        return self.events_after(last_id)
+
+    def _open(self, last_event_id: Optional[EventId], hello: Optional[Dict]) -> Tuple[EventId, List[str]]:
+        """Starting cursor and opening messages for a new stream"""
+        # Ask EventSource to reconnect quickly when we end the stream
+        messages = ["retry: 3000\n\n"]
+        if last_event_id is None:
+            cursor = self._last_id
+            if hello is not None:
+                messages.append(format_sse(None, "hello", dict(hello, last_event_id=format_event_id(cursor))))
+        elif self.can_resume(last_event_id):
+            cursor = last_event_id
+        else:
+            cursor = self._last_id
+            if hello is not None:
+                messages.append(format_sse(cursor, "snapshot", dict(hello, resync=True)))
+        return cursor, messages
+
+    def stream(self, last_event_id: Optional[EventId] = None, hello: Optional[Dict] = None) -> Iterator[str]:
+        """Generate SSE text for one subscriber, waiting on the calling thread
+
+        Args:
+            last_event_id: Resume after this id (from the Last-Event-ID header);
+                None starts with only new events
+            hello: Current state; sent first as a "hello" event to new
+                subscribers, and as a "snapshot" event to resuming ones the
+                buffer can't catch up
+        """
+        with self._cond:
+            self._subscribers += 1
+        try:
+            cursor, messages = self._open(last_event_id, hello)
+            yield from messages
+
+            # Streams are closed periodically so worker slots get recycled;
+            # the client reconnects with Last-Event-ID and misses nothing
+            ends_at = time.monotonic() + self.max_stream_seconds
+            while time.monotonic() < ends_at:
+                events = self.wait_for_events(cursor, self.heartbeat)
+                if not events:
+                    yield ": keep-alive\n\n"
+                    continue
+                for event_id, event, data in events:
+                    yield format_sse(event_id, event, data)
+                cursor = events[-1][0]
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    async def astream(self, last_event_id: Optional[EventId] = None,
+                      hello: Optional[Dict] = None) -> AsyncIterator[str]:
+        """stream() for an asyncio event loop; same arguments and messages"""
+        with self._cond:
+            self._subscribers += 1
+        try:
+            cursor, messages = self._open(last_event_id, hello)
+            for message in messages:
+                yield message
+
+            ends_at = time.monotonic() + self.max_stream_seconds
+            while time.monotonic() < ends_at:
+                events = await self.wait_for_events_async(cursor, self.heartbeat)
+                if not events:
+                    yield ": keep-alive\n\n"
+                    continue
+                for event_id, event, data in events:
+                    yield format_sse(event_id, event, data)
+                cursor = events[-1][0]
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+
+def _entity_key(entity: Dict) -> Tuple[str, str]:
+    return entity.get("name", ""), entity.get("sport", "")
+
+
+def snapshot_events(old, new) -> List[Tuple[str, Dict]]:
+    """Work out the delta events between two snapshots
+
+    Returns:
+        List of (event, data) pairs: "snapshot" always, plus "score",
+        "level" and "game" events for whatever changed
+    """
+    events = []
+    new_dep = new.depression
+    events.append(("snapshot", {
+        "version": new.version,
+        "score": new_dep.get("score"),
+        "level": new_dep.get("level"),
+        "emoji": new_dep.get("emoji"),
+        "timestamp": new.built_at,
+    }))
+    if old is None:
+        return events
+
+    old_dep = old.depression
+    if old_dep.get("score") != new_dep.get("score"):
+        events.append(("score", {
+            "entity": None,
+            "old": old_dep.get("score"),
+            "new": new_dep.get("score"),
+        }))
+    if old_dep.get("level") != new_dep.get("level"):
+        events.append(("level", {
+            "old": old_dep.get("level"),
+            "new": new_dep.get("level"),
+            "emoji": new_dep.get("emoji"),
+            "score": new_dep.get("score"),
+        }))
+
+    old_entities = {_entity_key(e): e for e in old.entities}
+    for entity in new.entities:
+        before = old_entities.get(_entity_key(entity))
+        if before is None:
+            continue
+        if before.get("depression_points") != entity.get("depression_points"):
+            events.append(("score", {
+                "entity": entity["name"],
+                "sport": entity.get("sport"),
+                "old": before.get("depression_points"),
+                "new": entity.get("depression_points"),
+            }))
+        if before.get("recent_streak") != entity.get("recent_streak") or before.get("record") != entity.get("record"):
+            streak = entity.get("recent_streak") or []
+            events.append(("game", {
+                "team": entity["name"],
+                "sport": entity.get("sport"),
+                "result": streak[0] if streak else None,
+                "record": entity.get("record"),
+                "recent_streak": streak,
+            }))
+    return events
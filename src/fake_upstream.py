@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Fake Upstream Server
+Local HTTP stand-in for ESPN, OpenF1 and ESPN fantasy that serves archived responses
+"""
+
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from .upstream import PayloadArchive
+
+# Chunk size used when throttling response bodies
+THROTTLE_CHUNK = 4096
+
+
+class _TokenBucket:
+    """Allows ``rate`` requests per second with bursts up to ``rate``"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class FakeUpstreamServer:
+    """
+    Serves responses recorded in a PayloadArchive over plain HTTP.
+
+    A request for ``/<host>/<path>?<query>`` is answered with the archived
+    response for ``https://<host>/<path>?<query>`` (from ``run_id``, or the
+    latest capture of any run), which is what UpstreamSession sends when its
+    base URL points here. Unrecorded URLs get a 404.
+
+    Knobs for benchmarking and resilience tests:
+        latency / jitter: seconds added before each response (latency + uniform(0, jitter))
+        error_rate: fraction of requests answered with ``error_status`` instead
+        drop_rate: fraction of connections closed without any response
+        bytes_per_second: throttle response bodies to this rate per connection
+        requests_per_second: beyond this rate requests get 429 with Retry-After
+    """
+
+    def __init__(self, archive: PayloadArchive, run_id: Optional[str] = None,
+                 latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, drop_rate: float = 0.0,
+                 bytes_per_second: Optional[float] = None, requests_per_second: Optional[float] = None,
+                 seed: Optional[int] = None, host: str = "127.0.0.1", port: int = 0):
+        self.archive = archive
+        self.run_id = run_id
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.drop_rate = drop_rate
+        self.bytes_per_second = bytes_per_second
+        self.bucket = _TokenBucket(requests_per_second) if requests_per_second else None
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.stats = {"requests": 0, "served": 0, "missing": 0, "errors": 0, "dropped": 0,
+                      "throttled": 0, "bytes": 0}
+        self._stats_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve in a background thread; returns the base URL"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="fake-upstream", daemon=True)
+            self._thread.start()
+        return self.url
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _roll(self) -> float:
+        with self._random_lock:
+            return self._random.random()
+
+    def _delay(self) -> float:
+        with self._random_lock:
+            return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this, Nagle's
+            # algorithm plus delayed ACKs add ~40ms to every response
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, headers: Dict[str, str]):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if server.bytes_per_second:
+                    for start in range(0, len(body), THROTTLE_CHUNK):
+                        chunk = body[start:start + THROTTLE_CHUNK]
+                        self.wfile.write(chunk)
+                        time.sleep(len(chunk) / server.bytes_per_second)
+                else:
+                    self.wfile.write(body)
+                server._count("bytes", len(body))
+
+            def do_GET(self):
+                server._count("requests")
+                delay = server._delay()
+                if delay:
+                    time.sleep(delay)
+
+                if server.bucket is not None and not server.bucket.take():
+                    server._count("throttled")
+                    self._send(429, b"", {"Retry-After": "1"})
+                    return
+                if server.drop_rate and server._roll() < server.drop_rate:
+                    server._count("dropped")
+                    self.close_connection = True
+                    return
+                if server.error_rate and server._roll() < server.error_rate:
+                    server._count("errors")
+                    self._send(server.error_status, b"injected error", {"Content-Type": "text/plain"})
+                    return
+
+                # /<host>/<path>?<query>  ->  https://<host>/<path>?<query>
+                entry = server.archive.lookup(server.run_id, "https:/" + self.path)
+                if entry is None:
+                    server._count("missing")
+                    self._send(404, b"", {})
+                    return
+                server._count("served")
+                headers = {"Content-Type": entry["content_type"]} if entry["content_type"] else {}
+                self._send(entry["status"], server.archive.get(entry["sha256"]), headers)
+
+        return Handler
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Game Store
+SQLite-backed game history keyed by ESPN event ID, with indexed windowed queries
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .log import get_logger
+except ImportError:
+    # Fall back to a sibling import (when run as a script from src/)
+    from log import get_logger
+
+logger = get_logger(__name__)
+
+GAME_STORE_FILENAME = "games.sqlite3"
+
+# Games scored by the calculator per team (what the fetcher used to keep in recent_streak)
+RECENT_GAMES_WINDOW = 5
+# How far back rivalry losses count
+RIVALRY_WINDOW_DAYS = 365
+# Margin that makes a game a blowout
+BLOWOUT_MARGIN = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    event_id TEXT NOT NULL,
+    team TEXT NOT NULL,
+    sport TEXT NOT NULL,
+    date TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    result TEXT NOT NULL,
+    team_score REAL,
+    opponent_score REAL,
+    score_margin REAL,
+    is_home INTEGER NOT NULL DEFAULT 0,
+    is_overtime INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    -- The same event is stored once per tracked team (e.g. Mavericks vs Warriors)
+    PRIMARY KEY (event_id, team)
+);
+CREATE INDEX IF NOT EXISTS idx_games_team_date ON games (team, sport, date DESC);
+CREATE INDEX IF NOT EXISTS idx_games_team_result_date ON games (team, sport, result, date DESC);
+CREATE INDEX IF NOT EXISTS idx_games_opponent ON games (opponent COLLATE NOCASE, date DESC);
+CREATE INDEX IF NOT EXISTS idx_games_date ON games (date DESC);
+"""
+
+_COLUMNS = ("event_id", "team", "sport", "date", "opponent", "result", "team_score",
+            "opponent_score", "score_margin", "is_home", "is_overtime")
+
+
+def default_game_store_path(config_path: str) -> str:
+    """games.sqlite3 next to teams_config.json (override with GAME_STORE_PATH)"""
+    return os.environ.get("GAME_STORE_PATH") or os.path.join(
+        os.path.dirname(os.path.abspath(config_path)), GAME_STORE_FILENAME)
+
+
+def _row_to_game(row: sqlite3.Row) -> Dict:
+    game = dict(row)
+    game["is_home"] = bool(game["is_home"])
+    game["is_overtime"] = bool(game["is_overtime"])
+    game.pop("updated_at", None)
+    return game
+
+
+class GameStore:
+    """
+    Completed games for every tracked team.
+
+    Games are upserted by (ESPN event ID, team), so re-fetching a schedule
+    never duplicates rows and history is no longer limited to what fits in
+    teams_config.json. All reads are bounded by a row limit or date window
+    and served from the indexes above.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # Default rollback journal keeps the store a single file, so it can be
+        # committed alongside teams_config.json by the update workflow
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open_existing(cls, path: str) -> Optional["GameStore"]:
+        """Open the store only if it was already created (read paths never create files)"""
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            logger.warning("⚠️ Could not open game store %s: %s", path, e)
+            return None
+
+    def upsert_games(self, team: str, sport: str, games: Iterable[Dict]) -> int:
+        """Insert or update detailed games (from get_recent_games_detailed)
+
+        Games without an ESPN event ID or date can't be keyed and are skipped.
+
+        Returns:
+            Number of games written
+        """
+        now = datetime.now().isoformat()
+        rows = []
+        for game in games:
+            if not game.get("event_id") or not game.get("date"):
+                continue
+            rows.append((
+                str(game["event_id"]), team, sport, game["date"], game.get("opponent") or "Unknown",
+                game.get("result", "?"), game.get("team_score"), game.get("opponent_score"),
+                game.get("score_margin"), int(bool(game.get("is_home"))), int(bool(game.get("is_overtime"))), now,
+            ))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO games ({', '.join(_COLUMNS)}, updated_at)"
+                f" VALUES ({', '.join('?' for _ in _COLUMNS)}, ?)"
+                " ON CONFLICT(event_id, team) DO UPDATE SET"
+                " date = excluded.date, opponent = excluded.opponent, result = excluded.result,"
+                " team_score = excluded.team_score, opponent_score = excluded.opponent_score,"
+                " score_margin = excluded.score_margin, is_home = excluded.is_home,"
+                " is_overtime = excluded.is_overtime, updated_at = excluded.updated_at",
+                rows,
+            )
+        return len(rows)
+
+    def recent_games(self, team: str, sport: str, limit: int = RECENT_GAMES_WINDOW,
+                     since: Optional[str] = None) -> List[Dict]:
+        """Most recent games for a team, newest first"""
+        query = "SELECT * FROM games WHERE team = ? AND sport = ?"
+        params: list = [team, sport]
+        if since:
+            query += " AND date >= ?"
+            params.append(since)
+        query += " ORDER BY date DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [_row_to_game(r) for r in self._conn.execute(query, params).fetchall()]
+
+    def rivalry_losses(self, team: str, sport: str, rivals: List[str],
+                       days: int = RIVALRY_WINDOW_DAYS, limit: int = 50) -> List[Dict]:
+        """Losses to any of the rivals within the last ``days``, newest first"""
+        if not rivals:
+            return []
+        since = (datetime.now() - timedelta(days=days)).isoformat()
+        placeholders = ", ".join("?" for _ in rivals)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM games WHERE team = ? AND sport = ? AND result = 'L' AND date >= ?"
+                f" AND opponent COLLATE NOCASE IN ({placeholders}) ORDER BY date DESC LIMIT ?",
+                [team, sport, since, *rivals, limit],
+            ).fetchall()
+        return [_row_to_game(r) for r in rows]
+
+    def games_against(self, opponent: str, limit: int = 20) -> List[Dict]:
+        """Every tracked team's games against one opponent, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM games WHERE opponent = ? COLLATE NOCASE ORDER BY date DESC LIMIT ?",
+                (opponent, limit),
+            ).fetchall()
+        return [_row_to_game(r) for r in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
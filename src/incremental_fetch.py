@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Incremental Fetch
+Time-budgeted, resumable data refresh for runtimes with short execution limits
+"""
+
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from .checkpoint_store import CheckpointStore
+from .deadline import Deadline, scope as deadline_scope
+from .event_log import EventLog, source_event
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+FANTASY_SOURCE = "fantasy"
+
+# Checkpoint keys
+CURSOR_KEY = "fetch:cursor"          # the run in progress (pending/completed/failed sources)
+LAST_RUN_KEY = "fetch:last_run"      # summary of the last finished run
+RESULT_PREFIX = "fetch:result:"      # last successful payload per source
+COST_PREFIX = "fetch:cost:"          # smoothed seconds per source, used to plan the budget
+
+# Assumed cost of a source we haven't timed yet
+DEFAULT_SOURCE_COST = 3.0
+
+
+def source_priority(keys: List[str], store: CheckpointStore) -> List[str]:
+    """Order sources stalest first: never fetched, then oldest successful fetch
+
+    Ties keep the given (SOURCES) order.
+    """
+    results = store.items(RESULT_PREFIX)
+
+    def staleness(indexed):
+        index, key = indexed
+        fetched_at = results.get(RESULT_PREFIX + key, {}).get("fetched_at", "")
+        return fetched_at, index
+
+    return [key for _, key in sorted(enumerate(keys), key=staleness)]
+
+
+def run_incremental_fetch(fetcher, config_path: str, store: CheckpointStore, budget_seconds: float,
+                          progress: Optional[Callable[[str, str], None]] = None,
+                          clock: Callable[[], float] = time.monotonic) -> Dict:
+    """Fetch as many sources as fit in the budget, resuming where the last call stopped
+
+    A run covers every source once. Each call continues the current run
+    from its checkpointed cursor and stops before starting a source that
+    is not expected to finish within the budget (at least one source is
+    always attempted, so a run can't stall). The budget is also the
+    deadline for every upstream call the sources make, so a source that
+    runs long is cut off (and counted as failed) instead of overrunning
+    the call.
+
+    After every source the result and cursor are checkpointed together
+    and an event is appended to the fetcher's event log, so a call killed
+    mid-way loses at most the source in flight. A fetcher without one
+    (the cron function) gets a log for this call, compacted into the
+    config at the end; either way the config is only written under the
+    event log's lock, never racing the backend's compactor.
+
+    Args:
+        fetcher: SportsDataFetcher
+        config_path: Path to teams_config.json
+        store: Where the cursor and per-source results are kept
+        budget_seconds: Wall-clock time this call may spend fetching
+        progress: Optional progress(source_key, status) callback
+        clock: Monotonic clock (injectable for tests)
+
+    Returns:
+        Summary of this call: run id, sources fetched now, sources left, whether the run finished
+    """
+    started = clock()
+    deadline = Deadline(budget_seconds, clock)
+    config = fetcher.load_config(config_path)
+
+    cursor = store.get(CURSOR_KEY)
+    if cursor is None:
+        keys = [key for key, _, _ in fetcher.SOURCES]
+        if config is not None and "fantasy_team" in config and fetcher.fantasy_configured(config):
+            keys.append(FANTASY_SOURCE)
+        cursor = {
+            "run_id": uuid.uuid4().hex[:12],
+            "started_at": datetime.now().isoformat(),
+            "pending": source_priority(keys, store),
+            "completed": [],
+            "failed": [],
+        }
+        store.set(CURSOR_KEY, cursor)
+
+    event_log = getattr(fetcher, "event_log", None)
+    own_log = event_log is None
+    if own_log:
+        event_log = EventLog(config_path)
+
+    fetched = []
+    while cursor["pending"]:
+        key = cursor["pending"][0]
+        estimate = store.get(COST_PREFIX + key, DEFAULT_SOURCE_COST)
+        if fetched and estimate > deadline.remaining():
+            # Not enough time left; the next trigger picks up from here
+            break
+
+        if progress:
+            progress(key, "running")
+        source_started = clock()
+        try:
+            with deadline_scope(deadline):
+                if key == FANTASY_SOURCE:
+                    data = fetcher.fetch_fantasy_data(config["fantasy_team"]["espn"]) if config else None
+                else:
+                    data = fetcher.fetch_source(key)
+        except Exception as e:
+            logger.warning("Error fetching %s: %s", key, e)
+            data = None
+        elapsed = clock() - source_started
+
+        cursor["pending"].pop(0)
+        cursor["completed" if data else "failed"].append(key)
+        updates = {
+            CURSOR_KEY: cursor,
+            COST_PREFIX + key: round((estimate + elapsed) / 2, 3),
+        }
+        if data:
+            updates[RESULT_PREFIX + key] = {
+                "data": data,
+                "fetched_at": datetime.now().isoformat(),
+                "run_id": cursor["run_id"],
+            }
+        store.set_many(updates)
+        fetched.append(key)
+
+        # Persist partial progress right away
+        if data:
+            try:
+                event_log.append(source_event(key, data))
+                event_log.sync()
+            except OSError as e:
+                # e.g. a read-only deployment; the checkpointed result is kept
+                logger.warning("Could not log %s to %s: %s", key, event_log.path, e)
+        if progress:
+            progress(key, "done" if data else "failed")
+
+    if own_log:
+        try:
+            event_log.compact()
+        except OSError as e:
+            logger.warning("Could not compact %s: %s", event_log.path, e)
+        event_log.close()
+
+    finished = not cursor["pending"]
+    summary = {
+        "run_id": cursor["run_id"],
+        "fetched": fetched,
+        "remaining": list(cursor["pending"]),
+        "completed": list(cursor["completed"]),
+        "failed": list(cursor["failed"]),
+        "finished": finished,
+        "elapsed_seconds": round(clock() - started, 3),
+    }
+    if finished:
+        store.delete(CURSOR_KEY)
+        store.set(LAST_RUN_KEY, dict(summary, finished_at=datetime.now().isoformat()))
+    return summary
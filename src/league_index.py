@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+League Index
+Every team's record and recent games in a league, built from league-wide ESPN scoreboard and standings payloads
+"""
+
+import time
+import threading
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import requests
+
+try:
+    from .tracing import span
+    from .log import get_logger
+    from .checkpoint_store import CheckpointStore
+except ImportError:
+    # Fall back to a sibling import (when run as a script from src/)
+    from tracing import span
+    from log import get_logger
+    from checkpoint_store import CheckpointStore
+
+logger = get_logger(__name__)
+
+ESPN_SITE = "https://site.api.espn.com/apis/site/v2/sports"
+# Standings only exist under the non-"site" API
+ESPN_STANDINGS = "https://site.api.espn.com/apis/v2/sports"
+
+# Per league (keyed like SportsDataFetcher's API attributes): ESPN sport/league path,
+# days of scoreboard to index (enough for RECENT_GAMES_WINDOW games), extra scoreboard
+# query (college scoreboards only list featured games without a group), whether records have ties
+LEAGUES = {
+    'nfl': {'path': 'football/nfl', 'days': 42, 'query': '', 'ties': True},
+    'nba': {'path': 'basketball/nba', 'days': 14, 'query': '', 'ties': False},
+    'mlb': {'path': 'baseball/mlb', 'days': 7, 'query': '', 'ties': False},
+    'college_bball': {'path': 'basketball/mens-college-basketball', 'days': 21, 'query': '&groups=50', 'ties': False},
+    'college_football': {'path': 'football/college-football', 'days': 42, 'query': '&groups=80', 'ties': False},
+}
+
+# Seconds an index stays fresh while a game is in progress (or its payloads failed)
+LIVE_TTL = 300
+
+# Checkpoint key prefix for indexes shared between runs and processes
+CHECKPOINT_PREFIX = "league_index:"
+
+
+def scoreboard_url(league: str, start: date, end: date) -> str:
+    """One league's scoreboard for every day from start to end (inclusive)"""
+    spec = LEAGUES[league]
+    return (f"{ESPN_SITE}/{spec['path']}/scoreboard"
+            f"?dates={start:%Y%m%d}-{end:%Y%m%d}&limit=1000{spec['query']}")
+
+
+def standings_url(league: str) -> str:
+    return f"{ESPN_STANDINGS}/{LEAGUES[league]['path']}/standings"
+
+
+def _score(value) -> Optional[float]:
+    # Scores are a string on scoreboards and {"value": ...} on team schedules
+    if isinstance(value, dict):
+        value = value.get('value')
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _standings_entries(node: Dict) -> Iterator[Dict]:
+    """Standings entries from every group (conference, division) of a standings payload"""
+    yield from node.get('standings', {}).get('entries', [])
+    for child in node.get('children', []):
+        yield from _standings_entries(child)
+
+
+def _timestamp(value: str) -> Optional[float]:
+    """Epoch seconds of an ESPN event date ("2026-10-19T17:00Z"), None if unparseable"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def _names(team: Dict) -> List[str]:
+    names = [team.get(field) for field in ('displayName', 'shortDisplayName', 'name', 'abbreviation')]
+    if team.get('location') and team.get('name'):
+        names.append(f"{team['location']} {team['name']}")
+    return [name.lower() for name in names if name]
+
+
+class LeagueIndex:
+    """
+    In-memory index of every team's record and completed games, per league.
+
+    ``ingest`` pulls one standings payload and one scoreboard payload
+    (covering the league's last ``days``) and indexes every team in them.
+    Records and recent games for any team in the league, opponents
+    included, are then lookups, so a fetch costs two calls per league
+    rather than two per team plus one per opponent. Teams are looked up by
+    ESPN display name, short name, nickname or abbreviation (or a unique
+    substring of the display name).
+
+    An index stays fresh until its scoreboard can next change: the start
+    of the next game still to be played that day, LIVE_TTL while a game is
+    in progress, otherwise midnight. With a CheckpointStore, indexes are
+    shared with later runs and other processes until then, so separate
+    fetch runs on a quiet day make no calls at all.
+    """
+
+    def __init__(self, session: requests.Session, store: Optional[CheckpointStore] = None,
+                 today: Callable[[], date] = date.today, clock: Callable[[], float] = time.time):
+        self.session = session
+        self.store = store
+        self._today = today
+        self._clock = clock
+        # league -> {team id: {'names': [...], 'record': {...}}}
+        self._teams: Dict[str, Dict[str, Dict]] = {}
+        # league -> {team id: [game, ...]} newest first, in get_recent_games_detailed's format
+        self._games: Dict[str, Dict[str, List[Dict]]] = {}
+        # league -> (day indexed, epoch seconds the index is fresh until)
+        self._fresh: Dict[str, tuple] = {}
+        # Guards the dicts above and _league_locks; never held across a fetch
+        self._lock = threading.Lock()
+        # league -> lock held while that league is ingested, so one slow
+        # upstream league doesn't hold up the others
+        self._league_locks: Dict[str, threading.Lock] = {}
+
+    def _is_fresh(self, day: str, fresh_until: float, today: date) -> bool:
+        return day == today.isoformat() and self._clock() < fresh_until
+
+    def _league_lock(self, league: str) -> threading.Lock:
+        with self._lock:
+            return self._league_locks.setdefault(league, threading.Lock())
+
+    def _swap_in(self, league: str, teams: Dict, games: Dict, day: str, fresh_until: float):
+        with self._lock:
+            self._teams[league] = teams
+            self._games[league] = games
+            self._fresh[league] = (day, fresh_until)
+
+    def ingest(self, league: str) -> bool:
+        """Fetch and index league's standings and scoreboard unless the index is still fresh
+
+        Concurrent ingests of the same league wait for the first one; other
+        leagues, and readers, are never blocked by its HTTP calls.
+
+        Returns whether the league has an index (False if both payloads failed).
+        """
+        today = self._today()
+        with self._league_lock(league):
+            if league in self._fresh and self._is_fresh(*self._fresh[league], today):
+                return True
+            saved = self.store.get(CHECKPOINT_PREFIX + league) if self.store is not None else None
+            if saved and self._is_fresh(saved['day'], saved['fresh_until'], today):
+                self._swap_in(league, saved['teams'], saved['games'], saved['day'], saved['fresh_until'])
+                return True
+            with span("league_index.ingest", league=league):
+                teams: Dict[str, Dict] = {}
+                games: Dict[str, List[Dict]] = {}
+                standings = self._get_json(standings_url(league))
+                if standings is not None:
+                    self._index_standings(league, standings, teams)
+                start = today - timedelta(days=LEAGUES[league]['days'])
+                scoreboard = self._get_json(scoreboard_url(league, start, today))
+                if scoreboard is not None:
+                    self._index_scoreboard(scoreboard, teams, games)
+                if standings is None and scoreboard is None:
+                    return league in self._teams
+            for team_games in games.values():
+                team_games.sort(key=lambda game: game['date'], reverse=True)
+            fresh_until = self._fresh_until(standings, scoreboard, today)
+            self._swap_in(league, teams, games, today.isoformat(), fresh_until)
+            if self.store is not None:
+                try:
+                    self.store.set(CHECKPOINT_PREFIX + league, {'day': today.isoformat(), 'fresh_until': fresh_until,
+                                                                'teams': teams, 'games': games})
+                except Exception as e:
+                    logger.warning("League index: could not save %s: %s", league, e)
+            logger.info("Indexed %s %s teams and %s games", len(teams), league,
+                        sum(len(team_games) for team_games in games.values()) // 2)
+            return True
+
+    def _fresh_until(self, standings: Optional[Dict], scoreboard: Optional[Dict], today: date) -> float:
+        """When the index may next be out of date (epoch seconds)"""
+        now = self._clock()
+        if standings is None or scoreboard is None:
+            return now + LIVE_TTL
+        until = datetime.combine(today + timedelta(days=1), dtime.min).timestamp()
+        for event in scoreboard.get('events', []):
+            competitions = event.get('competitions') or [{}]
+            status_type = (competitions[0].get('status') or event.get('status') or {}).get('type', {})
+            if status_type.get('completed'):
+                continue
+            start = _timestamp(event.get('date', ''))
+            if status_type.get('state') == 'in' or (start is not None and start <= now):
+                # Under way (or overdue): results and standings are moving
+                return now + LIVE_TTL
+            if start is not None:
+                until = min(until, start)
+        return until
+
+    def _get_json(self, url: str) -> Optional[Dict]:
+        try:
+            response = self.session.get(url, timeout=10)
+            if response.status_code == 200:
+                return response.json()
+            logger.warning("League index: %s returned %s", url, response.status_code)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.warning("League index: error fetching %s: %s", url, e)
+        return None
+
+    @staticmethod
+    def _team(teams: Dict[str, Dict], team: Dict) -> Dict:
+        entry = teams.setdefault(str(team.get('id')), {'names': [], 'record': None})
+        for name in _names(team):
+            if name not in entry['names']:
+                entry['names'].append(name)
+        return entry
+
+    def _index_standings(self, league: str, payload: Dict, teams: Dict[str, Dict]):
+        for item in _standings_entries(payload):
+            team = item.get('team') or {}
+            if not team.get('id'):
+                continue
+            stats = {stat.get('name'): stat.get('value') for stat in item.get('stats', [])}
+            wins = int(float(stats.get('wins') or 0))
+            losses = int(float(stats.get('losses') or 0))
+            record = {'wins': wins, 'losses': losses}
+            played = wins + losses
+            if LEAGUES[league]['ties']:
+                record['ties'] = int(float(stats.get('ties') or 0))
+                played += record['ties']
+            record['win_percentage'] = wins / played if played > 0 else 0
+            self._team(teams, team)['record'] = record
+
+    def _index_scoreboard(self, payload: Dict, teams: Dict[str, Dict], games: Dict[str, List[Dict]]):
+        for event in payload.get('events', []):
+            competitions = event.get('competitions', [])
+            if not competitions:
+                continue
+            comp = competitions[0]
+            status = comp.get('status') or event.get('status') or {}
+            status_type = status.get('type', {})
+            competitors = comp.get('competitors', [])
+            if not status_type.get('completed') or len(competitors) != 2:
+                continue
+            scores = [_score(c.get('score')) for c in competitors]
+            if None in scores:
+                continue
+            status_name = str(status_type.get('name', '')).upper()
+            for (team, other), (score, other_score) in (((competitors[0], competitors[1]), (scores[0], scores[1])),
+                                                        ((competitors[1], competitors[0]), (scores[1], scores[0]))):
+                if score == other_score and not team.get('winner') and not other.get('winner'):
+                    result = 'T'
+                elif team.get('winner') or (team.get('winner') is None and score > other_score):
+                    result = 'W'
+                else:
+                    result = 'L'
+                team_info = team.get('team', {})
+                self._team(teams, team_info)
+                games.setdefault(str(team_info.get('id')), []).append({
+                    'event_id': event.get('id'),
+                    'result': result,
+                    'date': event.get('date', ''),
+                    'opponent': other.get('team', {}).get('displayName', 'Unknown'),
+                    'team_score': int(score),
+                    'opponent_score': int(other_score),
+                    'score_margin': int(abs(score - other_score)),
+                    'is_home': team.get('homeAway', '').lower() == 'home',
+                    'is_overtime': 'OT' in status_name or 'OVERTIME' in status_name,
+                })
+
+    def team_id(self, league: str, team_name: str) -> Optional[str]:
+        """ESPN id of the team called team_name in league's index, or None"""
+        return self._find(self._teams.get(league, {}), team_name)
+
+    @staticmethod
+    def _find(teams: Dict[str, Dict], team_name: str) -> Optional[str]:
+        needle = team_name.lower().strip()
+        for team_id, entry in teams.items():
+            if needle in entry['names']:
+                return team_id
+        matches = [team_id for team_id, entry in teams.items() if entry['names'] and needle in entry['names'][0]]
+        return matches[0] if len(matches) == 1 else None
+
+    def team_record(self, league: str, team_name: str) -> Optional[Dict]:
+        """Record in get_team_record's format, or None if the team isn't indexed with one"""
+        # One read of the league's index, which an ingest may swap out meanwhile
+        teams = self._teams.get(league, {})
+        team_id = self._find(teams, team_name)
+        record = teams[team_id]['record'] if team_id is not None else None
+        return dict(record) if record else None
+
+    def recent_games(self, league: str, team_name: str, num_games: int = 5) -> List[Dict]:
+        """Completed games within the indexed days, newest first, in get_recent_games_detailed's format"""
+        team_id = self.team_id(league, team_name)
+        if team_id is None:
+            return []
+        return [dict(game) for game in self._games.get(league, {}).get(team_id, [])[:num_games]]
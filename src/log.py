@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Logging
+Queue-backed logging shared by every module, with levels and rate-limited repeats
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from typing import Dict, Optional, Tuple
+
+try:
+    from .metrics import LOG_RECORDS_DROPPED
+except ImportError:
+    # Fall back to a sibling import (when run as a script from src/)
+    from metrics import LOG_RECORDS_DROPPED
+
+# Every module logs under this namespace (dashboard.sports_api, dashboard.snapshot, ...)
+ROOT_LOGGER = "dashboard"
+
+# Records waiting for the writer thread; beyond this they are dropped rather than blocking callers
+QUEUE_SIZE = 10000
+
+# Identical warnings (same logger, level and message template) are let through once per interval
+RATE_LIMIT_INTERVAL = float(os.environ.get("LOG_RATE_LIMIT_INTERVAL", 60))
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets a repeated warning through at most once per ``interval`` seconds.
+
+    Repeats are keyed by the formatted message, so the same error from
+    one source is limited without hiding a different source's errors
+    logged from the same call site. The next record let through for a key
+    reports how many repeats were dropped in between.
+    """
+
+    def __init__(self, interval: float = RATE_LIMIT_INTERVAL, min_level: int = logging.WARNING,
+                 max_keys: int = 1024):
+        super().__init__()
+        self.interval = interval
+        self.min_level = min_level
+        self.max_keys = max_keys
+        # key -> [last emitted (monotonic), suppressed since]
+        self._seen: Dict[Tuple[str, int, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level or self.interval <= 0:
+            return True
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is not None and now - seen[0] < self.interval:
+                seen[1] += 1
+                return False
+            suppressed = seen[1] if seen is not None else 0
+            if seen is None and len(self._seen) >= self.max_keys:
+                self._seen.clear()
+            self._seen[key] = [now, 0]
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} identical messages suppressed)"
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line (LOG_FORMAT=json)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            # QueueHandler already rendered any traceback into the message
+            "message": record.getMessage(),
+        }
+        return json.dumps(entry)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: when the writer falls behind, new records are counted and dropped"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+
+class _ReportingQueueListener(logging.handlers.QueueListener):
+    """Writes a warning after records that follow a gap where the queue dropped some"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._reported = _DroppingQueueHandler.dropped
+
+    def handle(self, record: logging.LogRecord):
+        super().handle(record)
+        dropped = _DroppingQueueHandler.dropped
+        if dropped != self._reported:
+            note = logging.LogRecord(ROOT_LOGGER, logging.WARNING, __file__, 0,
+                                     "%s log records dropped (log queue full)", (dropped - self._reported,), None)
+            self._reported = dropped
+            super().handle(note)
+
+
+_listener: Optional[_ReportingQueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def _output_handler(stream) -> logging.Handler:
+    handler = logging.StreamHandler(stream)
+    if os.environ.get("LOG_FORMAT", "text").lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    return handler
+
+
+def setup(level: Optional[str] = None, stream=None) -> logging.Logger:
+    """Route the dashboard loggers through a background writer thread (idempotent)
+
+    Callers only pay for filtering, formatting the message and a queue put;
+    the stream write happens on the listener thread. LOG_LEVEL sets the
+    level (default INFO), LOG_FORMAT=json switches to JSON lines.
+    """
+    global _listener
+    logger = logging.getLogger(ROOT_LOGGER)
+    with _setup_lock:
+        if _listener is not None:
+            return logger
+        log_queue = queue.Queue(QUEUE_SIZE)
+        handler = _DroppingQueueHandler(log_queue)
+        handler.addFilter(RateLimitFilter())
+        logger.handlers[:] = [handler]
+        logger.setLevel((level or os.environ.get("LOG_LEVEL") or "INFO").upper())
+        logger.propagate = False
+        _listener = _ReportingQueueListener(log_queue, _output_handler(stream or sys.stderr),
+                                            respect_handler_level=True)
+        _listener.start()
+    return logger
+
+
+def shutdown():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _restart_after_fork():
+    # The writer thread doesn't survive fork (e.g. gunicorn workers); start a fresh one
+    global _listener, _setup_lock
+    _setup_lock = threading.Lock()
+    if _listener is not None:
+        _listener = None
+        setup()
+
+
+atexit.register(shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a module: get_logger(__name__) -> dashboard.<module>"""
+    setup()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name.rsplit('.', 1)[-1]}")
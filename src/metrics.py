@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Metrics
+In-process counters and latency histograms, rendered in Prometheus text format for /api/metrics
+"""
+
+import re
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cached responses (sub-millisecond) up to slow upstream calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels (Prometheus semantics)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(str(labels[name]) for name in self.labelnames))
+        return series[2] if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*s[0]], s[1], s[2])) for key, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """The set of metrics one process exposes"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for metric in list(self._metrics):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "dashboard_request_duration_seconds", "API request latency by route",
+    ("route", "method", "status"))
+UPSTREAM_DURATION = REGISTRY.histogram(
+    "dashboard_upstream_request_duration_seconds", "Upstream HTTP call latency",
+    ("host", "endpoint", "status"))
+UPSTREAM_BYTES = REGISTRY.counter(
+    "dashboard_upstream_response_bytes_total", "Bytes received from upstream APIs",
+    ("host", "endpoint"))
+UPSTREAM_SHORT_CIRCUITS = REGISTRY.counter(
+    "dashboard_upstream_short_circuits_total",
+    "Upstream calls answered without the network (open circuit or negative cache), by whether stale data was served",
+    ("host", "reason", "served"))
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "dashboard_upstream_retries_total", "Upstream calls retried, by host and what failed (status code or error)",
+    ("host", "reason"))
+UPSTREAM_THROTTLE_SECONDS = REGISTRY.counter(
+    "dashboard_upstream_throttle_seconds_total", "Time spent waiting on the per-host rate limiter",
+    ("host",))
+CACHE_REQUESTS = REGISTRY.counter(
+    "dashboard_cache_requests_total", "Cache lookups by cache and result (hit/miss)",
+    ("cache", "result"))
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "dashboard_log_records_dropped_total", "Log records dropped because the log queue was full")
+CALCULATOR_DURATION = REGISTRY.histogram(
+    "dashboard_calculator_seconds", "Time spent loading and scoring the calculator",
+    ("operation",))
+
+_NUMERIC_SEGMENT = re.compile(r"^\d+$")
+
+
+def endpoint_pattern(url: str) -> Tuple[str, str]:
+    """(host, path with numeric IDs collapsed), so label values stay bounded
+
+    e.g. https://site.api.espn.com/.../nfl/teams/6/schedule -> .../nfl/teams/{id}/schedule
+    """
+    parts = urlsplit(url)
+    path = "/".join("{id}" if _NUMERIC_SEGMENT.match(segment) else segment for segment in parts.path.split("/"))
+    return parts.netloc, path or "/"
+
+
+def record_upstream(url: str, status: Optional[int], seconds: float, size: int = 0):
+    """Record one upstream call (status None for a connection error)"""
+    host, endpoint = endpoint_pattern(url)
+    UPSTREAM_DURATION.observe(seconds, host=host, endpoint=endpoint, status=status if status is not None else "error")
+    if size:
+        UPSTREAM_BYTES.inc(size, host=host, endpoint=endpoint)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+API Payload Builders
+Turns a loaded DepressionCalculator into the JSON bodies served by the API
+"""
+
+from datetime import datetime
+from typing import Dict, List
+
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+def build_depression_payload(calc) -> Dict:
+    """Build the /api/depression body (without timestamp)"""
+    result = calc.calculate_total_depression()
+    # Use total_score (0-100) for level calculation
+    emoji, level = calc.get_depression_level(result["total_score"])
+    return {
+        "success": True,
+        "score": round(result["total_score"], 1),  # Scaled score (0-100)
+        "level": level,
+        "emoji": emoji,
+        "breakdown": result["breakdown"],
+    }
+
+
+def build_teams_payload(calc) -> Dict:
+    """Build the /api/teams body (without timestamp)"""
+    return {
+        "success": True,
+        "teams": build_team_entries(calc),
+    }
+
+
+def build_team_entries(calc) -> List[Dict]:
+    """Build one entry per team, F1 driver and fantasy team"""
+    teams_data = []
+
+    # Get team data
+    for team in calc.teams:
+        team_result = team.calculate_depression()
+        total_games = team.wins + team.losses + getattr(team, 'ties', 0)
+        win_percentage = round((team.wins / total_games * 100), 1) if total_games > 0 else 0
+        teams_data.append({
+            "name": team.name,
+            "sport": team.sport,
+            "wins": team.wins,
+            "losses": team.losses,
+            "ties": getattr(team, 'ties', 0),
+            "record": f"{team.wins}-{team.losses}" + (f"-{team.ties}" if hasattr(team, 'ties') and team.ties > 0 else ""),
+            "win_percentage": win_percentage,
+            "recent_streak": team.recent_streak,
+            "depression_points": round(team_result["score"], 1),
+            "breakdown": team_result["breakdown"],
+            "expected_performance": team.expected_performance,
+            "jasons_expectations": team.jasons_expectations,
+            "rivals": team.rivals,
+            "recent_rivalry_losses": team.recent_rivalry_losses,
+            "interest_level": team.interest_level,
+            "notes": team.notes
+        })
+
+    # Get F1 driver data
+    if calc.f1_driver:
+        f1_result = calc.f1_driver.calculate_depression()
+        teams_data.append({
+            "name": calc.f1_driver.name,
+            "sport": "F1",
+            "wins": calc.f1_driver.recent_races.count("W"),
+            "losses": len([r for r in calc.f1_driver.recent_races if r not in ["W", "P2", "P3"]]),
+            "record": f"P{calc.f1_driver.championship_position}",
+            "win_percentage": (calc.f1_driver.recent_races.count("W") / len(calc.f1_driver.recent_races) * 100) if calc.f1_driver.recent_races else 0,
+            "recent_streak": calc.f1_driver.recent_races,
+            "depression_points": round(f1_result["score"], 1),
+            "breakdown": f1_result["breakdown"],
+            "championship_position": calc.f1_driver.championship_position,
+            "recent_dnfs": calc.f1_driver.recent_dnfs,
+            "expected_performance": calc.f1_driver.expected_performance,
+            "jasons_expectations": calc.f1_driver.jasons_expectations,
+            "notes": calc.f1_driver.notes
+        })
+
+    # Get fantasy team data
+    if calc.fantasy_team:
+        fantasy_result = calc.fantasy_team.calculate_depression()
+        teams_data.append({
+            "name": calc.fantasy_team.name,
+            "sport": "Fantasy",
+            "wins": calc.fantasy_team.wins,
+            "losses": calc.fantasy_team.losses,
+            "record": f"{calc.fantasy_team.wins}-{calc.fantasy_team.losses}",
+            "win_percentage": round((calc.fantasy_team.wins / (calc.fantasy_team.wins + calc.fantasy_team.losses) * 100), 1) if (calc.fantasy_team.wins + calc.fantasy_team.losses) > 0 else 0,
+            "recent_streak": calc.fantasy_team.recent_streak,
+            "depression_points": round(fantasy_result["score"], 1),
+            "breakdown": fantasy_result["breakdown"],
+            "expected_performance": calc.fantasy_team.expected_performance,
+            "jasons_expectations": calc.fantasy_team.jasons_expectations
+        })
+    else:
+        # Debug: log why fantasy team is missing
+        fantasy_config = calc.config.get('fantasy_team', {})
+        espn_config = fantasy_config.get('espn', {})
+        logger.warning("⚠️ Fantasy team is None while building team payloads "
+                       "(config fantasy_team keys: %s, ESPN league_id: %s, year: %s)",
+                       list(fantasy_config.keys()), espn_config.get('league_id'), espn_config.get('year'))
+
+    return teams_data
+
+
+def _relative_days_ago(game_date: str) -> str:
+    """Format an ISO date as Today / Yesterday / N days ago"""
+    if not game_date:
+        return "Unknown date"
+    try:
+        from dateutil import parser as date_parser
+        parsed_date = date_parser.parse(game_date)
+        now = datetime.now(parsed_date.tzinfo) if parsed_date.tzinfo else datetime.now()
+        days_ago = (now.date() - parsed_date.date()).days
+        if days_ago == 0:
+            return "Today"
+        elif days_ago == 1:
+            return "Yesterday"
+        return f"{days_ago} days ago"
+    except Exception:
+        return game_date
+
+
+def _placeholder_game(date: str, team: str, sport: str, result: str, event_type: str, opponent: str = "") -> Dict:
+    """Timeline entry for results we only know as W/L (no detailed game data)"""
+    return {
+        "date": date,
+        "datetime": "",
+        "team": team,
+        "sport": sport,
+        "result": result,
+        "type": event_type,
+        "opponent": opponent,
+        "team_score": 0,
+        "opponent_score": 0,
+        "score_margin": 0,
+        "is_home": False,
+        "is_overtime": False,
+        "is_rivalry": False
+    }
+
+
+def build_recent_games_payload(calc, fetcher=None) -> Dict:
+    """Build the /api/recent-games body (without timestamp)
+
+    Args:
+        calc: Loaded DepressionCalculator
+        fetcher: Optional SportsDataFetcher used for detailed game data;
+            without it only the W/L streaks from the config are used
+    """
+    games = []
+
+    # Process team games with enhanced data
+    for team in calc.teams:
+        if not team.recent_streak:
+            continue
+
+        # Try to get detailed game data
+        detailed_games = []
+        if fetcher:
+            try:
+                if team.sport == 'NFL':
+                    detailed_games = fetcher.nfl.get_recent_games_detailed(team.name, 5)
+                elif team.sport == 'NBA':
+                    detailed_games = fetcher.nba.get_recent_games_detailed(team.name, 5)
+                elif team.sport == 'NCAA Basketball':
+                    detailed_games = fetcher.college_bball.get_recent_games_detailed(team.name, 5)
+                elif team.sport == 'NCAA Football':
+                    detailed_games = fetcher.college_football.get_recent_games_detailed(team.name, 5)
+            except Exception as e:
+                # Fallback to basic data if detailed fetch fails
+                logger.warning("⚠️ Failed to fetch detailed games for %s (%s): %s", team.name, team.sport, e)
+                detailed_games = []
+
+        # Use detailed data if available, otherwise use basic
+        if detailed_games:
+            rivals = [r.lower() for r in team.rivals]
+            for game in detailed_games:
+                game_date = game.get('date', '')
+                games.append({
+                    "date": _relative_days_ago(game_date),
+                    "datetime": game_date,
+                    "team": team.name,
+                    "sport": team.sport,
+                    "result": game.get('result', '?'),
+                    "type": "game",
+                    "opponent": game.get('opponent', 'Unknown'),
+                    "team_score": game.get('team_score', 0),
+                    "opponent_score": game.get('opponent_score', 0),
+                    "score_margin": game.get('score_margin', 0),
+                    "is_home": game.get('is_home', False),
+                    "is_overtime": game.get('is_overtime', False),
+                    "is_rivalry": game.get('opponent', '').lower() in rivals
+                })
+        else:
+            for i, result in enumerate(team.recent_streak[:5]):
+                games.append(_placeholder_game(
+                    f"{len(team.recent_streak) - i} days ago", team.name, team.sport, result, "game", "Unknown"))
+
+    # Process F1 races
+    if calc.f1_driver and calc.f1_driver.recent_races:
+        races = calc.f1_driver.recent_races
+        for i, result in enumerate(races[:5]):
+            games.append(_placeholder_game(f"{len(races) - i} races ago", calc.f1_driver.name, "F1", result, "race"))
+
+    # Process fantasy games
+    if calc.fantasy_team and calc.fantasy_team.recent_streak:
+        streak = calc.fantasy_team.recent_streak
+        for i, result in enumerate(streak[:5]):
+            games.append(_placeholder_game(f"Week {len(streak) - i}", calc.fantasy_team.name, "Fantasy", result, "fantasy"))
+
+    # Sort by datetime if available, otherwise keep entries without one last
+    def sort_key(game):
+        dt = game.get('datetime', '')
+        if dt:
+            try:
+                from dateutil import parser as date_parser
+                return date_parser.parse(dt).replace(tzinfo=None)
+            except Exception:
+                pass
+        return datetime.min
+
+    games.sort(key=sort_key, reverse=True)
+
+    return {
+        "success": True,
+        "games": games[:20],  # Last 20 events
+    }
+
+
+# Teams whose schedules feed /api/upcoming-events: (API attribute, ESPN path, ESPN team ID, name, sport)
+UPCOMING_SCHEDULES = [
+    ('nfl', 'football/nfl', 6, 'Dallas Cowboys', 'NFL'),
+    ('nba', 'basketball/nba', 6, 'Dallas Mavericks', 'NBA'),
+    ('nba', 'basketball/nba', 9, 'Golden State Warriors', 'NBA'),
+]
+
+
+def _fetch_upcoming_games(api, league_path: str, team_id: int, team_name: str, sport: str) -> List[Dict]:
+    """Get the not-yet-completed games from an ESPN team schedule"""
+    upcoming = []
+    url = f"https://site.api.espn.com/apis/site/v2/sports/{league_path}/teams/{team_id}/schedule"
+    response = api.session.get(url, timeout=10)
+    if response.status_code != 200:
+        return upcoming
+
+    for event in response.json().get('events', []):
+        competitions = event.get('competitions', [])
+        if not competitions:
+            continue
+        comp = competitions[0]
+        if comp.get('status', {}).get('type', {}).get('completed', False):
+            continue
+
+        competitors = comp.get('competitors', [])
+        if len(competitors) != 2:
+            continue
+        away = next((c for c in competitors if c.get('homeAway') != 'home'), None)
+        home = next((c for c in competitors if c.get('homeAway') == 'home'), None)
+        is_home = bool(home and home.get('team', {}).get('id') == str(team_id))
+        if is_home:
+            opponent = away.get('team', {}).get('displayName') if away else None
+        elif away and away.get('team', {}).get('id') == str(team_id):
+            opponent = home.get('team', {}).get('displayName') if home else None
+        else:
+            opponent = None
+
+        if opponent:
+            upcoming.append({
+                "date": event.get('date', ''),
+                "team": team_name,
+                "sport": sport,
+                "opponent": opponent,
+                "type": "game",
+                "is_home": is_home
+            })
+    return upcoming
+
+
+def build_upcoming_events_payload(fetcher) -> Dict:
+    """Build the /api/upcoming-events body (without timestamp)"""
+    from dateutil import parser as date_parser
+
+    upcoming_events = []
+    for api_name, league_path, team_id, team_name, sport in UPCOMING_SCHEDULES:
+        try:
+            upcoming_events.extend(
+                _fetch_upcoming_games(getattr(fetcher, api_name), league_path, team_id, team_name, sport))
+        except Exception as e:
+            logger.warning("Error fetching upcoming games for %s: %s", team_name, e)
+
+    # Sort by date (upcoming first)
+    upcoming_events.sort(key=lambda x: x.get("date", ""))
+
+    # Format dates and limit to next 10 events
+    formatted_events = []
+    for event in upcoming_events[:10]:
+        try:
+            event_date = date_parser.parse(event["date"])
+            now = datetime.now(event_date.tzinfo) if event_date.tzinfo else datetime.now()
+            days_until = (event_date.date() - now.date()).days
+
+            if days_until >= 0:
+                if days_until == 0:
+                    date_str = "Today"
+                elif days_until == 1:
+                    date_str = "Tomorrow"
+                else:
+                    date_str = f"In {days_until} days"
+
+                formatted_events.append({
+                    "date": date_str,
+                    "datetime": event["date"],
+                    "team": event["team"],
+                    "sport": event["sport"],
+                    "opponent": event.get("opponent", "TBD"),
+                    "type": event["type"],
+                    "is_home": event.get("is_home", False)
+                })
+        except Exception as e:
+            logger.error("Error formatting date: %s", e)
+
+    return {
+        "success": True,
+        "events": formatted_events,
+    }
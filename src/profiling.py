@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Profiling
+Opt-in cProfile (or sampling) captures of single requests and fetch runs, stored locally
+"""
+
+import os
+import io
+import re
+import hmac
+import json
+import time
+import uuid
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional
+
+from .log import get_logger
+
+# Optional sampling profiler
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+    HAS_PYINSTRUMENT = True
+except ImportError:
+    HAS_PYINSTRUMENT = False
+
+logger = get_logger(__name__)
+
+PROFILE_DIRNAME = "profiles"
+
+# Header that carries PROFILE_TOKEN: profiles that one request, and authorizes the admin routes
+TOKEN_HEADER = "X-Profile-Token"
+# Optional header picking the profiler for that request ("cprofile" or "sample")
+MODE_HEADER = "X-Profile-Mode"
+
+MODES = ("cprofile", "sample")
+
+# Lines of the cumulative-time table kept in each capture's text summary
+SUMMARY_LINES = 60
+
+_CAPTURE_ID = re.compile(r"^[0-9]{8}-[0-9]{12}-[0-9a-f]{6}$")
+
+
+def default_profile_dir(config_path: str) -> str:
+    """profiles/ next to teams_config.json (override with PROFILE_DIR)"""
+    return os.environ.get("PROFILE_DIR") or os.path.join(
+        os.path.dirname(os.path.abspath(config_path)), PROFILE_DIRNAME)
+
+
+class Capture:
+    """One running profile; ``stop`` writes it to the store"""
+
+    def __init__(self, store: "ProfileStore", name: str, mode: str):
+        self.store = store
+        self.name = name
+        self.mode = mode
+        # Sortable by start time, so listing newest-first is a reverse sort of file names
+        self.id = f"{datetime.now().strftime('%Y%m%d-%H%M%S%f')}-{uuid.uuid4().hex[:6]}"
+        self.started_at = datetime.now().isoformat()
+        self.meta: Optional[Dict] = None
+        self._profiler = SamplingProfiler() if mode == "sample" else cProfile.Profile()
+        self._started = time.perf_counter()
+        if mode == "sample":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> Optional[Dict]:
+        """Stop profiling and save the capture (idempotent); returns its metadata"""
+        if self.meta is not None:
+            return self.meta
+        duration = time.perf_counter() - self._started
+        if self.mode == "sample":
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+        self.meta = {
+            "id": self.id,
+            "name": self.name,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "duration_s": round(duration, 6),
+        }
+        try:
+            self.store._save(self, self._profiler)
+        except Exception as e:
+            logger.warning("⚠️ Could not save profile %s: %s", self.id, e)
+        return self.meta
+
+
+class ProfileStore:
+    """
+    Directory of profile captures.
+
+    Nothing is profiled unless asked for, either for every run of a kind
+    via the PROFILE env var (comma-separated: ``requests``, ``fetch`` or
+    ``all``) or for a single request carrying ``X-Profile-Token`` equal to
+    PROFILE_TOKEN. When neither is set, ``wants`` is a set lookup and the
+    code being profiled runs untouched.
+
+    Each capture is ``<id>.json`` (metadata), ``<id>.txt`` (a readable
+    summary) and, for cProfile, ``<id>.prof`` (pstats data for snakeviz or
+    ``python -m pstats``). Only the newest ``keep`` captures are kept.
+    cProfile only sees the thread that started the capture.
+    """
+
+    def __init__(self, root: str, keep: int = 50, targets: Optional[str] = None,
+                 token: Optional[str] = None, mode: Optional[str] = None):
+        self.root = root
+        self.keep = keep
+        targets = os.environ.get("PROFILE", "") if targets is None else targets
+        self.targets = {t.strip() for t in targets.split(",") if t.strip()}
+        self.token = os.environ.get("PROFILE_TOKEN") if token is None else token
+        self.mode = self._resolve_mode(mode or os.environ.get("PROFILE_MODE") or "cprofile")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _resolve_mode(mode: str) -> str:
+        mode = mode.strip().lower()
+        if mode == "sample" and not HAS_PYINSTRUMENT:
+            logger.warning("⚠️ Sampling profiles need pyinstrument; using cProfile")
+            return "cprofile"
+        return mode if mode in MODES else "cprofile"
+
+    def authorized(self, headers: Optional[Mapping[str, str]]) -> bool:
+        """Whether the headers carry the profiling token (always False when no token is configured)"""
+        if not self.token or headers is None:
+            return False
+        supplied = headers.get(TOKEN_HEADER)
+        return bool(supplied) and hmac.compare_digest(supplied.encode("utf-8"), self.token.encode("utf-8"))
+
+    def wants(self, kind: str, headers: Optional[Mapping[str, str]] = None) -> Optional[str]:
+        """Profiler mode to use for this run of kind ("requests"/"fetch"), or None to not profile"""
+        if kind in self.targets or "all" in self.targets:
+            return self.mode
+        if self.token and headers is not None and self.authorized(headers):
+            requested = headers.get(MODE_HEADER)
+            return self._resolve_mode(requested) if requested else self.mode
+        return None
+
+    def start(self, name: str, mode: Optional[str] = None) -> Optional[Capture]:
+        """Start a capture (None if another profiler already owns this interpreter)"""
+        try:
+            return Capture(self, name, mode or self.mode)
+        except (ValueError, RuntimeError) as e:
+            logger.warning("⚠️ Could not start profile %s: %s", name, e)
+            return None
+
+    @contextmanager
+    def maybe(self, kind: str, name: str, headers: Optional[Mapping[str, str]] = None):
+        """Profile the with-block if this kind of run is wanted; yields the Capture or None"""
+        mode = self.wants(kind, headers)
+        if mode is None:
+            yield None
+            return
+        capture = self.start(name, mode)
+        try:
+            yield capture
+        finally:
+            if capture is not None:
+                meta = capture.stop()
+                logger.info("🔬 Profile %s saved (%s, %.3fs)", meta['id'], meta['name'], meta['duration_s'])
+
+    def _path(self, capture_id: str, ext: str) -> str:
+        return os.path.join(self.root, f"{capture_id}.{ext}")
+
+    def _save(self, capture: Capture, profiler):
+        os.makedirs(self.root, exist_ok=True)
+        files = ["txt"]
+        if capture.mode == "sample":
+            summary = profiler.output_text(unicode=True, color=False)
+        else:
+            profiler.dump_stats(self._path(capture.id, "prof"))
+            files.append("prof")
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(SUMMARY_LINES)
+            summary = out.getvalue()
+        with open(self._path(capture.id, "txt"), "w") as f:
+            f.write(summary)
+        capture.meta["files"] = files
+        with open(self._path(capture.id, "json"), "w") as f:
+            json.dump(capture.meta, f)
+        self._prune()
+
+    def _prune(self):
+        with self._lock:
+            for meta in self.list(limit=None)[self.keep:]:
+                for ext in ("json", "txt", "prof"):
+                    try:
+                        os.remove(self._path(meta["id"], ext))
+                    except FileNotFoundError:
+                        pass
+
+    def list(self, limit: Optional[int] = 20) -> List[Dict]:
+        """Capture metadata, newest first"""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        captures = []
+        for name in sorted((n for n in names if n.endswith(".json")), reverse=True):
+            try:
+                with open(os.path.join(self.root, name)) as f:
+                    captures.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+            if limit is not None and len(captures) >= limit:
+                break
+        return captures
+
+    def path(self, capture_id: str, ext: str = "txt") -> Optional[str]:
+        """File of a capture ("txt" or "prof"), or None if it doesn't exist"""
+        if not _CAPTURE_ID.match(capture_id) or ext not in ("txt", "prof"):
+            return None
+        path = self._path(capture_id, ext)
+        return path if os.path.exists(path) else None
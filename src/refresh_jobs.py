@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Background Refresh Jobs
+Runs data refreshes off the request path and coalesces concurrent requests
+"""
+
+import fcntl
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from .checkpoint_store import CheckpointStore
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+REFRESH_JOB_FILENAME = "refresh_jobs.sqlite3"
+
+# Store keys: one record per job, plus the id of the job holding the refresh lock
+JOB_PREFIX = "refresh:job:"
+ACTIVE_KEY = "refresh:active"
+
+
+def default_refresh_job_path(config_path: str) -> str:
+    """refresh_jobs.sqlite3 next to teams_config.json (override with REFRESH_JOB_DB)"""
+    return os.environ.get("REFRESH_JOB_DB") or os.path.join(
+        os.path.dirname(os.path.abspath(config_path)), REFRESH_JOB_FILENAME)
+
+
+class RefreshBusy(Exception):
+    """The refresh lock is held by a run that has no job to join (e.g. the fetch script)"""
+
+
+class RefreshJob:
+    """A single refresh run and its per-source progress"""
+
+    def __init__(self, on_change: Optional[Callable[["RefreshJob"], None]] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.status = "queued"  # queued -> running -> succeeded | failed
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.sources: Dict[str, str] = {}
+        self.error: Optional[str] = None
+        self._on_change = on_change
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RefreshJob":
+        """A read-only copy of a job stored by to_dict (possibly in another process)"""
+        job = cls()
+        job.id = data["job_id"]
+        job.status = data["status"]
+        job.created_at = data["created_at"]
+        job.started_at = data.get("started_at")
+        job.finished_at = data.get("finished_at")
+        job.sources = dict(data.get("sources") or {})
+        job.error = data.get("error")
+        return job
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def update_source(self, source: str, status: str):
+        """Progress callback passed to SportsDataFetcher"""
+        with self._lock:
+            self.sources[source] = status
+        self._changed()
+
+    def _set(self, **fields):
+        with self._lock:
+            for key, value in fields.items():
+                setattr(self, key, value)
+        self._changed()
+
+    def _changed(self):
+        if self._on_change:
+            try:
+                self._on_change(self)
+            except Exception as e:
+                logger.warning("Could not save refresh job %s: %s", self.id, e)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "sources": dict(self.sources),
+                "error": self.error,
+            }
+
+
+class RefreshLock:
+    """Non-blocking flock on a file, held for the length of one refresh run"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        lock_file = open(self.path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self):
+        lock_file, self._file = self._file, None
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+
+class RefreshJobManager:
+    """
+    Single-flight runner for refresh jobs.
+
+    While a job is queued or running, ``submit`` hands back that same job
+    instead of starting another fetch, so concurrent clicks from the web
+    and mobile apps share one run. Finished jobs are kept (bounded) so
+    clients can still poll their status.
+
+    With a ``store_path``, jobs are saved to a SQLite store there and a
+    run holds an flock'd ``.lock`` file next to it, so every worker process
+    sharing the path polls the same jobs and joins the same run. A worker
+    whose run died with it leaves its job "running" in the store; the next
+    submit that gets the lock marks it failed.
+    """
+
+    def __init__(self, run: Callable[[RefreshJob], None], max_history: int = 20,
+                 on_status: Optional[Callable[[RefreshJob], None]] = None,
+                 store_path: Optional[str] = None, join_timeout: float = 1.0):
+        """
+        Args:
+            run: Does the refresh; called in a background thread
+            max_history: Finished jobs kept for polling
+            on_status: Called when a job starts and finishes
+            store_path: SQLite store shared with other workers; None keeps jobs in memory
+            join_timeout: Seconds to wait for another worker's run to save its job before RefreshBusy
+        """
+        self._run = run
+        self._on_status = on_status
+        self._max_history = max_history
+        self._join_timeout = join_timeout
+        self._jobs: "OrderedDict[str, RefreshJob]" = OrderedDict()
+        self._active: Optional[RefreshJob] = None
+        self._lock = threading.Lock()
+        self._store = CheckpointStore(store_path) if store_path else None
+        self._file_lock = RefreshLock(store_path + ".lock") if store_path else None
+
+    def submit(self) -> Tuple[RefreshJob, bool]:
+        """Start a refresh, or join the one in progress
+
+        Returns:
+            (job, created) where created is False if an existing job was reused
+
+        Raises:
+            RefreshBusy: another process holds the refresh lock without a job to join
+        """
+        with self._lock:
+            if self._active is not None and not self._active.finished:
+                return self._active, False
+            if self._file_lock is not None:
+                running = self._acquire_or_join()
+                if running is not None:
+                    return running, False
+            try:
+                job = RefreshJob(on_change=self._save if self._store is not None else None)
+                if self._store is not None:
+                    self._fail_interrupted()
+                    self._save(job)
+                    self._store.set(ACTIVE_KEY, job.id)
+                    self._prune()
+            except BaseException:
+                if self._file_lock is not None:
+                    self._file_lock.release()
+                raise
+            self._active = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self._max_history:
+                self._jobs.popitem(last=False)
+
+        thread = threading.Thread(target=self._execute, args=(job,), name=f"refresh-{job.id}", daemon=True)
+        thread.start()
+        return job, True
+
+    def _acquire_or_join(self) -> Optional[RefreshJob]:
+        """Take the file lock (None), or return the job another worker is running under it
+
+        That worker may be between taking the lock and saving its job, or
+        between finishing and letting go, so both are retried for a moment.
+        """
+        deadline = time.monotonic() + self._join_timeout
+        while not self._file_lock.acquire():
+            job_id = self._store.get(ACTIVE_KEY)
+            data = self._store.get(JOB_PREFIX + job_id) if job_id else None
+            if data is not None and data["status"] in ("queued", "running"):
+                return RefreshJob.from_dict(data)
+            if time.monotonic() >= deadline:
+                raise RefreshBusy("Another refresh is in progress")
+            time.sleep(0.05)
+        return None
+
+    def _fail_interrupted(self):
+        """Mark a job left running by a worker that exited mid-run as failed (caller holds the file lock)"""
+        job_id = self._store.get(ACTIVE_KEY)
+        data = self._store.get(JOB_PREFIX + job_id) if job_id else None
+        if data is not None and data["status"] in ("queued", "running"):
+            data.update(status="failed", error="Interrupted", finished_at=datetime.now().isoformat())
+            self._store.set(JOB_PREFIX + job_id, data)
+
+    def _save(self, job: RefreshJob):
+        self._store.set(JOB_PREFIX + job.id, job.to_dict())
+
+    def _prune(self):
+        jobs = self._store.items(JOB_PREFIX)
+        for key in sorted(jobs, key=lambda key: jobs[key]["created_at"])[:-self._max_history]:
+            self._store.delete(key)
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            data = self._store.get(JOB_PREFIX + job_id)
+            job = RefreshJob.from_dict(data) if data is not None else None
+        return job
+
+    @property
+    def active(self) -> Optional[RefreshJob]:
+        job = self._active
+        return job if job is not None and not job.finished else None
+
+    def _notify(self, job: RefreshJob):
+        if self._on_status:
+            try:
+                self._on_status(job)
+            except Exception as e:
+                logger.error("Error in refresh job status callback: %s", e)
+
+    def _execute(self, job: RefreshJob):
+        outcome = {"status": "failed", "error": "Interrupted"}
+        try:
+            job._set(status="running", started_at=datetime.now().isoformat())
+            self._notify(job)
+            self._run(job)
+            outcome = {"status": "succeeded"}
+        except Exception as e:
+            logger.error("Refresh job %s failed: %s", job.id, e)
+            outcome = {"status": "failed", "error": str(e)}
+        finally:
+            # Finish and unlock together, so a submit never sees a finished job still holding the lock
+            with self._lock:
+                job._set(finished_at=datetime.now().isoformat(), **outcome)
+                if self._file_lock is not None:
+                    self._file_lock.release()
+        self._notify(job)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Response Encoding
+Sparse fieldsets, float rounding, content negotiation and compression for API bodies
+"""
+
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .metrics import record_cache
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# List-valued keys whose items ?fields= applies to
+ENTITY_LIST_KEYS = ("teams", "games", "events")
+# Identity fields that are always kept so clients can merge partial entities
+ALWAYS_INCLUDED_FIELDS = ("name", "sport", "team", "version")
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+MAX_PRECISION = 6
+
+
+class EncodingError(ValueError):
+    """Invalid fields/precision request parameters"""
+
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse ?fields=a,b,c into a sorted tuple (None means all fields)"""
+    if not value:
+        return None
+    fields = tuple(sorted({f.strip() for f in value.split(",") if f.strip()}))
+    return fields or None
+
+
+def parse_precision(value: Optional[str]) -> Optional[int]:
+    """Parse ?precision=N (number of decimals for floats)"""
+    if value is None or value == "":
+        return None
+    try:
+        precision = int(value)
+    except ValueError:
+        raise EncodingError("precision must be an integer")
+    if not 0 <= precision <= MAX_PRECISION:
+        raise EncodingError(f"precision must be between 0 and {MAX_PRECISION}")
+    return precision
+
+
+def apply_fieldset(payload: Any, fields: Tuple[str, ...]) -> Any:
+    """Keep only the requested fields of every entity in the payload's entity lists"""
+    if isinstance(payload, dict):
+        result = {}
+        wanted = set(fields) | set(ALWAYS_INCLUDED_FIELDS)
+        for key, value in payload.items():
+            if key in ENTITY_LIST_KEYS and isinstance(value, list):
+                result[key] = [
+                    {k: v for k, v in item.items() if k in wanted} if isinstance(item, dict) else item
+                    for item in value
+                ]
+            elif isinstance(value, dict):
+                # Nested sections, e.g. /api/dashboard
+                result[key] = apply_fieldset(value, fields)
+            else:
+                result[key] = value
+        return result
+    return payload
+
+
+def round_floats(value: Any, precision: int) -> Any:
+    """Round every float in a JSON-like structure"""
+    if isinstance(value, float):
+        rounded = round(value, precision)
+        return int(rounded) if precision == 0 else rounded
+    if isinstance(value, dict):
+        return {k: round_floats(v, precision) for k, v in value.items()}
+    if isinstance(value, list):
+        return [round_floats(v, precision) for v in value]
+    return value
+
+
+def _accepted(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept / Accept-Encoding header into {token: quality}"""
+    accepted = {}
+    for part in (header or "").split(","):
+        pieces = part.strip().split(";")
+        token = pieces[0].strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in pieces[1:]:
+            name, _, val = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(val)
+                except ValueError:
+                    quality = 0.0
+        accepted[token] = quality
+    return accepted
+
+
+def choose_media_type(accept: Optional[str]) -> str:
+    """MessagePack if the client explicitly asks for it (and it's installed), else JSON"""
+    if not MSGPACK_AVAILABLE:
+        return JSON_MEDIA_TYPE
+    accepted = _accepted(accept)
+    for media_type in MSGPACK_MEDIA_TYPES:
+        if accepted.get(media_type, 0) > 0 and accepted[media_type] >= accepted.get(JSON_MEDIA_TYPE, 0):
+            return media_type
+    return JSON_MEDIA_TYPE
+
+
+def choose_content_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported compression the client accepts (br > gzip), or None
+
+    An explicit entry wins over ``*``, so ``gzip;q=0, *`` never gets gzip.
+    """
+    accepted = _accepted(accept_encoding)
+    if BROTLI_AVAILABLE and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", accepted.get("*", 0)) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """Compress body; returns (body, encoding actually used)"""
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    if encoding == "br":
+        return brotli.compress(body, quality=6), "br"
+    return gzip.compress(body, compresslevel=6, mtime=0), "gzip"
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag derived from the body bytes"""
+    return '"' + hashlib.sha256(body).hexdigest()[:20] + '"'
+
+
+class EncodedResponse:
+    """A fully encoded body plus the headers that describe it"""
+
+    def __init__(self, body: bytes, media_type: str, content_encoding: Optional[str]):
+        self.body = body
+        self.media_type = media_type
+        self.content_encoding = content_encoding
+        self._etag: Optional[str] = None
+
+    @property
+    def etag(self) -> str:
+        """ETag of the encoded body (differs per encoding, as strong ETags must)"""
+        if self._etag is None:
+            self._etag = content_etag(self.body)
+        return self._etag
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        if self.content_encoding:
+            headers["Content-Encoding"] = self.content_encoding
+        return headers
+
+
+class EncodedBodyCache:
+    """Small LRU of encoded bodies so repeat requests skip re-encoding and compression"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, EncodedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: tuple, build: Callable[[], EncodedResponse]) -> EncodedResponse:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        record_cache("encoded_body", entry is not None)
+        if entry is not None:
+            return entry
+        entry = build()
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+_cache = EncodedBodyCache()
+
+
+def encode_response(json_body: bytes, accept: Optional[str] = None, accept_encoding: Optional[str] = None,
+                    fields: Optional[Tuple[str, ...]] = None, precision: Optional[int] = None) -> EncodedResponse:
+    """Turn a pre-serialized JSON body into what the client asked for
+
+    Args:
+        json_body: Canonical JSON bytes (e.g. from a Snapshot)
+        accept: Request Accept header
+        accept_encoding: Request Accept-Encoding header
+        fields: Optional sparse fieldset for entity lists
+        precision: Optional number of decimals for floats
+    """
+    media_type = choose_media_type(accept)
+    encoding = choose_content_encoding(accept_encoding)
+    # Keyed on the body's digest: a hash() collision would serve another response's body
+    digest = hashlib.sha256(json_body).hexdigest()
+    key = (digest, media_type, encoding, fields, precision)
+
+    def build() -> EncodedResponse:
+        body = json_body
+        if fields is not None or precision is not None or media_type != JSON_MEDIA_TYPE:
+            payload = json.loads(json_body)
+            if fields is not None:
+                payload = apply_fieldset(payload, fields)
+            if precision is not None:
+                payload = round_floats(payload, precision)
+            if media_type == JSON_MEDIA_TYPE:
+                body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+            else:
+                body = msgpack.packb(payload, use_bin_type=True)
+        body, used = compress(body, encoding)
+        encoded = EncodedResponse(body, media_type, used)
+        if body is json_body:
+            # Sent as-is: its ETag is the digest already computed for the key
+            encoded._etag = '"' + digest[:20] + '"'
+        return encoded
+
+    return _cache.get_or_build(key, build)
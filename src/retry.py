@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Retry and Pacing
+Bounded jittered retries with Retry-After support, and a token-bucket rate limiter per upstream host
+"""
+
+import os
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+import requests
+
+# Attempts per call, including the first
+MAX_ATTEMPTS = int(os.environ.get("UPSTREAM_MAX_ATTEMPTS", 3))
+# Backoff before retry n (0-based) is uniform(0, min(MAX_DELAY, BASE_DELAY * 2**n)) ("full jitter")
+BASE_DELAY = float(os.environ.get("UPSTREAM_RETRY_BASE_DELAY", 0.5))
+MAX_DELAY = 8.0
+# A Retry-After longer than this is not waited out; the response is returned as-is
+MAX_RETRY_AFTER = 30.0
+
+# Requests per second per host, and how many may go out back to back
+RATE_LIMIT = float(os.environ.get("UPSTREAM_RATE_LIMIT", 10))
+RATE_BURST = float(os.environ.get("UPSTREAM_RATE_BURST", 20))
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), None if absent or invalid"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """When to retry an upstream call and how long to wait first"""
+
+    def __init__(self, max_attempts: int = MAX_ATTEMPTS, base_delay: float = BASE_DELAY,
+                 max_delay: float = MAX_DELAY, max_retry_after: float = MAX_RETRY_AFTER,
+                 statuses=RETRY_STATUSES, rng: Optional[random.Random] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.statuses = frozenset(statuses)
+        self._rng = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        """Jittered exponential delay before retry number attempt (0-based)"""
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def delay(self, method: str, attempt: int, response: Optional[requests.Response] = None,
+              error: Optional[Exception] = None) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the call should not be retried
+
+        Args:
+            attempt: 0-based number of the attempt that just finished
+            response: Its response (None if it raised)
+            error: What it raised
+        """
+        if attempt + 1 >= self.max_attempts or method.upper() not in IDEMPOTENT_METHODS:
+            return None
+        if response is not None:
+            if response.status_code not in self.statuses:
+                return None
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+            return self.backoff(attempt)
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return self.backoff(attempt)
+        return None
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "paused_until")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.paused_until = 0.0
+
+
+class HostRateLimiter:
+    """
+    Token bucket per host, shared by every thread and API client using it.
+
+    Each call takes one token; tokens refill at ``rate`` per second up to
+    ``burst``. ``pause`` (used for Retry-After on a 429) holds every
+    caller for that host until the time has passed.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT, burst: float = RATE_BURST,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, host: str) -> float:
+        """Take a token (possibly borrowed from the future); returns how long to wait for it"""
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = _Bucket(self.burst, now)
+            wait = 0.0
+            # rate <= 0 disables pacing; pauses still apply
+            if self.rate > 0:
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+                bucket.tokens -= 1
+                wait = -bucket.tokens / self.rate if bucket.tokens < 0 else 0.0
+            return max(wait, bucket.paused_until - now)
+
+    def acquire(self, host: str, max_wait: Optional[float] = None) -> Optional[float]:
+        """Wait for host's next slot; returns the seconds waited
+
+        Returns None, without waiting or taking the slot, if the wait
+        (pacing or a Retry-After pause) would be longer than max_wait.
+        """
+        wait = self._reserve(host)
+        if max_wait is not None and wait > max_wait:
+            self._release(host)
+            return None
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def _release(self, host: str):
+        """Give back a slot taken by _reserve"""
+        with self._lock:
+            if self.rate > 0:
+                self._buckets[host].tokens += 1
+
+    def pause(self, host: str, seconds: float):
+        """Hold all calls to host for seconds (e.g. after a 429 with Retry-After)"""
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = _Bucket(self.burst, now)
+            bucket.paused_until = max(bucket.paused_until, now + seconds)
+
+
+# Shared by every live UpstreamSession in the process
+DEFAULT_LIMITER = HostRateLimiter()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Calculator Snapshots
+Immutable, pre-serialized views of the calculator for concurrent serving
+"""
+
+import os
+import json
+import time
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .depression_calculator import DepressionCalculator
+from .event_log import default_event_log_path, last_event_seq
+from .metrics import CALCULATOR_DURATION, record_cache
+from .tracing import span
+from .payloads import (
+    build_depression_payload,
+    build_teams_payload,
+    build_recent_games_payload,
+    build_upcoming_events_payload,
+)
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Sections a snapshot can serve, in /api/dashboard order
+SECTIONS = ("depression", "teams", "recent_games", "upcoming_events")
+
+# Sections that need live upstream calls; built on first use and reused
+# for this many seconds (relative dates like "Tomorrow" go stale otherwise)
+LIVE_SECTIONS = ("recent_games", "upcoming_events")
+LIVE_SECTION_TTL = float(os.environ.get("LIVE_SECTION_TTL", 600))
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_shared_fetcher():
+    """SportsDataFetcher shared by all snapshots, so HTTP sessions are reused"""
+    global _fetcher
+    if _fetcher is None:
+        with _fetcher_lock:
+            if _fetcher is None:
+                from .sports_api import SportsDataFetcher
+                _fetcher = SportsDataFetcher()
+    return _fetcher
+
+
+def serialize(payload: Dict) -> bytes:
+    """Serialize a response body the same way for every snapshot"""
+    with span("serialize") as current:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        current.set_attribute("bytes", len(body))
+    return body
+
+
+def entity_key(entity: Dict[str, Any]) -> str:
+    """Stable identity of a team/driver/fantasy entry across snapshots"""
+    return f"{entity.get('sport', '')}:{entity.get('name', '')}"
+
+
+def _fingerprint(entity: Dict[str, Any]) -> str:
+    return json.dumps(entity, sort_keys=True, separators=(",", ":"))
+
+
+# How many distinct ?since= delta bodies to keep per snapshot
+DELTA_CACHE_SIZE = 32
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Everything needed to answer a request, built once and never mutated.
+
+    The dict fields are shared between threads and must be treated as
+    read-only; anything that needs a modified copy has to build a new
+    Snapshot instead (copy-on-write). The ``*_json`` fields are the exact
+    bytes sent to clients.
+    """
+    version: int
+    built_at: str
+    calculator: DepressionCalculator
+    depression: Dict[str, Any]
+    teams: Dict[str, Any]
+    entities: Tuple[Dict[str, Any], ...]
+    depression_json: bytes
+    teams_json: bytes
+    # When the underlying data last changed (config or event log mtime, epoch seconds)
+    data_updated_at: float = 0.0
+    # Delta sync: oldest version deltas can be computed from (older clients
+    # get a full resync), version at which each entity last changed, and
+    # version at which removed entities disappeared
+    base_version: int = 0
+    entity_versions: Dict[str, int] = field(default_factory=dict)
+    tombstones: Dict[str, int] = field(default_factory=dict)
+    _fingerprints: Dict[str, str] = field(default_factory=dict, compare=False, repr=False)
+    _delta_cache: Dict[int, bytes] = field(default_factory=dict, compare=False, repr=False)
+    # Memoized live sections: name -> (built monotonic time, payload, json, built epoch time)
+    _live: Dict[str, Tuple[float, Dict[str, Any], bytes, float]] = field(
+        default_factory=dict, compare=False, repr=False)
+    _live_locks: Dict[str, threading.Lock] = field(
+        default_factory=lambda: {name: threading.Lock() for name in LIVE_SECTIONS},
+        compare=False, repr=False)
+
+    def section(self, name: str) -> Tuple[Dict[str, Any], bytes]:
+        """Get (payload, serialized payload) for one of SECTIONS
+
+        Live sections are computed at most once per TTL per snapshot; concurrent
+        callers wait for the one in-flight computation instead of repeating it.
+        """
+        if name == "depression":
+            return self.depression, self.depression_json
+        if name == "teams":
+            return self.teams, self.teams_json
+        if name not in self._live_locks:
+            raise KeyError(f"Unknown section: {name}")
+
+        cached = self._live.get(name)
+        if cached and time.monotonic() - cached[0] < LIVE_SECTION_TTL:
+            record_cache("live_section", True)
+            return cached[1], cached[2]
+        with self._live_locks[name]:
+            cached = self._live.get(name)
+            if cached and time.monotonic() - cached[0] < LIVE_SECTION_TTL:
+                record_cache("live_section", True)
+                return cached[1], cached[2]
+            record_cache("live_section", False)
+            with CALCULATOR_DURATION.time(operation=name), span("live_section", section=name):
+                section = self._build_live_section(name)
+            payload = dict(section, timestamp=datetime.now().isoformat())
+            self._live[name] = (time.monotonic(), payload, serialize(payload), time.time())
+            return payload, self._live[name][2]
+
+    def cached_section(self, name: str) -> Optional[Dict[str, Any]]:
+        """Payload of a section if it is already available (never fetches)"""
+        if name == "depression":
+            return self.depression
+        if name == "teams":
+            return self.teams
+        cached = self._live.get(name)
+        return cached[1] if cached else None
+
+    def section_modified(self, name: str) -> float:
+        """When a section's content last changed (epoch seconds)"""
+        cached = self._live.get(name)
+        if cached:
+            return max(cached[3], self.data_updated_at)
+        return self.data_updated_at
+
+    def _build_live_section(self, name: str) -> Dict[str, Any]:
+        try:
+            fetcher = get_shared_fetcher()
+        except Exception as e:
+            logger.warning("⚠️ Sports API not available: %s", e)
+            fetcher = None
+        if name == "recent_games":
+            return build_recent_games_payload(self.calculator, fetcher)
+        return build_upcoming_events_payload(fetcher)
+
+    def warm(self):
+        """Compute the live sections ahead of the first request"""
+        for name in self._live_locks:
+            try:
+                self.section(name)
+            except Exception as e:
+                logger.error("Error warming %s section: %s", name, e)
+
+    def teams_delta(self, since: int) -> Dict[str, Any]:
+        """Entities changed or removed after version ``since``
+
+        Returns a full listing (``full: true``) when ``since`` predates
+        what this snapshot can diff against, e.g. after a server restart.
+        """
+        full = since < self.base_version
+        teams = []
+        for entity in self.entities:
+            entity_version = self.entity_versions.get(entity_key(entity), self.version)
+            if full or entity_version > since:
+                teams.append(dict(entity, version=entity_version))
+        removed = [] if full else [
+            {"key": key, "sport": key.split(":", 1)[0], "name": key.split(":", 1)[1], "version": v}
+            for key, v in sorted(self.tombstones.items()) if v > since
+        ]
+        return {
+            "success": True,
+            "version": self.version,
+            "since": since,
+            "full": full,
+            "teams": teams,
+            "removed": removed,
+            "timestamp": self.built_at,
+        }
+
+    def teams_delta_json(self, since: int) -> bytes:
+        """Serialized teams_delta, cached per ``since`` value"""
+        # Everyone who is already up to date gets the same (empty) body
+        since = min(since, self.version)
+        body = self._delta_cache.get(since)
+        if body is None:
+            body = serialize(self.teams_delta(since))
+            if len(self._delta_cache) >= DELTA_CACHE_SIZE:
+                self._delta_cache.clear()
+            self._delta_cache[since] = body
+        return body
+
+    def dashboard_json(self, sections: Iterable[str] = SECTIONS) -> bytes:
+        """Combined body for /api/dashboard, stitched from the serialized sections"""
+        parts = [
+            b'"success":true',
+            b'"version":' + str(self.version).encode(),
+            b'"timestamp":' + json.dumps(self.built_at).encode(),
+        ]
+        for name in sections:
+            parts.append(json.dumps(name).encode() + b":" + self.section(name)[1])
+        return b"{" + b",".join(parts) + b"}"
+
+
+def build_snapshot(config_path: str, version: int, use_espn_api: bool = True,
+                   previous: Optional[Snapshot] = None) -> Snapshot:
+    """Load a fresh calculator from disk and precompute every cheap response
+
+    Args:
+        config_path: Path to teams_config.json
+        version: Version number for the new snapshot
+        use_espn_api: Passed through to DepressionCalculator
+        previous: Snapshot being replaced; unchanged entities keep their versions
+    """
+    with span("snapshot.build", version=version):
+        return _build_snapshot(config_path, version, use_espn_api, previous)
+
+
+def _build_snapshot(config_path: str, version: int, use_espn_api: bool,
+                    previous: Optional[Snapshot]) -> Snapshot:
+    with CALCULATOR_DURATION.time(operation="load"), span("calculator.load"):
+        calc = DepressionCalculator(config_path, use_espn_api=use_espn_api)
+    built_at = datetime.now().isoformat()
+    try:
+        data_updated_at = os.stat(config_path).st_mtime
+    except OSError:
+        data_updated_at = time.time()
+    try:
+        # Ingest events not yet compacted into the config are data changes too
+        data_updated_at = max(data_updated_at, os.stat(default_event_log_path(config_path)).st_mtime)
+    except OSError:
+        pass
+
+    with CALCULATOR_DURATION.time(operation="score"), span("calculator.score"):
+        depression = dict(build_depression_payload(calc), timestamp=built_at)
+        teams = dict(build_teams_payload(calc), version=version, timestamp=built_at)
+
+    # Carry entity versions forward; only entities whose content changed
+    # (score, record, games, ...) get the new version
+    fingerprints = {entity_key(e): _fingerprint(e) for e in teams["teams"]}
+    entity_versions = {}
+    tombstones = {}
+    if previous is not None:
+        for key, fp in fingerprints.items():
+            unchanged = previous._fingerprints.get(key) == fp
+            entity_versions[key] = previous.entity_versions[key] if unchanged else version
+        tombstones = {k: v for k, v in previous.tombstones.items() if k not in fingerprints}
+        for key in previous.entity_versions:
+            if key not in fingerprints:
+                tombstones[key] = version
+        base_version = previous.base_version
+    else:
+        entity_versions = {key: version for key in fingerprints}
+        base_version = version
+
+    return Snapshot(
+        version=version,
+        built_at=built_at,
+        calculator=calc,
+        depression=depression,
+        teams=teams,
+        entities=tuple(teams["teams"]),
+        depression_json=serialize(depression),
+        teams_json=serialize(teams),
+        data_updated_at=data_updated_at,
+        base_version=base_version,
+        entity_versions=entity_versions,
+        tombstones=tombstones,
+        _fingerprints=fingerprints,
+    )
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def data_version(config_path: str) -> Tuple[int, Tuple]:
+    """Snapshot version for the data on disk, and the file state it was read from
+
+    The version is the config's mtime in milliseconds plus the event log's
+    last sequence number. Neither goes down: appending an event raises the
+    sequence number and compaction or an edit rewrites the config. So every
+    worker and every restart serving the same files arrives at the same
+    number, and it only grows as the data changes.
+    """
+    log_path = default_event_log_path(config_path)
+    config_key = _stat_key(config_path)
+    seq = last_event_seq(log_path) or 0
+    mtime_ms = config_key[2] // 1_000_000 if config_key else 0
+    return mtime_ms + seq, (config_key, _stat_key(log_path))
+
+
+class SnapshotStore:
+    """
+    Holds the current Snapshot and replaces it atomically.
+
+    Readers just read ``current`` (a single reference load) and never take
+    a lock. Writers are serialized so two rebuilds can't race each other,
+    and a new snapshot only becomes visible once it is fully built.
+    """
+
+    def __init__(self, config_path: str, use_espn_api: bool = True,
+                 builder: Callable[..., Snapshot] = build_snapshot,
+                 warm_live_sections: bool = False):
+        self.config_path = config_path
+        self.use_espn_api = use_espn_api
+        self.warm_live_sections = warm_live_sections
+        self._builder = builder
+        self._current: Optional[Snapshot] = None
+        # Versions come from data_version, so they keep increasing across
+        # restarts and agree between workers serving the same files
+        self._version = 0
+        self._data_state: Optional[Tuple] = None
+        self._write_lock = threading.Lock()
+        self._listeners: List[Callable[[Optional[Snapshot], Snapshot], None]] = []
+
+    def add_listener(self, listener: Callable[[Optional[Snapshot], Snapshot], None]):
+        """Call listener(old, new) after each new snapshot is published
+
+        Listeners run on the rebuilding thread and should return quickly.
+        """
+        self._listeners.append(listener)
+
+    @property
+    def current(self) -> Optional[Snapshot]:
+        """The snapshot being served right now (None before the first build)"""
+        return self._current
+
+    def get(self) -> Snapshot:
+        """Get the current snapshot, building the first one if needed"""
+        snapshot = self._current
+        if snapshot is not None:
+            return snapshot
+        with self._write_lock:
+            # Another thread may have built it while we waited
+            if self._current is None:
+                self._publish(self._build())
+            return self._current
+
+    def rebuild(self) -> Snapshot:
+        """Build a new snapshot from disk and swap it in"""
+        with self._write_lock:
+            snapshot = self._build()
+            self._publish(snapshot)
+            return snapshot
+
+    def _next_version(self) -> Tuple[int, Tuple]:
+        version, state = data_version(self.config_path)
+        if state == self._data_state:
+            # Nothing on disk changed (e.g. a forced reload): same data, same version
+            return self._version, state
+        # Two writes within the mtime's granularity can leave data_version where it
+        # was; this worker still needs a new number for the change it saw
+        return max(version, self._version + 1), state
+
+    def _build(self) -> Snapshot:
+        version, state = self._next_version()
+        snapshot = self._builder(self.config_path, version,
+                                 use_espn_api=self.use_espn_api, previous=self._current)
+        self._data_state = state
+        return snapshot
+
+    def _publish(self, snapshot: Snapshot):
+        previous = self._current
+        self._version = snapshot.version
+        self._current = snapshot
+        for listener in self._listeners:
+            try:
+                listener(previous, snapshot)
+            except Exception as e:
+                logger.error("Error in snapshot listener: %s", e)
+        if self.warm_live_sections:
+            threading.Thread(target=snapshot.warm, name=f"warm-snapshot-{snapshot.version}", daemon=True).start()
@@ -5,19 +5,68 @@ Fetches scores and data from various sports APIs
 """
 
 import requests
-from typing import Dict, Optional, List
+import time
+from typing import Callable, Dict, Optional, List, Union
 from datetime import datetime, timedelta
 import json
+import os
+
+try:
+    from .game_store import RECENT_GAMES_WINDOW
+    from .event_log import EventLog, source_event
+    from .upstream import UpstreamSession
+    from .circuit_breaker import DEFAULT_GUARD, UpstreamUnavailable
+    from .tracing import span, traced
+    from .log import get_logger
+    from . import deadline as deadlines
+    from .league_index import LEAGUES, LeagueIndex
+    from .checkpoint_store import CheckpointStore
+except ImportError:
+    # Fall back to a sibling import (when run as a script from src/)
+    from game_store import RECENT_GAMES_WINDOW
+    from event_log import EventLog, source_event
+    from upstream import UpstreamSession
+    from circuit_breaker import DEFAULT_GUARD, UpstreamUnavailable
+    from tracing import span, traced
+    from log import get_logger
+    import deadline as deadlines
+    from league_index import LEAGUES, LeagueIndex
+    from checkpoint_store import CheckpointStore
+
+logger = get_logger(__name__)
+
+# Bump whenever a parser below changes what it extracts from a payload, so
+# archived payloads (see upstream.PayloadArchive) can be told apart and replayed
+PARSER_VERSION = 1
+
+# Key the ESPN fantasy team summary is archived and replayed under
+FANTASY_ARCHIVE_URL = "https://fantasy.espn.com/apis/dashboard/team"
+
+# "team": per-team ESPN calls; "league": league-wide scoreboard and standings (see league_index)
+INGEST_MODE = os.environ.get("FETCH_INGEST_MODE", "team").lower()
+
+# Overall time limit for fetch_all_data / update_config_file when none is passed (unset: no limit)
+FETCH_DEADLINE_SECONDS = float(os.environ.get("FETCH_DEADLINE_SECONDS", 0)) or None
 
 
 class SportsAPI:
     """Base class for sports API integrations"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or UpstreamSession(parser_version=PARSER_VERSION)
+    
+    def _fallback_call(self, host: str, fn: Callable, *args, **kwargs):
+        """Call a scraping library fallback (nba_api, sportsipy) under the same per-host
+        circuit breaker as the session's HTTP calls, so a down fallback fails fast too"""
+        if getattr(self.session, 'offline', False):
+            # These libraries do their own HTTP, which can't be recorded or replayed
+            raise UpstreamUnavailable(f"{host} fallback is not available offline")
+        guard = getattr(self.session, 'guard', DEFAULT_GUARD)
+        # Same deadline as the session's calls: skipped once it has passed, timeout cut to what's left
+        deadlines.check(host)
+        if 'timeout' in kwargs:
+            kwargs['timeout'] = deadlines.clamp_timeout(kwargs['timeout'], host)
+        return guard.breaker.call(host, fn, *args, **kwargs)
     
     def get_team_record(self, team_name: str, sport: str) -> Optional[Dict]:
         """Get current record for a team"""
@@ -27,8 +76,8 @@ class SportsAPI:
 class NFLAPI(SportsAPI):
     """NFL API using ESPN's public API"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__(session)
         # ESPN team IDs: Dallas Cowboys = 6 (NOT 2!)
         self.team_ids = {
             'dallas cowboys': 6,
@@ -71,7 +120,7 @@ class NFLAPI(SportsAPI):
                         'win_percentage': wins / (wins + losses + ties) if (wins + losses + ties) > 0 else 0
                     }
         except Exception as e:
-            print(f"Error fetching NFL data: {e}")
+            logger.warning("Error fetching NFL data: %s", e)
             return None
         return None
     
@@ -167,6 +216,7 @@ class NFLAPI(SportsAPI):
                     is_overtime = 'OT' in status_name or 'OVERTIME' in status_name
                     
                     results.append({
+                        'event_id': event.get('id'),
                         'result': result,
                         'date': event_date,
                         'opponent': opponent_name,
@@ -188,7 +238,7 @@ class NFLAPI(SportsAPI):
                 results.sort(key=sort_key, reverse=True)
                 return results[:num_games]  # Return most recent N games
         except Exception as e:
-            print(f"Error fetching NFL schedule: {e}")
+            logger.warning("Error fetching NFL schedule: %s", e)
             return []
         return []
 
@@ -196,8 +246,8 @@ class NFLAPI(SportsAPI):
 class NBAAPI(SportsAPI):
     """NBA API using nba_api"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__(session)
         try:
             from nba_api.stats.endpoints import teamgamelog, scoreboard
             from nba_api.stats.static import teams
@@ -205,7 +255,7 @@ class NBAAPI(SportsAPI):
             self.scoreboard = scoreboard
             self.teams = teams
         except ImportError:
-            print("Warning: nba_api not installed. Install with: pip install nba_api")
+            logger.warning("nba_api not installed. Install with: pip install nba_api")
             self.teamgamelog = None
     
     def get_team_id(self, team_name: str) -> Optional[int]:
@@ -219,7 +269,7 @@ class NBAAPI(SportsAPI):
                 if team_name.lower() in team['full_name'].lower():
                     return team['id']
         except Exception as e:
-            print(f"Error finding NBA team: {e}")
+            logger.warning("Error finding NBA team: %s", e)
         return None
     
     def get_team_record(self, team_name: str) -> Optional[Dict]:
@@ -260,7 +310,7 @@ class NBAAPI(SportsAPI):
                         'win_percentage': wins / (wins + losses) if (wins + losses) > 0 else 0
                     }
         except Exception as e:
-            print(f"Error fetching NBA data for {team_name} from ESPN: {e}")
+            logger.warning("Error fetching NBA data for %s from ESPN: %s", team_name, e)
             # Fallback to nba_api game log method (but filter to only completed games)
             if self.teamgamelog:
                 try:
@@ -270,9 +320,11 @@ class NBAAPI(SportsAPI):
                         if datetime.now().month < 10:
                             current_season -= 1
                         
-                        game_log = self.teamgamelog.TeamGameLog(
+                        game_log = self._fallback_call(
+                            'stats.nba.com', self.teamgamelog.TeamGameLog,
                             team_id=team_id,
-                            season=f"{current_season}-{str(current_season+1)[-2:]}"
+                            season=f"{current_season}-{str(current_season+1)[-2:]}",
+                            timeout=30
                         )
                         
                         df = game_log.get_data_frames()[0]
@@ -287,7 +339,7 @@ class NBAAPI(SportsAPI):
                             'win_percentage': wins / (wins + losses) if (wins + losses) > 0 else 0
                         }
                 except Exception as e2:
-                    print(f"Fallback method also failed: {e2}")
+                    logger.warning("Fallback method also failed: %s", e2)
         return None
     
     def get_recent_games(self, team_name: str, num_games: int = 5) -> List[str]:
@@ -386,6 +438,7 @@ class NBAAPI(SportsAPI):
                     is_overtime = 'OT' in status_name or 'OVERTIME' in status_name
                     
                     results.append({
+                        'event_id': event.get('id'),
                         'result': result,
                         'date': event_date,
                         'opponent': opponent_name,
@@ -407,7 +460,7 @@ class NBAAPI(SportsAPI):
                 results.sort(key=sort_key, reverse=True)
                 return results[:num_games]  # Return most recent N games
         except Exception as e:
-            print(f"Error fetching NBA schedule from ESPN: {e}")
+            logger.warning("Error fetching NBA schedule from ESPN: %s", e)
             # Fallback to nba_api (returns simple list)
             if self.teamgamelog:
                 try:
@@ -417,9 +470,11 @@ class NBAAPI(SportsAPI):
                         if datetime.now().month < 10:
                             current_season -= 1
                         
-                        game_log = self.teamgamelog.TeamGameLog(
+                        game_log = self._fallback_call(
+                            'stats.nba.com', self.teamgamelog.TeamGameLog,
                             team_id=team_id,
-                            season=f"{current_season}-{str(current_season+1)[-2:]}"
+                            season=f"{current_season}-{str(current_season+1)[-2:]}",
+                            timeout=30
                         )
                         
                         df = game_log.get_data_frames()[0]
@@ -441,22 +496,22 @@ class NBAAPI(SportsAPI):
                             })
                         return results
                 except Exception as e2:
-                    print(f"Fallback method also failed: {e2}")
+                    logger.warning("Fallback method also failed: %s", e2)
         return []
 
 
 class MLBAPI(SportsAPI):
     """MLB API using sportsipy"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__(session)
         try:
             from sportsipy.mlb.teams import Teams
             from sportsipy.mlb.schedule import Schedule
             self.Teams = Teams
             self.Schedule = Schedule
         except ImportError:
-            print("Warning: sportsipy not installed. Install with: pip install sportsipy")
+            logger.warning("sportsipy not installed. Install with: pip install sportsipy")
             self.Teams = None
     
     def get_team_record(self, team_name: str) -> Optional[Dict]:
@@ -485,11 +540,11 @@ class MLBAPI(SportsAPI):
                         'win_percentage': wins / (wins + losses) if (wins + losses) > 0 else 0
                     }
         except Exception as e:
-            print(f"Error fetching MLB data: {e}")
+            logger.warning("Error fetching MLB data: %s", e)
             # Fallback to sportsipy if available
             if self.Teams:
                 try:
-                    teams = self.Teams()
+                    teams = self._fallback_call('sports-reference.com', self.Teams)
                     for team in teams:
                         if 'texas' in team.name.lower() and 'rangers' in team.name.lower():
                             return {
@@ -498,15 +553,15 @@ class MLBAPI(SportsAPI):
                                 'win_percentage': team.win_percentage
                             }
                 except Exception as e2:
-                    print(f"Fallback method also failed: {e2}")
+                    logger.warning("Fallback method also failed: %s", e2)
         return None
 
 
 class F1API(SportsAPI):
     """F1 API using OpenF1 REST API (simplified, no dependencies)"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__(session)
         self.openf1_base = "https://api.openf1.org/v1"
         # Verstappen's driver number is 1
         self.driver_number = 1
@@ -596,12 +651,12 @@ class F1API(SportsAPI):
                             'wins': driver_wins.get(self.driver_number, 0)
                         }
         except requests.exceptions.RequestException as e:
-            print(f"OpenF1 API connection error: {e}")
+            logger.warning("OpenF1 API connection error: %s", e)
         except Exception as e:
-            print(f"OpenF1 API error: {e}")
+            logger.warning("OpenF1 API error: %s", e)
         
         # Graceful fallback - return None so manual input can be used
-        print(f"Warning: Could not fetch F1 standings for {driver_name}. Using manual data from config.")
+        logger.warning("Could not fetch F1 standings for %s. Using manual data from config.", driver_name)
         return None
     
     def get_recent_race_results(self, driver_name: str = "Verstappen", num_races: int = 5) -> List[str]:
@@ -660,26 +715,26 @@ class F1API(SportsAPI):
                     if results:
                         return results
         except requests.exceptions.RequestException as e:
-            print(f"OpenF1 race results connection error: {e}")
+            logger.warning("OpenF1 race results connection error: %s", e)
         except Exception as e:
-            print(f"OpenF1 race results error: {e}")
+            logger.warning("OpenF1 race results error: %s", e)
         
         # Graceful fallback - return empty list so manual data can be used
-        print(f"Warning: Could not fetch recent F1 race results for {driver_name}. Using manual data from config.")
+        logger.warning("Could not fetch recent F1 race results for %s. Using manual data from config.", driver_name)
         return []
 
 
 class CollegeBasketballAPI(SportsAPI):
     """College Basketball API using espn-api"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__(session)
         try:
             from espn_api.basketball import League
             # For college, we'll use ESPN's API directly
             self.League = League
         except ImportError:
-            print("Warning: espn-api not installed. Install with: pip install espn-api")
+            logger.warning("espn-api not installed. Install with: pip install espn-api")
             self.League = None
     
     def get_team_record(self, team_name: str) -> Optional[Dict]:
@@ -709,7 +764,7 @@ class CollegeBasketballAPI(SportsAPI):
                         'win_percentage': wins / (wins + losses) if (wins + losses) > 0 else 0
                     }
         except Exception as e:
-            print(f"Error fetching college basketball data: {e}")
+            logger.warning("Error fetching college basketball data: %s", e)
         return None
     
     def get_recent_games(self, team_name: str, num_games: int = 5) -> List[str]:
@@ -796,6 +851,7 @@ class CollegeBasketballAPI(SportsAPI):
                     is_overtime = 'OT' in status_name or 'OVERTIME' in status_name
                     
                     results.append({
+                        'event_id': event.get('id'),
                         'result': result,
                         'date': event_date,
                         'opponent': opponent_name,
@@ -817,22 +873,20 @@ class CollegeBasketballAPI(SportsAPI):
                 results.sort(key=sort_key, reverse=True)
                 return results[:num_games]  # Return most recent N games
         except Exception as e:
-            print(f"Error fetching college basketball schedule: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("Error fetching college basketball schedule: %s", e, exc_info=True)
         return []
 
 
 class CollegeFootballAPI(SportsAPI):
     """College Football API using espn-api"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__(session)
         try:
             from espn_api.football import League
             self.League = League
         except ImportError:
-            print("Warning: espn-api not installed. Install with: pip install espn-api")
+            logger.warning("espn-api not installed. Install with: pip install espn-api")
             self.League = None
     
     def get_team_record(self, team_name: str) -> Optional[Dict]:
@@ -860,7 +914,7 @@ class CollegeFootballAPI(SportsAPI):
                         'win_percentage': wins / (wins + losses) if (wins + losses) > 0 else 0
                     }
         except Exception as e:
-            print(f"Error fetching college football data: {e}")
+            logger.warning("Error fetching college football data: %s", e)
         return None
     
     def get_recent_games(self, team_name: str, num_games: int = 5) -> List[str]:
@@ -953,6 +1007,7 @@ class CollegeFootballAPI(SportsAPI):
                     is_overtime = 'OT' in status_name or 'OVERTIME' in status_name
                     
                     results.append({
+                        'event_id': event.get('id'),
                         'result': result,
                         'date': event_date,
                         'opponent': opponent_name,
@@ -974,25 +1029,60 @@ class CollegeFootballAPI(SportsAPI):
                 results.sort(key=sort_key, reverse=True)
                 return results[:num_games]  # Return most recent N games
         except Exception as e:
-            print(f"Error fetching college football schedule: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("Error fetching college football schedule: %s", e, exc_info=True)
         return []
 
 
 class SportsDataFetcher:
     """Main class to fetch all sports data"""
     
-    def __init__(self):
-        self.nfl = NFLAPI()
-        self.nba = NBAAPI()
-        self.mlb = MLBAPI()
-        self.f1 = F1API()
-        self.college_bball = CollegeBasketballAPI()
-        self.college_football = CollegeFootballAPI()
+    def __init__(self, game_store=None, event_log=None, archive=None, session=None, ingest_mode=None,
+                 checkpoint_store=None):
+        """
+        Args:
+            game_store: Optional GameStore; detailed games fetched for each team are upserted into it
+            event_log: Optional EventLog; fetched data is appended to it instead of
+                rewriting teams_config.json (its compactor folds it in later)
+            archive: Optional PayloadArchive; every raw ESPN/OpenF1 response is recorded in it
+            session: Session for all API clients (e.g. a ReplaySession); overrides archive
+            ingest_mode: "team" (default, FETCH_INGEST_MODE) or "league": records and games
+                for ESPN leagues (and opponent records) come from a LeagueIndex, with the
+                per-team calls only for teams it doesn't cover
+            checkpoint_store: Where league indexes are shared between runs (default: a
+                CheckpointStore when live; offline sessions keep theirs in memory)
+        """
+        self.game_store = game_store
+        self.event_log = event_log
+        self.session = session or UpstreamSession(archive=archive, parser_version=PARSER_VERSION)
+        self.nfl = NFLAPI(self.session)
+        self.nba = NBAAPI(self.session)
+        self.mlb = MLBAPI(self.session)
+        self.f1 = F1API(self.session)
+        self.college_bball = CollegeBasketballAPI(self.session)
+        self.college_football = CollegeFootballAPI(self.session)
+        mode = (ingest_mode or INGEST_MODE).lower()
+        self.league_index = None
+        if mode == 'league':
+            if checkpoint_store is None and not getattr(self.session, 'offline', False):
+                checkpoint_store = CheckpointStore()
+            self.league_index = LeagueIndex(self.session, checkpoint_store)
+        # Report of the last fetch_all_data run (see there)
+        self.last_fetch: Optional[Dict] = None
     
+    @traced("fetch_source", lambda self, espn_config: {"source": "fantasy", "api": "espn-api"})
     def fetch_fantasy_data(self, espn_config: dict) -> Optional[Dict]:
         """Fetch fantasy team data from ESPN API"""
+        # The espn-api library makes its own requests, so the team summary it
+        # returns is archived (and replayed) as one JSON document
+        archive_params = {key: espn_config.get(key) for key in ('league_id', 'year', 'team_id', 'team_name')}
+        if getattr(self.session, 'offline', False):
+            try:
+                response = self.session.get(FANTASY_ARCHIVE_URL, params=archive_params, timeout=10)
+                return response.json() if response.status_code == 200 else None
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.warning("Error fetching recorded fantasy data: %s", e)
+                return None
+        
         try:
             # Try relative import first (when used as module)
             try:
@@ -1001,7 +1091,7 @@ class SportsDataFetcher:
                 # Fall back to absolute import (when used as script)
                 from src.espn_fantasy import ESPNFantasyClient
         except ImportError:
-            print("Warning: ESPN Fantasy integration not available. Install espn-api library.")
+            logger.warning("ESPN Fantasy integration not available. Install espn-api library.")
             return None
         
         try:
@@ -1026,16 +1116,21 @@ class SportsDataFetcher:
             
             # Fetch team data
             team_data = client.get_my_team(team_name)
+            if hasattr(self.session, 'archive_json'):
+                self.session.archive_json(FANTASY_ARCHIVE_URL, archive_params, team_data)
             return team_data
         except Exception as e:
-            print(f"Error fetching fantasy data from ESPN: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("Error fetching fantasy data from ESPN: %s", e, exc_info=True)
             return None
     
     def get_opponent_record(self, opponent_name: str, sport: str) -> Optional[Dict]:
         """Get record for an opponent team (used for context)"""
         try:
+            league = next((api for api, name in self.SOURCE_SPORTS.items() if name == sport), None)
+            if self.league_index is not None and league is not None and self.league_index.ingest(league):
+                record = self.league_index.team_record(league, opponent_name)
+                if record is not None:
+                    return record
             if sport == 'NFL':
                 return self.nfl.get_team_record(opponent_name)
             elif sport == 'NBA':
@@ -1047,202 +1142,336 @@ class SportsDataFetcher:
             elif sport == 'NCAA Football':
                 return self.college_football.get_team_record(opponent_name)
         except Exception as e:
-            print(f"Error fetching opponent record for {opponent_name} ({sport}): {e}")
+            logger.warning("Error fetching opponent record for %s (%s): %s", opponent_name, sport, e)
         return None
     
-    def fetch_all_data(self) -> Dict:
-        """Fetch data for all of Jason's teams"""
-        data = {
-            'cowboys': self.nfl.get_team_record('Dallas Cowboys'),
-            'mavericks': self.nba.get_team_record('Dallas Mavericks'),
-            'warriors': self.nba.get_team_record('Golden State Warriors'),
-            'rangers': self.mlb.get_team_record('Texas Rangers'),
-            'verstappen': self.f1.get_driver_standings('Verstappen'),
-            'unc_basketball': self.college_bball.get_team_record('North Carolina Tar Heels'),
-            'unc_football': self.college_football.get_team_record('North Carolina Tar Heels')
-        }
+    # Data sources in fetch (and priority) order: (key, API attribute, team/driver name)
+    SOURCES = [
+        ('cowboys', 'nfl', 'Dallas Cowboys'),
+        ('mavericks', 'nba', 'Dallas Mavericks'),
+        ('warriors', 'nba', 'Golden State Warriors'),
+        ('rangers', 'mlb', 'Texas Rangers'),
+        ('verstappen', 'f1', 'Verstappen'),
+        ('unc_basketball', 'college_bball', 'North Carolina Tar Heels'),
+        ('unc_football', 'college_football', 'North Carolina Tar Heels'),
+    ]
+    
+    # Sport stored with each API's games (matches the config's sport names)
+    SOURCE_SPORTS = {
+        'nfl': 'NFL',
+        'nba': 'NBA',
+        'mlb': 'MLB',
+        'college_bball': 'NCAA Basketball',
+        'college_football': 'NCAA Football',
+    }
+    
+    # Under a deadline, a source isn't started with less time than this left
+    MIN_SOURCE_SECONDS = 1.0
+    
+    def fetch_source(self, key: str) -> Optional[Dict]:
+        """Fetch record plus recent games (or races) for a single source"""
+        _, api_name, name = next(source for source in self.SOURCES if source[0] == key)
+        with span("fetch_source", source=key, api=api_name):
+            return self._fetch_source(api_name, name)
+    
+    def _fetch_source(self, api_name: str, name: str) -> Optional[Dict]:
+        # Each parse span covers the HTTP calls (child spans) plus parsing their payloads
+        api = getattr(self, api_name)
         
-        # Add recent games
-        if data['cowboys']:
-            data['cowboys']['recent_games'] = self.nfl.get_recent_games('Dallas Cowboys')
-        if data['mavericks']:
-            data['mavericks']['recent_games'] = self.nba.get_recent_games('Dallas Mavericks')
-        if data['warriors']:
-            data['warriors']['recent_games'] = self.nba.get_recent_games('Golden State Warriors')
-        if data['verstappen']:
-            data['verstappen']['recent_races'] = self.f1.get_recent_race_results('Verstappen')
-        if data['unc_basketball']:
-            data['unc_basketball']['recent_games'] = self.college_bball.get_recent_games('North Carolina Tar Heels')
-        if data['unc_football']:
-            data['unc_football']['recent_games'] = self.college_football.get_recent_games('North Carolina Tar Heels')
+        if api_name == 'f1':
+            with span("parse.driver_standings", api=api_name):
+                data = api.get_driver_standings(name)
+            if data:
+                with span("parse.race_results", api=api_name):
+                    data['recent_races'] = api.get_recent_race_results(name)
+            return data
         
+        data, games = self._from_league_index(api_name, name)
+        if data is None:
+            with span("parse.team_record", api=api_name):
+                data = api.get_team_record(name)
+        # MLB has no recent games endpoint yet (the league index may still have its games)
+        if data and not games and hasattr(api, 'get_recent_games_detailed'):
+            with span("parse.recent_games", api=api_name):
+                games = api.get_recent_games_detailed(name, RECENT_GAMES_WINDOW)
+        if data and games is not None:
+            data['recent_games'] = [game['result'] for game in games]
+            if self.game_store is not None:
+                try:
+                    self.game_store.upsert_games(name, self.SOURCE_SPORTS[api_name], games)
+                except Exception as e:
+                    logger.error("Error storing games for %s: %s", name, e)
         return data
     
-    def update_config_file(self, config_path: str = "teams_config.json"):
-        """Update the config file with fresh data"""
-        data = self.fetch_all_data()
+    def _from_league_index(self, api_name: str, name: str):
+        """(record, recent games) for a team from the league index; None for what it doesn't cover"""
+        if self.league_index is None or api_name not in LEAGUES:
+            return None, None
+        with span("parse.league_index", api=api_name):
+            if not self.league_index.ingest(api_name):
+                return None, None
+            return (self.league_index.team_record(api_name, name),
+                    self.league_index.recent_games(api_name, name, RECENT_GAMES_WINDOW))
+    
+    @traced("fetch_all_data")
+    def fetch_all_data(self, progress: Optional[Callable[[str, str], None]] = None,
+                       deadline: Union[float, "deadlines.Deadline", None] = None, reserve: int = 0) -> Dict:
+        """Fetch data for all of Jason's teams
         
+        Args:
+            progress: Optional callback called as progress(source_key, status)
+                with status "running", then "done" or "failed" ("skipped" if
+                the deadline ran out first)
+            deadline: Overall time limit in seconds (or a Deadline) for the
+                whole run, default FETCH_DEADLINE_SECONDS. The time left is
+                split evenly across the sources still to fetch and bounds every
+                HTTP call and fallback they make; once less than
+                MIN_SOURCE_SECONDS is left, the remaining (lowest-priority)
+                sources are skipped. What was skipped is in self.last_fetch.
+            reserve: Sources the caller fetches afterwards under the same
+                deadline (e.g. the fantasy team); they count toward the split
+                so the last source here doesn't take all the time left
+        """
+        deadline = deadlines.as_deadline(FETCH_DEADLINE_SECONDS if deadline is None else deadline)
+        started = time.monotonic()
+        budget = deadline.remaining() if deadline is not None else None
+        
+        data = {}
+        skipped = []
+        timed_out = []
+        for index, (key, _, _) in enumerate(self.SOURCES):
+            share = None
+            if deadline is not None:
+                if deadline.remaining() < self.MIN_SOURCE_SECONDS:
+                    data[key] = None
+                    skipped.append(key)
+                    if progress:
+                        progress(key, 'skipped')
+                    continue
+                share = deadline.share(len(self.SOURCES) + reserve - index, self.MIN_SOURCE_SECONDS)
+            if progress:
+                progress(key, 'running')
+            with deadlines.scope(share):
+                try:
+                    data[key] = self.fetch_source(key)
+                except Exception as e:
+                    logger.warning("Error fetching %s: %s", key, e)
+                    data[key] = None
+            if share is not None and share.expired:
+                timed_out.append(key)
+            if progress:
+                progress(key, 'done' if data[key] else 'failed')
+        
+        self.last_fetch = {
+            "deadline_seconds": round(budget, 3) if budget is not None else None,
+            "elapsed_seconds": round(time.monotonic() - started, 3),
+            "skipped": skipped,
+            "timed_out": timed_out,
+        }
+        if skipped or timed_out:
+            logger.warning("⏱️ Fetch deadline: skipped %s, ran out of time in %s",
+                           ", ".join(skipped) or "none", ", ".join(timed_out) or "none")
+        return data
+    
+    # How each team source finds its entry in config['teams']: (name substring, required sport)
+    TEAM_MATCHERS = {
+        'cowboys': ('cowboys', None),
+        'mavericks': ('mavericks', None),
+        'warriors': ('warriors', None),
+        'rangers': ('rangers', 'MLB'),
+        'unc_basketball': ('tar heels', 'NCAA Basketball'),
+        'unc_football': ('tar heels', 'NCAA Football'),
+    }
+    
+    # Sources whose team always gets a full W-L-T record and takes an empty recent_games as-is
+    FULL_RECORD_SOURCES = ('cowboys',)
+    
+    @staticmethod
+    def load_config(config_path: str) -> Optional[Dict]:
+        """Read teams_config.json for updating (None if it can't be updated safely)"""
         try:
             with open(config_path, 'r') as f:
                 config = json.load(f)
         except FileNotFoundError:
-            print(f"Config file {config_path} not found")
-            return
+            logger.info("Config file %s not found", config_path)
+            return None
         except json.JSONDecodeError as e:
-            print(f"Error: Config file {config_path} is not valid JSON: {e}")
-            print("Cannot update - please fix the config file first")
-            return
+            logger.error("Config file %s is not valid JSON, not updating it (fix the file first): %s", config_path, e)
+            return None
         except Exception as e:
-            print(f"Error reading config file: {e}")
-            return
+            logger.error("Error reading config file: %s", e)
+            return None
         
         # Ensure config structure is valid
         if not isinstance(config, dict):
-            print("Error: Config file is not a valid JSON object")
-            return
+            logger.error("Config file is not a valid JSON object")
+            return None
         
         if "teams" not in config:
             config["teams"] = []
+        return config
+    
+    @staticmethod
+    def save_config(config_path: str, config: Dict) -> bool:
+        """Write teams_config.json atomically (readers never see a half-written file)"""
+        tmp_path = f"{config_path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(config, f, indent=2)
+            os.replace(tmp_path, config_path)
+            logger.info("✅ Updated %s with fresh data!", config_path)
+            return True
+        except Exception as e:
+            logger.error("❌ Error saving config file (left unchanged to prevent data loss): %s", e, exc_info=True)
+            return False
+    
+    @classmethod
+    def apply_source(cls, config: Dict, key: str, data: Optional[Dict]):
+        """Merge one source's fetched data (from fetch_source) into the config"""
+        if not data:
+            return
         
-        # Update Cowboys
-        if data['cowboys']:
-            for team in config['teams']:
-                if 'cowboys' in team['name'].lower():
-                    # Ensure record structure exists
-                    if 'record' not in team:
-                        team['record'] = {}
-                    team['record']['wins'] = int(data['cowboys'].get('wins', team['record'].get('wins', 0)))
-                    team['record']['losses'] = int(data['cowboys'].get('losses', team['record'].get('losses', 0)))
-                    # Preserve ties if not in API data
-                    if 'ties' in data['cowboys']:
-                        team['record']['ties'] = int(data['cowboys']['ties'])
-                    elif 'ties' not in team['record']:
-                        team['record']['ties'] = 0
-                    if 'recent_games' in data['cowboys']:
-                        team['recent_streak'] = data['cowboys']['recent_games']
+        if key == 'verstappen':
+            if 'f1_driver' in config:
+                config['f1_driver']['championship_position'] = data['position']
+                if 'recent_races' in data:
+                    config['f1_driver']['recent_races'] = data['recent_races']
+                
+                # Count DNFs
+                dnf_count = sum(1 for r in data.get('recent_races', []) if r == 'DNF')
+                config['f1_driver']['recent_dnfs'] = dnf_count
+            return
         
-        # Update Mavericks
-        if data['mavericks']:
-            for team in config['teams']:
-                if 'mavericks' in team.get('name', '').lower():
-                    if 'record' not in team:
-                        team['record'] = {}
-                    if 'wins' in data['mavericks']:
-                        team['record']['wins'] = int(data['mavericks']['wins'])
-                    if 'losses' in data['mavericks']:
-                        team['record']['losses'] = int(data['mavericks']['losses'])
-                    if 'recent_games' in data['mavericks'] and data['mavericks']['recent_games']:
-                        team['recent_streak'] = data['mavericks']['recent_games']
+        needle, sport = cls.TEAM_MATCHERS[key]
+        for team in config['teams']:
+            if needle not in team.get('name', '').lower():
+                continue
+            if sport and team.get('sport') != sport:
+                continue
+            # Ensure record structure exists
+            if 'record' not in team:
+                team['record'] = {}
+            if 'wins' in data:
+                team['record']['wins'] = int(data['wins'])
+            if 'losses' in data:
+                team['record']['losses'] = int(data['losses'])
+            # Preserve ties if not in API data
+            if 'ties' in data:
+                team['record']['ties'] = int(data['ties'])
+            if key in cls.FULL_RECORD_SOURCES:
+                # Always a complete W-L-T record, and an empty schedule clears the streak
+                for field in ('wins', 'losses', 'ties'):
+                    team['record'].setdefault(field, 0)
+                if 'recent_games' in data:
+                    team['recent_streak'] = data['recent_games']
+            elif data.get('recent_games'):
+                team['recent_streak'] = data['recent_games']
+    
+    @staticmethod
+    def fantasy_configured(config: Dict) -> bool:
+        """Whether the config has ESPN credentials for a fantasy update"""
+        espn_config = config.get('fantasy_team', {}).get('espn', {})
+        return bool(espn_config.get('league_id') and espn_config.get('year'))
+    
+    @staticmethod
+    def apply_fantasy(config: Dict, fantasy_api_data: Optional[Dict], quiet: bool = False):
+        """Merge fetched ESPN fantasy data into the config"""
+        if not fantasy_api_data:
+            if not quiet:
+                logger.warning("⚠️ Could not fetch fantasy data from ESPN. Check your credentials or network connection.")
+            return
         
-        # Update Warriors
-        if data['warriors']:
-            for team in config['teams']:
-                if 'warriors' in team.get('name', '').lower():
-                    if 'record' not in team:
-                        team['record'] = {}
-                    if 'wins' in data['warriors']:
-                        team['record']['wins'] = int(data['warriors']['wins'])
-                    if 'losses' in data['warriors']:
-                        team['record']['losses'] = int(data['warriors']['losses'])
-                    if 'recent_games' in data['warriors'] and data['warriors']['recent_games']:
-                        team['recent_streak'] = data['warriors']['recent_games']
+        # Ensure fantasy_team section exists
+        if 'fantasy_team' not in config:
+            config['fantasy_team'] = {}
         
-        # Update Rangers
-        if data['rangers']:
-            for team in config['teams']:
-                if 'rangers' in team.get('name', '').lower() and team.get('sport') == 'MLB':
-                    if 'record' not in team:
-                        team['record'] = {}
-                    if 'wins' in data['rangers']:
-                        team['record']['wins'] = int(data['rangers']['wins'])
-                    if 'losses' in data['rangers']:
-                        team['record']['losses'] = int(data['rangers']['losses'])
+        # Update record
+        if 'record' not in config['fantasy_team']:
+            config['fantasy_team']['record'] = {}
         
-        # Update UNC Basketball
-        if data['unc_basketball']:
-            for team in config['teams']:
-                if 'tar heels' in team.get('name', '').lower() and team.get('sport') == 'NCAA Basketball':
-                    if 'record' not in team:
-                        team['record'] = {}
-                    if 'wins' in data['unc_basketball']:
-                        team['record']['wins'] = int(data['unc_basketball']['wins'])
-                    if 'losses' in data['unc_basketball']:
-                        team['record']['losses'] = int(data['unc_basketball']['losses'])
-                    if 'recent_games' in data['unc_basketball'] and data['unc_basketball']['recent_games']:
-                        team['recent_streak'] = data['unc_basketball']['recent_games']
+        config['fantasy_team']['record']['wins'] = int(fantasy_api_data.get('wins', config['fantasy_team']['record'].get('wins', 0)))
+        config['fantasy_team']['record']['losses'] = int(fantasy_api_data.get('losses', config['fantasy_team']['record'].get('losses', 0)))
         
-        # Update UNC Football
-        if data['unc_football']:
-            for team in config['teams']:
-                if 'tar heels' in team.get('name', '').lower() and team.get('sport') == 'NCAA Football':
-                    if 'record' not in team:
-                        team['record'] = {}
-                    if 'wins' in data['unc_football']:
-                        team['record']['wins'] = int(data['unc_football']['wins'])
-                    if 'losses' in data['unc_football']:
-                        team['record']['losses'] = int(data['unc_football']['losses'])
-                    if 'recent_games' in data['unc_football'] and data['unc_football']['recent_games']:
-                        team['recent_streak'] = data['unc_football']['recent_games']
+        # Update recent streak
+        if 'recent_streak' in fantasy_api_data:
+            config['fantasy_team']['recent_streak'] = fantasy_api_data['recent_streak']
         
-        # Update Verstappen
-        if data['verstappen']:
-            if 'f1_driver' in config:
-                config['f1_driver']['championship_position'] = data['verstappen']['position']
-                if 'recent_races' in data['verstappen']:
-                    config['f1_driver']['recent_races'] = data['verstappen']['recent_races']
-                
-                # Count DNFs
-                dnf_count = sum(1 for r in data['verstappen'].get('recent_races', []) if r == 'DNF')
-                config['f1_driver']['recent_dnfs'] = dnf_count
+        # Update name if it changed
+        if 'name' in fantasy_api_data:
+            config['fantasy_team']['name'] = fantasy_api_data['name']
+        
+        if not quiet:
+            logger.info("✅ Updated fantasy team '%s' from ESPN (record %s-%s)", fantasy_api_data.get('name', 'Fantasy Team'),
+                        fantasy_api_data.get('wins', 0), fantasy_api_data.get('losses', 0))
+    
+    def update_config_file(self, config_path: str = "teams_config.json",
+                           progress: Optional[Callable[[str, str], None]] = None,
+                           deadline: Union[float, "deadlines.Deadline", None] = None) -> Optional[Dict]:
+        """Update the config file with fresh data
+        
+        Args:
+            config_path: Path to teams_config.json
+            progress: Optional per-source progress callback (see fetch_all_data)
+            deadline: Overall time limit for the run (see fetch_all_data); the
+                fantasy team, fetched last, is skipped if it has run out
+        
+        Returns:
+            The run's report (self.last_fetch): deadline, elapsed time, skipped and timed-out sources
+        """
+        deadline = deadlines.as_deadline(FETCH_DEADLINE_SECONDS if deadline is None else deadline)
+        # The fantasy team is fetched after the others and needs its share of the deadline
+        reserve = 0
+        if deadline is not None:
+            config = self.load_config(config_path)
+            reserve = int(config is not None and 'fantasy_team' in config and self.fantasy_configured(config))
+        data = self.fetch_all_data(progress=progress, deadline=deadline, reserve=reserve)
+        
+        config = self.load_config(config_path)
+        if config is None:
+            return self.last_fetch
+        
+        events = [source_event(key, data[key]) for key, _, _ in self.SOURCES if data.get(key)]
         
         # Update Fantasy Team (if ESPN credentials are configured)
         if 'fantasy_team' in config:
-            fantasy_data = config.get('fantasy_team', {})
-            espn_config = fantasy_data.get('espn', {})
-            
-            if espn_config.get('league_id') and espn_config.get('year'):
-                print("Fetching fantasy data from ESPN API...")
-                fantasy_api_data = self.fetch_fantasy_data(espn_config)
-                
+            if self.fantasy_configured(config) and deadline is not None and deadline.remaining() < self.MIN_SOURCE_SECONDS:
+                self.last_fetch["skipped"].append('fantasy')
+                logger.warning("⏱️ Fetch deadline: skipped fantasy")
+                if progress:
+                    progress('fantasy', 'skipped')
+            elif self.fantasy_configured(config):
+                logger.info("Fetching fantasy data from ESPN API...")
+                if progress:
+                    progress('fantasy', 'running')
+                with deadlines.scope(deadline):
+                    fantasy_api_data = self.fetch_fantasy_data(config['fantasy_team']['espn'])
+                if progress:
+                    progress('fantasy', 'done' if fantasy_api_data else 'failed')
                 if fantasy_api_data:
-                    # Ensure fantasy_team section exists
-                    if 'fantasy_team' not in config:
-                        config['fantasy_team'] = {}
-                    
-                    # Update record
-                    if 'record' not in config['fantasy_team']:
-                        config['fantasy_team']['record'] = {}
-                    
-                    config['fantasy_team']['record']['wins'] = int(fantasy_api_data.get('wins', config['fantasy_team']['record'].get('wins', 0)))
-                    config['fantasy_team']['record']['losses'] = int(fantasy_api_data.get('losses', config['fantasy_team']['record'].get('losses', 0)))
-                    
-                    # Update recent streak
-                    if 'recent_streak' in fantasy_api_data:
-                        config['fantasy_team']['recent_streak'] = fantasy_api_data['recent_streak']
-                    
-                    # Update name if it changed
-                    if 'name' in fantasy_api_data:
-                        config['fantasy_team']['name'] = fantasy_api_data['name']
-                    
-                    print(f"✅ Updated fantasy team '{fantasy_api_data.get('name', 'Fantasy Team')}' from ESPN")
-                    print(f"   Record: {fantasy_api_data.get('wins', 0)}-{fantasy_api_data.get('losses', 0)}")
+                    events.append(source_event('fantasy', fantasy_api_data))
+                    logger.info("✅ Fetched fantasy team '%s' from ESPN", fantasy_api_data.get('name', 'Fantasy Team'))
                 else:
-                    print("⚠️  Could not fetch fantasy data from ESPN. Check your credentials or network connection.")
+                    self.apply_fantasy(config, fantasy_api_data)
             else:
-                print("ℹ️  Fantasy team ESPN credentials not configured. Skipping fantasy update.")
-                print("   To enable automatic fantasy updates, add an 'espn' section to fantasy_team in config.")
+                logger.info("ℹ️ Fantasy team ESPN credentials not configured, skipping fantasy update "
+                            "(add an 'espn' section to fantasy_team in config to enable it)")
         
-        # Save updated config with error handling
+        # Append-only: the compactor folds these into the config, readers replay the tail.
+        # Without an event log of our own, fold them in right away, still under the
+        # log's lock, so this write can't race a compaction of the same config
+        event_log = self.event_log if self.event_log is not None else EventLog(config_path)
         try:
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=2)
-            print(f"✅ Updated {config_path} with fresh data!")
-        except Exception as e:
-            print(f"❌ Error saving config file: {e}")
-            print("Config file was not updated to prevent data loss")
-            import traceback
-            traceback.print_exc()
-
+            event_log.append_many(events)
+            event_log.sync()
+            logger.info("✅ Logged %s ingest events to %s", len(events), event_log.path)
+            if self.event_log is None:
+                event_log.compact()
+        except OSError as e:
+            logger.error("❌ Error saving fetched data (config left unchanged): %s", e)
+        finally:
+            if self.event_log is None:
+                event_log.close()
+        return self.last_fetch
 
 if __name__ == "__main__":
     # Test the API fetcher
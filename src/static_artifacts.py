@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Static API Artifacts
+Pre-rendered JSON responses built once per data update and served as files
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .snapshot import LIVE_SECTIONS, SECTIONS, SnapshotStore
+from .response_encoding import content_etag
+from .event_log import default_event_log_path, last_event_seq
+from .game_store import default_game_store_path
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Section -> artifact file name (matches the /api/* route names). Live
+# sections (recent games, upcoming events) are never pre-rendered: they
+# carry relative dates ("Tomorrow") and upstream data that go stale on
+# their own, so they are always computed by the snapshot.
+ARTIFACT_FILES = {
+    "depression": "depression.json",
+    "teams": "teams.json",
+}
+PREBUILT_SECTIONS = tuple(name for name in SECTIONS if name not in LIVE_SECTIONS)
+MANIFEST_NAME = "manifest.json"
+DEFAULT_OUT_DIR = "static_api"
+
+# Older version directories kept around so clients holding the previous
+# manifest don't get 404s right after a deploy
+KEEP_VERSIONS = 2
+
+
+def sha256_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def data_fingerprint(config_path: str) -> Dict[str, Optional[object]]:
+    """What the artifacts were scored from: config and game store hashes, event log position
+
+    Content-based (not mtimes), so a fresh checkout of the same data on a
+    deploy still matches.
+    """
+    game_store_path = default_game_store_path(config_path)
+    return {
+        "config_sha256": sha256_file(config_path),
+        "event_log_seq": last_event_seq(default_event_log_path(config_path)) or 0,
+        "game_store_sha256": sha256_file(game_store_path) if os.path.exists(game_store_path) else None,
+    }
+
+
+def _fingerprint_files(config_path: str) -> List[str]:
+    return [config_path, default_event_log_path(config_path), default_game_store_path(config_path)]
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def build_artifacts(config_path: str, out_dir: str = DEFAULT_OUT_DIR, use_espn_api: bool = True) -> Dict:
+    """Score the config once and write every section as a static JSON file
+
+    Layout::
+
+        out_dir/manifest.json                 current version, etags, data fingerprint
+        out_dir/<version>/depression.json     immutable, content-addressed
+        out_dir/<version>/teams.json
+
+    Returns:
+        The manifest that was written
+    """
+    # Fingerprint first: data that lands mid-build makes the artifacts stale, not wrongly fresh
+    fingerprint = data_fingerprint(config_path)
+    snapshot = SnapshotStore(config_path, use_espn_api=use_espn_api).get()
+    bodies = {name: snapshot.section(name)[1] for name in PREBUILT_SECTIONS}
+
+    digest = hashlib.sha256()
+    for name in PREBUILT_SECTIONS:
+        digest.update(bodies[name])
+    version = digest.hexdigest()[:12]
+
+    version_dir = os.path.join(out_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    files = {}
+    for name in PREBUILT_SECTIONS:
+        file_name = ARTIFACT_FILES[name]
+        _write_atomic(os.path.join(version_dir, file_name), bodies[name])
+        files[name] = {
+            "path": f"{version}/{file_name}",
+            "etag": content_etag(bodies[name]),
+            "bytes": len(bodies[name]),
+        }
+
+    manifest = {
+        "version": version,
+        "snapshot_version": snapshot.version,
+        "data": fingerprint,
+        # Absolute start times only, for cache lifetimes (see cache_policy.freshness_lifetime)
+        "schedule": [{"datetime": event.get("datetime"), "sport": event.get("sport")}
+                     for event in snapshot.section("upcoming_events")[0].get("events", [])],
+        "generated_at": datetime.now().isoformat(),
+        "files": files,
+    }
+    # Manifest last, so readers never see a version whose files aren't there yet
+    _write_atomic(os.path.join(out_dir, MANIFEST_NAME), json.dumps(manifest, indent=2).encode("utf-8"))
+    _prune_versions(out_dir, keep=version)
+    return manifest
+
+
+def _prune_versions(out_dir: str, keep: str):
+    """Remove all but the newest KEEP_VERSIONS version directories"""
+    version_dirs = [
+        os.path.join(out_dir, d) for d in os.listdir(out_dir)
+        if os.path.isdir(os.path.join(out_dir, d))
+    ]
+    version_dirs.sort(key=os.path.getmtime, reverse=True)
+    for path in version_dirs[KEEP_VERSIONS:]:
+        if os.path.basename(path) != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class ArtifactReader:
+    """
+    Serves pre-built artifacts, cached in memory across warm invocations.
+
+    Artifacts are only used while they were built from the data currently
+    on disk: the config, the event log and the game store must all match
+    the manifest's fingerprint. If any of them changed after the build (or
+    no artifacts exist), ``get`` returns None and callers compute live.
+    """
+
+    def __init__(self, out_dir: str, config_path: str):
+        self.out_dir = out_dir
+        self.config_path = config_path
+        self._manifest: Optional[Dict] = None
+        self._manifest_mtime: Optional[int] = None
+        self._fingerprint: Optional[Dict] = None
+        self._fingerprint_stats: Optional[List] = None
+        self._bodies: Dict[str, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Optional[Dict]:
+        manifest_path = os.path.join(self.out_dir, MANIFEST_NAME)
+        try:
+            manifest_mtime = os.stat(manifest_path).st_mtime_ns
+        except OSError:
+            return None
+        # Files are only hashed again when one of them changed on disk
+        stats = [_stat_key(path) for path in _fingerprint_files(self.config_path)]
+        if stats[0] is None:
+            return None
+
+        with self._lock:
+            if manifest_mtime != self._manifest_mtime:
+                with open(manifest_path, "rb") as f:
+                    self._manifest = json.loads(f.read())
+                self._manifest_mtime = manifest_mtime
+                self._bodies = {}
+            if stats != self._fingerprint_stats:
+                self._fingerprint = data_fingerprint(self.config_path)
+                self._fingerprint_stats = stats
+            if self._manifest.get("data") != self._fingerprint:
+                return None
+            return self._manifest
+
+    def get(self, name: str) -> Optional[Tuple[bytes, str]]:
+        """Get (body, etag) for a section, or None if there is no current artifact"""
+        try:
+            manifest = self._load()
+            if manifest is None or name not in manifest.get("files", {}):
+                return None
+            cached = self._bodies.get(name)
+            if cached is None:
+                entry = manifest["files"][name]
+                with open(os.path.join(self.out_dir, entry["path"]), "rb") as f:
+                    cached = (f.read(), entry["etag"])
+                self._bodies[name] = cached
+            return cached
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("⚠️ Static artifact %s unavailable: %s", name, e)
+            return None
+
+    def last_modified(self) -> Optional[float]:
+        """When the current artifacts were generated (epoch seconds)"""
+        manifest = self._manifest
+        if manifest is None:
+            return None
+        try:
+            return datetime.fromisoformat(manifest["generated_at"]).timestamp()
+        except (KeyError, ValueError):
+            return None
+
+    def upcoming_events(self) -> List[Dict]:
+        """Start times and sports of the events upcoming at build time (for cache lifetimes)"""
+        manifest = self._manifest
+        return manifest.get("schedule", []) if manifest else []
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tracing
+Lightweight parent/child spans exported as OpenTelemetry-style JSON lines
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, TextIO, Union
+
+
+class Span:
+    """One timed operation; children point at it through parent_span_id"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "start_ns", "end_ns", "attributes", "status")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent.span_id if parent is not None else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = "OK"
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict:
+        """Field names follow the OpenTelemetry span data model (OTLP JSON)"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is off"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+_current: ContextVar[Optional[Span]] = ContextVar("dashboard_span", default=None)
+
+
+class JsonLinesExporter:
+    """Writes each finished span as one JSON line to a stream (flushed when a trace's root ends)"""
+
+    def __init__(self, stream: TextIO, close_stream: bool = False):
+        self.stream = stream
+        self._close_stream = close_stream
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            if span.parent_span_id is None:
+                self.stream.flush()
+
+    def close(self):
+        with self._lock:
+            self.stream.flush()
+            if self._close_stream:
+                self.stream.close()
+
+
+_exporter: Optional[JsonLinesExporter] = None
+
+
+def configure(target: Union[str, TextIO, None]) -> Optional[JsonLinesExporter]:
+    """Send spans to "stdout", "stderr", a file path (appended) or an open stream; None or "" turns tracing off"""
+    global _exporter
+    if _exporter is not None:
+        _exporter.close()
+    if not target:
+        _exporter = None
+    elif not isinstance(target, str):
+        _exporter = JsonLinesExporter(target)
+    elif target in ("stdout", "stderr"):
+        _exporter = JsonLinesExporter(sys.stdout if target == "stdout" else sys.stderr)
+    else:
+        _exporter = JsonLinesExporter(open(target, "a", buffering=1 << 16), close_stream=True)
+    return _exporter
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time the with-block as a child of the current span (or as a new trace's root)
+
+    Yields the span so callers can add attributes; while tracing is off this
+    is a no-op that yields a stand-in.
+    """
+    exporter = _exporter
+    if exporter is None:
+        yield _NOOP
+        return
+    current = Span(name, _current.get(), attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "ERROR"
+        current.attributes["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        exporter.export(current)
+
+
+def traced(name: str, attributes: Optional[Callable[..., Dict[str, Any]]] = None):
+    """Decorator form of span; attributes(*args, **kwargs) supplies span attributes from the call"""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _exporter is None:
+                return fn(*args, **kwargs)
+            with span(name, **(attributes(*args, **kwargs) if attributes else {})):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# TRACE_EXPORT=stdout|stderr|<path> enables tracing for the whole process
+configure(os.environ.get("TRACE_EXPORT"))
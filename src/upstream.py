@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Upstream HTTP
+Shared requests session for ESPN/OpenF1 calls, with a raw payload archive for offline replay
+"""
+
+import os
+import gzip
+import json
+import time
+import uuid
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+try:
+    from .metrics import UPSTREAM_RETRIES, UPSTREAM_SHORT_CIRCUITS, UPSTREAM_THROTTLE_SECONDS, record_upstream
+    from .tracing import span
+    from .log import get_logger
+    from .circuit_breaker import DEFAULT_GUARD, CircuitOpenError, UpstreamGuard, UpstreamUnavailable
+    from .retry import DEFAULT_LIMITER, HostRateLimiter, RetryPolicy, retry_after_seconds
+    from .deadline import DeadlineExceeded, clamp_timeout, current as current_deadline
+except ImportError:
+    # Fall back to a sibling import (when run as a script from src/)
+    from metrics import UPSTREAM_RETRIES, UPSTREAM_SHORT_CIRCUITS, UPSTREAM_THROTTLE_SECONDS, record_upstream
+    from tracing import span
+    from log import get_logger
+    from circuit_breaker import DEFAULT_GUARD, CircuitOpenError, UpstreamGuard, UpstreamUnavailable
+    from retry import DEFAULT_LIMITER, HostRateLimiter, RetryPolicy, retry_after_seconds
+    from deadline import DeadlineExceeded, clamp_timeout, current as current_deadline
+
+logger = get_logger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+ARCHIVE_DIRNAME = "upstream_archive"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    parser_version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL REFERENCES runs (run_id),
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    content_type TEXT,
+    sha256 TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_run_url ON responses (run_id, url);
+"""
+
+
+def default_archive_dir(config_path: str) -> str:
+    """upstream_archive/ next to teams_config.json (override with UPSTREAM_ARCHIVE_DIR)"""
+    return os.environ.get("UPSTREAM_ARCHIVE_DIR") or os.path.join(
+        os.path.dirname(os.path.abspath(config_path)), ARCHIVE_DIRNAME)
+
+
+class PayloadArchive:
+    """
+    Every raw upstream response body, stored once.
+
+    Bodies are gzip-compressed and content-addressed by SHA-256 under
+    ``objects/``, so a schedule that hasn't changed between fetches costs
+    one index row rather than another copy. ``index.sqlite3`` groups the
+    responses into runs (one per fetching session) tagged with the parser
+    version that was current when they were captured.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], digest[2:] + ".gz")
+
+    def put(self, body: bytes) -> str:
+        """Store a body (no-op if already present); returns its SHA-256"""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(gzip.compress(body, compresslevel=6))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def start_run(self, run_id: str, parser_version: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, started_at, parser_version) VALUES (?, ?, ?)",
+                (run_id, datetime.now().isoformat(), parser_version),
+            )
+
+    def record(self, run_id: str, url: str, status: int, content_type: Optional[str], body: bytes):
+        digest = self.put(body)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO responses (run_id, url, status, content_type, sha256, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, url, status, content_type, digest, datetime.now().isoformat()),
+            )
+
+    def runs(self, since: Optional[str] = None) -> List[Dict]:
+        """Captured runs, oldest first"""
+        query = ("SELECT runs.*, COUNT(responses.id) AS responses FROM runs"
+                 " LEFT JOIN responses ON responses.run_id = runs.run_id")
+        params = []
+        if since:
+            query += " WHERE runs.started_at >= ?"
+            params.append(since)
+        query += " GROUP BY runs.run_id ORDER BY runs.started_at"
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(query, params).fetchall()]
+
+    def lookup(self, run_id: Optional[str], url: str) -> Optional[Dict]:
+        """Latest response for a URL within a run (or across all runs if run_id is None)"""
+        query = "SELECT * FROM responses WHERE url = ?"
+        params = [url]
+        if run_id is not None:
+            query += " AND run_id = ?"
+            params.append(run_id)
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        return dict(row) if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class UpstreamSession(requests.Session):
+    """
+    Session shared by every sports API client of one fetcher.
+
+    With an archive, each GET's raw body is recorded (under this session's
+    run) before the parsers see it; the run is tagged with
+    ``parser_version`` so replays know which parser produced the stored data.
+
+    With a ``base_url`` (or UPSTREAM_BASE_URL), requests for
+    ``https://<host>/<path>`` go to ``<base_url>/<host>/<path>`` instead,
+    e.g. a local FakeUpstreamServer; nothing is archived then.
+
+    Every call goes through an UpstreamGuard: connection errors, timeouts
+    and 5xx responses count against the host's circuit breaker and put the
+    URL in the negative cache. While either says the upstream is down,
+    calls fail fast with UpstreamUnavailable, or get the URL's last good
+    response (marked ``X-Upstream-Stale``) if there is one.
+
+    Each attempt first takes a slot from the per-host rate limiter; failed
+    idempotent calls (connection errors, timeouts, 429/5xx) are retried
+    with jittered exponential backoff, and a 429's Retry-After pauses the
+    whole host. Retries happen before the breaker sees the outcome, so a
+    blip that a retry absorbs doesn't count as a failure. Live sessions
+    share one process-wide guard and limiter; offline sessions get their own.
+
+    Inside a ``deadline.scope``, every attempt's timeout is cut to the time
+    left, no retry is waited for that wouldn't start in time, and once the
+    deadline has passed calls raise DeadlineExceeded (or get the last good
+    response). Running out of time doesn't count against the host.
+    """
+
+    def __init__(self, archive: Optional[PayloadArchive] = None, parser_version: int = 0,
+                 base_url: Optional[str] = None, guard: Optional[UpstreamGuard] = None,
+                 retry: Optional[RetryPolicy] = None, limiter: Optional[HostRateLimiter] = None):
+        super().__init__()
+        self.headers.update({'User-Agent': USER_AGENT})
+        self.archive = archive
+        self.parser_version = parser_version
+        self.base_url = (base_url or os.environ.get("UPSTREAM_BASE_URL") or "").rstrip("/") or None
+        self.run_id = uuid.uuid4().hex[:12]
+        self._run_started = False
+        self.guard = guard or (UpstreamGuard() if self.offline else DEFAULT_GUARD)
+        self.retry = retry or RetryPolicy()
+        self.limiter = limiter or (HostRateLimiter() if self.offline else DEFAULT_LIMITER)
+
+    @property
+    def offline(self) -> bool:
+        """Whether responses come from recordings rather than the real upstreams"""
+        return self.base_url is not None
+
+    def archive_key(self, method: str, url: str, params=None) -> str:
+        """The URL a request is archived under (query params included)"""
+        return self.prepare_request(requests.Request(method.upper(), url, params=params)).url
+
+    def _rewrite(self, url: str) -> str:
+        parts = urlsplit(url)
+        return f"{self.base_url}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+    def _archive(self, key: str, status: int, content_type: Optional[str], body: bytes):
+        try:
+            if not self._run_started:
+                self.archive.start_run(self.run_id, self.parser_version)
+                self._run_started = True
+            self.archive.record(self.run_id, key, status, content_type, body)
+        except Exception as e:
+            logger.warning("⚠️ Could not archive %s: %s", key, e)
+
+    def archive_json(self, url: str, params: Optional[Dict], data) -> None:
+        """Archive data fetched outside this session (e.g. by the espn-api library) as a JSON response"""
+        if self.archive is not None and not self.offline:
+            self._archive(self.archive_key("GET", url, params), 200, "application/json",
+                          json.dumps(data).encode("utf-8"))
+
+    def _timed_request(self, method, url, target, *args, **kwargs):
+        """Send the request to target, recording metrics under the upstream URL"""
+        with span(f"http {method.upper()}", url=url) as current:
+            started = time.perf_counter()
+            try:
+                response = super().request(method, target, *args, **kwargs)
+            except requests.exceptions.RequestException:
+                record_upstream(url, None, time.perf_counter() - started)
+                raise
+            record_upstream(url, response.status_code, time.perf_counter() - started, len(response.content))
+            current.set_attribute("status", response.status_code)
+            current.set_attribute("bytes", len(response.content))
+        return response
+
+    def _send_with_retries(self, method, url, target, host, *args, **kwargs):
+        """Paced and retried send; returns the last response or raises the last error"""
+        attempt = 0
+        deadline = current_deadline()
+        timeout = kwargs.pop("timeout", None)
+        while True:
+            waited = self.limiter.acquire(host, max_wait=deadline.remaining() if deadline is not None else None)
+            if waited is None:
+                # Paced or paused (Retry-After) past the deadline: don't sleep just to fail
+                raise DeadlineExceeded(f"Deadline would pass waiting for a slot on {host}")
+            if waited:
+                UPSTREAM_THROTTLE_SECONDS.inc(waited, host=host)
+            response = error = None
+            try:
+                response = self._timed_request(method, url, target, *args,
+                                               timeout=clamp_timeout(timeout, url), **kwargs)
+            except (UpstreamUnavailable, DeadlineExceeded):
+                raise
+            except requests.exceptions.RequestException as e:
+                if deadline is not None and deadline.expired:
+                    # Cut off by the deadline's shortened timeout, not by the host
+                    raise DeadlineExceeded(f"Deadline passed during {url}") from e
+                error = e
+            delay = self.retry.delay(method, attempt, response, error)
+            if delay is not None and deadline is not None and delay >= deadline.remaining():
+                # The retry couldn't start before the deadline; settle for this outcome
+                delay = None
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            UPSTREAM_RETRIES.inc(host=host, reason=response.status_code if response is not None else "error")
+            if response is not None and response.status_code == 429 and retry_after_seconds(response) is not None:
+                # Every caller for this host waits out Retry-After (in acquire), not just this one
+                self.limiter.pause(host, delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def _stale_response(self, key: str, host: str, reason: str, error: Exception) -> requests.Response:
+        """The key's last good response, or re-raise error if there is none"""
+        entry = self.guard.last_good.get(key)
+        UPSTREAM_SHORT_CIRCUITS.inc(host=host, reason=reason, served="stale" if entry else "none")
+        if entry is None:
+            raise error
+        status, content_type, body = entry
+        response = requests.Response()
+        response.status_code = status
+        response._content = body
+        response.url = key
+        response.encoding = "utf-8"
+        response.request = self.prepare_request(requests.Request("GET", key))
+        if content_type:
+            response.headers["Content-Type"] = content_type
+        response.headers["X-Upstream-Stale"] = "1"
+        return response
+
+    def _guarded_request(self, method, url, key, *args, **kwargs):
+        host = urlsplit(url).netloc
+        guard = self.guard
+        get = method.upper() == "GET"
+        try:
+            if get:
+                guard.negative.check(key)
+            probe = guard.breaker.before(host)
+        except UpstreamUnavailable as e:
+            if not get:
+                raise
+            return self._stale_response(key, host, "circuit_open" if isinstance(e, CircuitOpenError) else "negative_cache", e)
+
+        target = self._rewrite(url) if self.base_url is not None else url
+        try:
+            response = self._send_with_retries(method, url, target, host, *args, **kwargs)
+        except DeadlineExceeded as e:
+            # Says nothing about the host: free a half-open probe for the next caller
+            if probe:
+                guard.breaker.release(host)
+            if not get:
+                raise
+            return self._stale_response(key, host, "deadline", e)
+        except requests.exceptions.RequestException as e:
+            guard.breaker.failure(host)
+            if not get:
+                raise
+            guard.negative.add(key)
+            return self._stale_response(key, host, "error", e)
+        except BaseException:
+            if probe:
+                guard.breaker.release(host)
+            raise
+
+        if response.status_code >= 500:
+            guard.breaker.failure(host)
+            if get:
+                guard.negative.add(key)
+                if guard.last_good.get(key) is not None:
+                    return self._stale_response(key, host, "error", None)
+            return response
+        guard.breaker.success(host)
+        if get and response.status_code == 200:
+            guard.last_good.put(key, 200, response.headers.get("Content-Type"), response.content)
+        return response
+
+    def request(self, method, url, *args, **kwargs):
+        key = self.archive_key(method, url, kwargs.get("params"))
+        response = self._guarded_request(method, url, key, *args, **kwargs)
+        if (self.archive is not None and not self.offline and method.upper() == "GET"
+                and "X-Upstream-Stale" not in response.headers):
+            self._archive(key, response.status_code, response.headers.get("Content-Type"), response.content)
+        return response
+
+
+class ReplaySession(UpstreamSession):
+    """Answers requests from one archived run instead of the network
+
+    URLs that weren't captured in the run get an empty 404, which the
+    parsers already treat as "no data".
+    """
+
+    def __init__(self, archive: PayloadArchive, run_id: str):
+        super().__init__()
+        self.source = archive
+        self.run_id = run_id
+
+    @property
+    def offline(self) -> bool:
+        return True
+
+    def request(self, method, url, *args, **kwargs):
+        key = self.archive_key(method, url, kwargs.get("params"))
+        entry = self.source.lookup(self.run_id, key)
+        response = requests.Response()
+        response.url = key
+        response.request = self.prepare_request(requests.Request(method.upper(), key))
+        response.encoding = "utf-8"
+        if entry is None:
+            response.status_code = 404
+            response._content = b""
+        else:
+            response.status_code = entry["status"]
+            response._content = self.source.get(entry["sha256"])
+            if entry["content_type"]:
+                response.headers["Content-Type"] = entry["content_type"]
+        return response
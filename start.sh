@@ -1,6 +1,6 @@
 #!/bin/bash
 cd backend
-gunicorn --bind 0.0.0.0:$PORT app:app
+gunicorn -c ../gunicorn.conf.py --bind 0.0.0.0:$PORT asgi:app
 
 
 
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the ASGI adapter: the event-loop stream and the WSGI bridge
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.asgi import make_asgi_app
+from src.event_stream import EventBroker
+from tests.test_event_stream import HELLO
+
+
+def wsgi_echo(environ, start_response):
+    body = json.dumps({
+        "method": environ["REQUEST_METHOD"],
+        "path": environ["PATH_INFO"],
+        "query": environ["QUERY_STRING"],
+        "accept": environ.get("HTTP_ACCEPT"),
+        "body": environ["wsgi.input"].read().decode(),
+    }).encode()
+    start_response("201 Created", [("Content-Type", "application/json"), ("X-Worker", "wsgi")])
+    return [body]
+
+
+class Client:
+    """One ASGI HTTP request; messages sent by the app are collected"""
+
+    def __init__(self, app, path, method="GET", query=b"", headers=(), body=b""):
+        self.scope = {"type": "http", "method": method, "path": path, "query_string": query,
+                      "headers": [(k.encode(), v.encode()) for k, v in headers]}
+        self.app = app
+        self.sent = []
+        self.body = body
+        self.disconnect = asyncio.Event()
+
+    async def receive(self):
+        if self.body is not None:
+            body, self.body = self.body, None
+            return {"type": "http.request", "body": body}
+        await self.disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def run(self):
+        await self.app(self.scope, self.receive, self.send)
+        return self
+
+    @property
+    def status(self):
+        return self.sent[0]["status"]
+
+    @property
+    def text(self):
+        return b"".join(m.get("body", b"") for m in self.sent[1:]).decode()
+
+
+def test_routes_other_than_the_stream_run_the_wsgi_app():
+    app = make_asgi_app(wsgi_echo, EventBroker(), lambda: HELLO, threads=2)
+    client = asyncio.run(Client(app, "/api/refresh", method="POST", query=b"a=1",
+                                headers=[("Accept", "application/json")], body=b"{}").run())
+    assert client.status == 201 and (b"x-worker", b"wsgi") in client.sent[0]["headers"]
+    assert json.loads(client.text) == {"method": "POST", "path": "/api/refresh", "query": "a=1",
+                                       "accept": "application/json", "body": "{}"}
+
+
+def test_stream_on_the_event_loop_until_the_client_leaves():
+    broker = EventBroker(heartbeat=0.01, max_stream_seconds=5, max_subscribers=1)
+    app = make_asgi_app(wsgi_echo, broker, lambda: HELLO)
+
+    async def main():
+        subscriber = Client(app, "/api/stream")
+        task = asyncio.ensure_future(subscriber.run())
+        while broker.subscriber_count < 1:
+            await asyncio.sleep(0.01)
+        broker.publish("snapshot", {"version": 3}, version=3)
+
+        # Over the cap: a 200 telling EventSource when to reconnect, not a 503
+        busy = await Client(app, "/api/stream").run()
+        assert busy.status == 200 and busy.text == "retry: 10000\n\n"
+
+        while "id: 3-0" not in subscriber.text:
+            await asyncio.sleep(0.01)
+        subscriber.disconnect.set()
+        await asyncio.wait_for(task, 5)
+        return subscriber
+
+    subscriber = asyncio.run(main())
+    assert subscriber.status == 200
+    assert (b"content-type", b"text/event-stream; charset=utf-8") in subscriber.sent[0]["headers"]
+    assert subscriber.text.startswith("retry: 3000\n\nevent: hello\n")
+    assert broker.subscriber_count == 0
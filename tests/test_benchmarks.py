@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Performance regression check (opt-in: RUN_BENCHMARKS=1, timings are machine-dependent)
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.skipif(os.environ.get("RUN_BENCHMARKS") != "1", reason="set RUN_BENCHMARKS=1 to run benchmarks")
+def test_no_performance_regressions():
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "benchmarks", "run_benchmarks.py"), "--quick"],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for freshness-based cache lifetimes and conditional requests
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cache_policy import (
+    BROWSER_MAX_AGE, DATA_UPDATE_INTERVAL, LIVE_TTL, MAX_STALE_WHILE_REVALIDATE, MIN_TTL, cache_control,
+    freshness_lifetime, http_date, is_not_modified, requested_version,
+)
+
+
+def event_at(ts, sport="NBA"):
+    return {"datetime": datetime.fromtimestamp(ts).isoformat(), "sport": sport}
+
+
+def test_lifetime_follows_next_fetch_and_game_end():
+    now = 1_800_000_000.0
+    # Only the fetch schedule: fresh until the next scheduled update
+    assert freshness_lifetime(now - 3600, [], now=now) == DATA_UPDATE_INTERVAL - 3600
+    # A game starting in an hour ends (NBA ~2.5h) before the next fetch
+    assert freshness_lifetime(now, [event_at(now + 3600)], now=now) == int(3600 + 2.5 * 3600)
+    # Game in progress: cache briefly
+    assert freshness_lifetime(now, [event_at(now - 600)], now=now) == LIVE_TTL
+    # Overdue update never drops below the floor
+    assert freshness_lifetime(now - 2 * DATA_UPDATE_INTERVAL, None, now=now) == MIN_TTL
+
+
+def test_mutable_responses_are_only_briefly_shared():
+    # The CDN keeps responses as long as the data stays fresh, browsers for less
+    assert cache_control(DATA_UPDATE_INTERVAL) == (
+        f"public, max-age={BROWSER_MAX_AGE}, s-maxage={DATA_UPDATE_INTERVAL}, "
+        f"stale-while-revalidate={MAX_STALE_WHILE_REVALIDATE}"
+    )
+    assert cache_control(MIN_TTL) == f"public, max-age={MIN_TTL}, s-maxage={MIN_TTL}, stale-while-revalidate={MIN_TTL}"
+    # A new snapshot is fetched under a new cache key instead of purging the old one
+    assert requested_version({"v": "42"}) == 42
+    assert requested_version({}) is None and requested_version({"v": "latest"}) is None
+
+
+def test_conditional_requests():
+    modified = 1_800_000_000.5
+    assert is_not_modified({"If-None-Match": 'W/"abc", "def"'}, '"abc"', modified)
+    # If-None-Match takes precedence over If-Modified-Since
+    assert not is_not_modified({"If-None-Match": '"old"', "If-Modified-Since": http_date(modified)}, '"abc"', modified)
+    assert is_not_modified({"If-Modified-Since": http_date(modified)}, '"abc"', modified)
+    assert not is_not_modified({"If-Modified-Since": http_date(modified - 60)}, '"abc"', modified)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the upstream circuit breaker and negative cache
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.circuit_breaker import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, NegativeCache,
+                                 UpstreamGuard, UpstreamUnavailable)
+from src.fake_upstream import FakeUpstreamServer
+from src.retry import NO_RETRY
+from src.upstream import PayloadArchive, UpstreamSession
+from tests.test_upstream import NFL_TEAM_URL, nfl_team_payload
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_and_probes_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+    breaker.failure("site.api.espn.com")
+    breaker.before("site.api.espn.com")
+    breaker.failure("site.api.espn.com")
+    assert breaker.state("site.api.espn.com") == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before("site.api.espn.com")
+    # Other hosts are unaffected
+    breaker.before("api.openf1.org")
+
+    clock.now = 31
+    assert breaker.state("site.api.espn.com") == HALF_OPEN
+    breaker.before("site.api.espn.com")
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before("site.api.espn.com")
+    breaker.failure("site.api.espn.com")
+    assert breaker.state("site.api.espn.com") == OPEN
+
+    clock.now = 62
+    breaker.before("site.api.espn.com")
+    breaker.success("site.api.espn.com")
+    assert breaker.state("site.api.espn.com") == CLOSED
+
+
+def test_negative_cache_expires():
+    clock = FakeClock()
+    cache = NegativeCache(ttl=60, clock=clock)
+    cache.add("https://example.com/a")
+    with pytest.raises(UpstreamUnavailable):
+        cache.check("https://example.com/a")
+    cache.check("https://example.com/b")
+    clock.now = 61
+    cache.check("https://example.com/a")
+
+
+def test_session_fails_fast_once_the_host_circuit_opens():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        archive.start_run("run-a", 1)
+        archive.record("run-a", NFL_TEAM_URL, 200, "application/json", nfl_team_payload(7, 2))
+        with FakeUpstreamServer(archive, error_rate=1.0) as server:
+            guard = UpstreamGuard(breaker=CircuitBreaker(failure_threshold=2), negative=NegativeCache(ttl=0))
+            session = UpstreamSession(base_url=server.url, guard=guard, retry=NO_RETRY)
+            assert session.get(NFL_TEAM_URL).status_code == 503
+            assert session.get(NFL_TEAM_URL).status_code == 503
+            with pytest.raises(UpstreamUnavailable):
+                session.get(NFL_TEAM_URL + "/schedule")
+            assert server.stats["requests"] == 2
+        archive.close()
+
+
+def test_probe_cut_off_by_deadline_is_released():
+    from src import deadline as deadlines
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        archive.start_run("run-a", 1)
+        archive.record("run-a", NFL_TEAM_URL, 200, "application/json", nfl_team_payload(7, 2))
+        with FakeUpstreamServer(archive) as server:
+            clock = FakeClock()
+            guard = UpstreamGuard(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock),
+                                  negative=NegativeCache(ttl=0))
+            session = UpstreamSession(base_url=server.url, guard=guard, retry=NO_RETRY)
+            guard.breaker.failure("site.api.espn.com")
+            clock.now = 31
+
+            # The half-open probe runs out of time before it is sent
+            with deadlines.scope(deadlines.Deadline(0)):
+                with pytest.raises(deadlines.DeadlineExceeded):
+                    session.get(NFL_TEAM_URL)
+            assert guard.breaker.state("site.api.espn.com") == HALF_OPEN
+
+            # The next call is the probe, and its success closes the circuit
+            assert session.get(NFL_TEAM_URL).status_code == 200
+            assert guard.breaker.state("site.api.espn.com") == CLOSED
+        archive.close()
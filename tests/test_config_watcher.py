@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for config hot reload: the file watcher shared by the backend and the Vercel handlers
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config_watcher import watch_config, watched_paths
+from src.event_log import EventLog, source_event
+from src.snapshot import SnapshotStore
+from tests.test_refresh_jobs import wait_for
+from tests.test_snapshot import make_config, write_config
+
+
+def test_check_reports_config_and_event_log_changes(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "teams_config.json")
+        extra = os.path.join(tmp, "extra.json")
+        monkeypatch.setenv("WATCH_EXTRA_PATHS", extra)
+        write_config(path, make_config([("Dallas Cowboys", "NFL", 1, 0)]))
+        log = EventLog(path)
+        assert watched_paths(path) == [path, log.path, extra]
+
+        changes = []
+        watcher = watch_config(path, changes.append)
+        # The first check only records where the files are
+        assert watcher.check() == []
+
+        write_config(path, make_config([("Dallas Cowboys", "NFL", 2, 0)]))
+        assert watcher.check() == [path]
+        log.append(source_event("cowboys", {"wins": 3, "losses": 0}))
+        with open(extra, "w") as f:
+            f.write("{}")
+        assert watcher.check() == [log.path, extra]
+        assert watcher.check() == []
+        assert changes == [[path], sorted([log.path, extra])]
+        log.close()
+
+
+def test_watcher_hot_reloads_the_snapshot():
+    for use_inotify in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "teams_config.json")
+            write_config(path, make_config([("Dallas Cowboys", "NFL", 1, 0)]))
+            store = SnapshotStore(path, use_espn_api=False)
+            first = store.get()
+            watcher = watch_config(path, lambda paths: store.rebuild(), poll_interval=0.05,
+                                   debounce=0.05, use_inotify=use_inotify)
+            watcher.start()
+            try:
+                # Written in place, then replaced by rename (as json.dump and compaction do)
+                write_config(path, make_config([("Dallas Cowboys", "NFL", 2, 0)]))
+                wait_for(lambda: json.loads(store.current.teams_json)["teams"][0]["wins"] == 2)
+                write_config(path + ".tmp", make_config([("Dallas Cowboys", "NFL", 3, 0)]))
+                os.replace(path + ".tmp", path)
+                wait_for(lambda: json.loads(store.current.teams_json)["teams"][0]["wins"] == 3)
+                assert store.current.version > first.version
+            finally:
+                watcher.stop()
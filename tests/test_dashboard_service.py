@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the request-handling core shared by the Flask backend and the Vercel functions
+"""
+
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dashboard_service import DashboardService
+from src.snapshot import SECTIONS, SnapshotStore
+from src.static_artifacts import ArtifactReader, build_artifacts
+from tests.test_snapshot import make_config, write_config
+from tests.test_static_artifacts import offline
+from tests.test_vercel_handlers import warm_container
+
+
+def make_service(tmp):
+    path = os.path.join(tmp, "teams_config.json")
+    write_config(path, make_config([("Dallas Cowboys", "NFL", 1, 0), ("Team B", "NBA", 2, 2)]))
+    store = SnapshotStore(path, use_espn_api=False)
+    return DashboardService(store.get), store
+
+
+def test_dashboard_returns_every_section_from_one_snapshot(monkeypatch):
+    offline(monkeypatch)
+    with tempfile.TemporaryDirectory() as tmp:
+        service, store = make_service(tmp)
+        snapshot = store.get()
+
+        response = service.handle("dashboard", {}, {})
+        assert response.status == 200
+        body = json.loads(response.body)
+        assert body["success"] and body["version"] == snapshot.version
+        assert [name for name in body if name in SECTIONS] == list(SECTIONS)
+        # Same bytes as the standalone routes, from the same snapshot
+        assert body["depression"] == json.loads(service.handle("depression", {}, {}).body)
+        assert body["teams"]["version"] == snapshot.version
+
+        subset = json.loads(service.handle("dashboard", {"sections": "teams, depression"}, {}).body)
+        assert [name for name in subset if name in SECTIONS] == ["teams", "depression"]
+
+        unknown = service.handle("dashboard", {"sections": "teams,scores"}, {})
+        assert unknown.status == 400
+        assert json.loads(unknown.body)["available_sections"] == list(SECTIONS)
+
+
+def test_version_keyed_requests_are_cached_only_once_built(monkeypatch):
+    offline(monkeypatch)
+    with tempfile.TemporaryDirectory() as tmp:
+        service, store = make_service(tmp)
+        version = store.get().version
+
+        cached = service.handle("dashboard", {"v": str(version)}, {})
+        assert "s-maxage=" in cached.headers["Cache-Control"]
+        # Another worker announced a newer snapshot than this one has built
+        ahead = service.handle("dashboard", {"v": str(version + 1)}, {})
+        assert ahead.status == 200 and ahead.headers["Cache-Control"] == "no-store"
+
+
+def test_encoding_fields_and_conditional_requests():
+    with tempfile.TemporaryDirectory() as tmp:
+        service, store = make_service(tmp)
+
+        compressed = service.handle("teams", {}, {"Accept-Encoding": "gzip"})
+        assert compressed.headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(compressed.body)) == store.get().teams
+
+        # Sparse fieldsets always keep the entity key (name, sport); small bodies aren't compressed
+        response = service.handle("teams", {"fields": "name,wins"}, {"Accept-Encoding": "gzip"})
+        assert response.status == 200 and "Content-Encoding" not in response.headers
+        assert json.loads(response.body)["teams"][0] == {"name": "Dallas Cowboys", "sport": "NFL", "wins": 1}
+        assert "max-age" in response.headers["Cache-Control"] and response.headers["Last-Modified"]
+
+        # Revalidation with the ETag (weak form from a proxy included) is a bodyless 304
+        etag = response.headers["ETag"]
+        again = service.handle("teams", {"fields": "wins,name"}, {"Accept-Encoding": "gzip",
+                                                                  "If-None-Match": "W/" + etag})
+        assert (again.status, again.body, again.headers["ETag"]) == (304, b"", etag)
+
+        delta = json.loads(service.handle("teams", {"since": str(store.get().version)}, {}).body)
+        assert delta["teams"] == [] and not delta["full"]
+
+        assert service.handle("teams", {"since": "yesterday"}, {}).status == 400
+        assert service.handle("teams", {"precision": "-1"}, {}).status == 400
+        assert service.handle("scores", {}, {}).status == 404
+
+
+def test_fresh_artifacts_are_served_without_scoring(monkeypatch):
+    offline(monkeypatch)
+    with tempfile.TemporaryDirectory() as tmp:
+        service, store = make_service(tmp)
+        out_dir = os.path.join(tmp, "static_api")
+        manifest = build_artifacts(store.config_path, out_dir, use_espn_api=False)
+
+        def no_snapshot():
+            raise AssertionError("scored instead of serving the artifact")
+        with_artifacts = DashboardService(no_snapshot, ArtifactReader(out_dir, store.config_path))
+        response = with_artifacts.handle("depression", {}, {})
+        assert response.status == 200 and response.headers["ETag"] == manifest["files"]["depression"]["etag"]
+        assert json.loads(response.body)["score"] == store.get().depression["score"]
+
+
+class FakeSocket:
+    """Just enough of a socket for BaseHTTPRequestHandler"""
+
+    def __init__(self, request: bytes):
+        self.request = request
+        self.sent = b""
+
+    def makefile(self, mode, *args, **kwargs):
+        return io.BytesIO(self.request)
+
+    def sendall(self, data):
+        self.sent += data
+
+
+def test_vercel_handler_answers_like_the_service(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        service, store = make_service(tmp)
+        warm_container(monkeypatch, store.config_path)
+        import _utils
+
+        sock = FakeSocket(b"GET /api/teams?fields=name HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        _utils.make_handler("teams")(sock, ("127.0.0.1", 0), None)
+        head, body = sock.sent.split(b"\r\n\r\n", 1)
+        assert head.startswith(b"HTTP/1.0 200") and b"Access-Control-Allow-Origin: *" in head
+        assert json.loads(body)["teams"] == json.loads(service.handle("teams", {"fields": "name"}, {}).body)["teams"]
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for fetch-run deadlines
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import deadline as deadlines
+from src.fake_upstream import FakeUpstreamServer
+from src.retry import RetryPolicy
+from src.sports_api import SportsDataFetcher
+from src.upstream import PayloadArchive, UpstreamSession
+from tests.test_incremental_fetch import FakeClock
+from tests.test_upstream import NFL_TEAM_URL, nfl_team_payload
+
+
+class SlowFetcher(SportsDataFetcher):
+    """Every source takes 2 (fake) seconds, whatever its deadline"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    def fetch_source(self, key):
+        self.calls.append((key, round(deadlines.current().remaining(), 3)))
+        self.clock.now += 2.0
+        return {"wins": 3, "losses": 1}
+
+
+def test_deadline_shares_scopes_and_clamps():
+    clock = FakeClock()
+    overall = deadlines.Deadline(10, clock)
+    assert overall.share(4).remaining() == 2.5
+    # A short deadline still gives the next part its minimum
+    clock.now = 9.5
+    assert overall.share(4, minimum=1.0).remaining() == 0.5
+
+    clock.now = 0.0
+    with deadlines.scope(overall):
+        assert deadlines.clamp_timeout(30) == 10
+        assert deadlines.clamp_timeout((3, 30)) == (3, 10)
+        # Nesting can only tighten the limit
+        with deadlines.scope(deadlines.Deadline(60, clock)) as inner:
+            assert inner is overall
+        clock.now = 10.0
+        try:
+            deadlines.clamp_timeout(5)
+            assert False, "expected DeadlineExceeded"
+        except deadlines.DeadlineExceeded:
+            pass
+    assert deadlines.current() is None
+    assert deadlines.clamp_timeout(5) == 5
+
+
+def test_fetch_all_data_splits_time_and_skips_lowest_priority():
+    clock = FakeClock()
+    fetcher = SlowFetcher(clock)
+    statuses = []
+    data = fetcher.fetch_all_data(progress=lambda key, status: statuses.append((key, status)),
+                                  deadline=deadlines.Deadline(7, clock))
+
+    # 7s over 7 sources: 1s each; every source overruns its share, so the last three find under 1s left
+    assert fetcher.calls == [("cowboys", 1.0), ("mavericks", 1.0), ("warriors", 1.0), ("rangers", 1.0)]
+    assert fetcher.last_fetch["timed_out"] == ["cowboys", "mavericks", "warriors", "rangers"]
+    assert fetcher.last_fetch["skipped"] == ["verstappen", "unc_basketball", "unc_football"]
+    assert data["cowboys"] and data["verstappen"] is None
+    assert ("verstappen", "skipped") in statuses and ("verstappen", "running") not in statuses
+
+
+class GreedyFetcher(SlowFetcher):
+    """Every source (and the fantasy team) uses all of its share of the deadline"""
+
+    def __init__(self, clock):
+        super().__init__(clock)
+        self.event_log = None
+
+    def fetch_source(self, key):
+        remaining = deadlines.current().remaining()
+        self.calls.append((key, round(remaining, 3)))
+        self.clock.now += remaining
+        return None
+
+    def fetch_fantasy_data(self, espn_config):
+        self.calls.append(("fantasy", round(deadlines.current().remaining(), 3)))
+        return None
+
+
+def test_fantasy_gets_a_share_of_the_deadline():
+    clock = FakeClock()
+    fetcher = GreedyFetcher(clock)
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "teams_config.json")
+        with open(config_path, "w") as f:
+            json.dump({"teams": [], "fantasy_team": {"espn": {"league_id": 1, "year": 2026}}}, f)
+        report = fetcher.update_config_file(config_path, deadline=deadlines.Deadline(8, clock))
+
+    # 8s over 7 sources plus the fantasy team: the last team source doesn't take it all
+    assert fetcher.calls[-2:] == [("unc_football", 1.0), ("fantasy", 1.0)]
+    assert report["skipped"] == []
+
+
+def test_session_stops_at_deadline_without_tripping_the_breaker():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        archive.start_run("run-a", 1)
+        archive.record("run-a", NFL_TEAM_URL, 200, "application/json", nfl_team_payload(7, 2))
+        with FakeUpstreamServer(archive, requests_per_second=1) as server:
+            session = UpstreamSession(base_url=server.url, retry=RetryPolicy(base_delay=0.01))
+            assert session.get(NFL_TEAM_URL, timeout=10).status_code == 200
+
+            # 429 with Retry-After: 1 doesn't fit in 0.5s, so it's returned instead of waited out
+            started = time.monotonic()
+            with deadlines.scope(deadlines.Deadline(0.5)):
+                assert session.get(NFL_TEAM_URL, timeout=10).status_code == 429
+            assert time.monotonic() - started < 0.5
+
+            # Out of time: no request is made, the last good response is served
+            requests_before = server.stats["requests"]
+            with deadlines.scope(deadlines.Deadline(0)):
+                response = session.get(NFL_TEAM_URL, timeout=10)
+            assert response.headers.get("X-Upstream-Stale") == "1"
+            assert server.stats["requests"] == requests_before
+            assert session.guard.breaker.state("site.api.espn.com") == "closed"
+        archive.close()
+
+
+def test_rate_limit_pause_longer_than_the_deadline_is_not_waited_out():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        archive.start_run("run-a", 1)
+        archive.record("run-a", NFL_TEAM_URL, 200, "application/json", nfl_team_payload(7, 2))
+        with FakeUpstreamServer(archive) as server:
+            session = UpstreamSession(base_url=server.url, retry=RetryPolicy(base_delay=0.01))
+            assert session.get(NFL_TEAM_URL, timeout=10).status_code == 200
+
+            # Another caller got a 429 with Retry-After: 20; this one only has 2 seconds
+            session.limiter.pause("site.api.espn.com", 20)
+            requests_before = server.stats["requests"]
+            started = time.monotonic()
+            with deadlines.scope(deadlines.Deadline(2)):
+                response = session.get(NFL_TEAM_URL, timeout=10)
+            assert time.monotonic() - started < 1
+            assert response.headers.get("X-Upstream-Stale") == "1"
+            assert server.stats["requests"] == requests_before
+            assert session.guard.breaker.state("site.api.espn.com") == "closed"
+        archive.close()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the ingest event log: append, tail replay and compaction
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import event_log as event_logs
+from src.event_log import APPLIED_SEQ_KEY, EventLog, last_event_seq, read_events, replay_tail, source_event
+from src.depression_calculator import DepressionCalculator
+
+
+def test_replay_then_compact():
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "teams_config.json")
+        with open(config_path, "w") as f:
+            json.dump({"teams": [{"name": "Dallas Cowboys", "sport": "NFL", "record": {"wins": 1, "losses": 1}}],
+                       "f1_driver": {"name": "Max Verstappen", "championship_position": 1}}, f)
+        log = EventLog(config_path, fsync_every=2)
+        log.append_many([
+            source_event("cowboys", {"wins": 2, "losses": 5, "recent_games": ["L", "L"]}),
+            source_event("verstappen", {"position": 3, "recent_races": ["DNF", "2"]}),
+        ])
+        assert log.append(source_event("cowboys", {"wins": 2, "losses": 6})) == 3
+
+        # Readers see uncompacted events on top of the config
+        calc = DepressionCalculator(config_path, use_espn_api=False)
+        assert (calc.teams[0].wins, calc.teams[0].losses) == (2, 6)
+        assert calc.f1_driver.championship_position == 3 and calc.f1_driver.recent_dnfs == 1
+        assert log.pending() == 3
+
+        assert log.compact() == 3
+        with open(config_path) as f:
+            config = json.load(f)
+        assert config[APPLIED_SEQ_KEY] == 3 and config["teams"][0]["record"]["losses"] == 6
+        assert [e["type"] for e in read_events(log.path)] == ["checkpoint"]
+        assert log.pending() == 0
+
+        # A config read before the compaction is stale; the reader is told to re-read it
+        assert replay_tail({"teams": []}, log.path) is None
+
+        # Sequence numbers keep increasing across compactions, and a torn write is ignored
+        assert log.append(source_event("cowboys", {"wins": 3, "losses": 6})) == 4
+        log.close()
+        with open(log.path, "ab") as f:
+            f.write(b'{"seq":5,"type":"team"')
+        assert DepressionCalculator(config_path, use_espn_api=False).teams[0].wins == 3
+        assert log.append(source_event("cowboys", {"wins": 4, "losses": 6})) == 5
+        assert [e["seq"] for e in read_events(log.path)] == [3, 4, 5]
+        log.close()
+
+
+def test_appends_only_read_the_tail(monkeypatch):
+    monkeypatch.setattr(event_logs, "TAIL_CHUNK", 16)
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "teams_config.json")
+        with open(config_path, "w") as f:
+            json.dump({"teams": [], APPLIED_SEQ_KEY: 7}, f)
+        # Two writers (e.g. the backend and the fetch script) on the same log
+        writer_a, writer_b = EventLog(config_path), EventLog(config_path)
+        assert last_event_seq(writer_a.path) is None
+
+        def whole_log_read(path):
+            raise AssertionError("appends must not read the whole log")
+        monkeypatch.setattr(event_logs, "read_events", whole_log_read)
+
+        assert writer_a.append(source_event("cowboys", {"wins": 1, "losses": 0})) == 8
+        assert writer_a.append(source_event("cowboys", {"wins": 2, "losses": 0})) == 9
+        # B has never seen the log; A notices B's append
+        assert writer_b.append(source_event("mavericks", {"wins": 1, "losses": 0})) == 10
+        assert writer_a.append(source_event("cowboys", {"wins": 3, "losses": 0})) == 11
+
+        # Lines longer than a read step, and a torn last line, are handled
+        writer_a.close()
+        with open(writer_a.path, "ab") as f:
+            f.write(b'{"seq":12,"type":"te')
+        assert last_event_seq(writer_a.path) == 11
+        monkeypatch.setattr(event_logs, "read_events", read_events)
+        assert [e["seq"] for e in read_events(writer_a.path)] == [8, 9, 10, 11]
+        writer_b.close()
+
+
+def test_calculator_saves_never_race_the_log():
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "teams_config.json")
+        with open(config_path, "w") as f:
+            json.dump({"teams": [{"name": "Dallas Cowboys", "sport": "NFL", "record": {"wins": 1, "losses": 1}},
+                                 {"name": "Dallas Mavericks", "sport": "NBA", "record": {"wins": 1, "losses": 1}}]}, f)
+        calc = DepressionCalculator(config_path, use_espn_api=False)
+        log = EventLog(config_path)
+        log.append(source_event("cowboys", {"wins": 5, "losses": 1}))
+
+        # A manual edit keeps the data fetched since the calculator was loaded
+        calc.teams[1].wins = 10
+        assert calc.save_config()
+        with open(config_path) as f:
+            config = json.load(f)
+        assert [t["record"]["wins"] for t in config["teams"]] == [5, 10] and config[APPLIED_SEQ_KEY] == 1
+
+        # Compacted past this calculator's state: refuse rather than drop those events
+        stale = DepressionCalculator(config_path, use_espn_api=False)
+        log.append(source_event("cowboys", {"wins": 6, "losses": 1}))
+        assert log.compact() == 1
+        stale.teams[1].wins = 11
+        assert not stale.save_config()
+        assert DepressionCalculator(config_path, use_espn_api=False).teams[0].wins == 6
+        log.close()
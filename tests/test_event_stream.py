@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the Server-Sent Events broker
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.event_stream import EventBroker, parse_event_id
+
+HELLO = {"version": 0, "score": 1.0}
+
+
+def read_events(stream, count):
+    """The next count (event, id, data) messages from a stream, skipping keep-alives"""
+    messages = []
+    while len(messages) < count:
+        text = next(stream)
+        if not text.startswith(("event:", "id:")):
+            continue
+        fields = dict(line.split(": ", 1) for line in text.strip().split("\n"))
+        messages.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return messages
+
+
+def worker(history=256):
+    return EventBroker(history=history, heartbeat=0.01, max_stream_seconds=5)
+
+
+def test_ids_follow_snapshot_versions_across_workers():
+    # Two workers see the same snapshot versions, but publish different refresh progress
+    worker_a, worker_b = worker(), worker()
+    worker_a.publish("snapshot", {"version": 100}, version=100)
+    worker_a.publish("refresh", {"source": "cowboys"})
+    assert worker_a.publish("refresh", {"source": "mavericks"}) == (100, 2)
+    worker_b.publish("snapshot", {"version": 100}, version=100)
+    assert parse_event_id("100-2") == (100, 2) and parse_event_id("7") is None
+
+    # The client saw A's events up to 100-2, then reconnects to B
+    stream = worker_b.stream(parse_event_id("100-2"), hello=HELLO)
+    assert next(stream) == "retry: 3000\n\n"
+    worker_b.publish("snapshot", {"version": 105}, version=105)
+    assert read_events(stream, 1) == [("snapshot", "105-0", {"version": 105})]
+    stream.close()
+
+
+def test_resume_replays_the_buffer_or_resyncs():
+    broker = worker(history=2)
+    for version in (100, 101, 102):
+        broker.publish("snapshot", {"version": version}, version=version)
+
+    # Still buffered: replayed as they were
+    stream = broker.stream(parse_event_id("101-0"), hello=HELLO)
+    assert read_events(stream, 1) == [("snapshot", "102-0", {"version": 102})]
+    stream.close()
+
+    # 100-0 fell out of the buffer (or the client came from a restarted worker):
+    # it gets the current state instead of a silent gap
+    stream = broker.stream(parse_event_id("99-3"), hello=HELLO)
+    assert read_events(stream, 1) == [("snapshot", "102-0", dict(HELLO, resync=True))]
+    stream.close()
+
+    # New subscribers get hello
+    stream = broker.stream(None, hello=HELLO)
+    assert read_events(stream, 1) == [("hello", None, dict(HELLO, last_event_id="102-0"))]
+    stream.close()
+
+
+def test_subscriber_cap():
+    broker = EventBroker(heartbeat=0.01, max_stream_seconds=5, max_subscribers=2)
+    streams = [broker.stream(), broker.stream()]
+    assert not broker.full
+    for stream in streams:
+        next(stream)
+    assert broker.full and broker.subscriber_count == 2
+
+    streams[0].close()
+    assert not broker.full and broker.subscriber_count == 1
+    streams[1].close()
+    assert broker.subscriber_count == 0
+
+
+def test_async_subscribers_hold_no_threads():
+    broker = worker()
+
+    async def subscribe():
+        stream = broker.astream(hello=HELLO)
+        try:
+            async for text in stream:
+                if text.startswith("id:"):
+                    return text
+        finally:
+            await stream.aclose()
+
+    async def main():
+        threads = threading.active_count()
+        subscribers = [asyncio.ensure_future(subscribe()) for _ in range(200)]
+        while broker.subscriber_count < 200:
+            await asyncio.sleep(0.01)
+        assert threading.active_count() == threads
+        # Published from a refresh or watcher thread
+        threading.Thread(target=broker.publish, args=("snapshot", {"version": 7}), kwargs={"version": 7}).start()
+        return await asyncio.gather(*subscribers)
+
+    assert set(asyncio.run(main())) == {'id: 7-0\nevent: snapshot\ndata: {"version":7}\n\n'}
+    assert broker.subscriber_count == 0
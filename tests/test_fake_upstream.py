@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for fetching through the local fake upstream server
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fake_upstream import FakeUpstreamServer
+from src.sports_api import FANTASY_ARCHIVE_URL, SportsDataFetcher
+from src.retry import NO_RETRY
+from src.upstream import PayloadArchive, UpstreamSession
+from tests.test_upstream import NFL_TEAM_URL, nfl_team_payload
+
+
+def test_fetcher_uses_fake_server_with_error_injection():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        archive.start_run("run-a", 1)
+        archive.record("run-a", NFL_TEAM_URL, 200, "application/json", nfl_team_payload(7, 2))
+        espn = {"league_id": 1, "year": 2025, "team_name": "Squad"}
+        recorder = UpstreamSession(archive=archive)
+        recorder.run_id = "run-a"
+        recorder.archive_json(FANTASY_ARCHIVE_URL, espn, {"name": "Squad", "wins": 4, "losses": 1})
+
+        with FakeUpstreamServer(archive) as server:
+            fetcher = SportsDataFetcher(session=UpstreamSession(base_url=server.url, retry=NO_RETRY))
+            assert fetcher.nfl.get_team_record("Dallas Cowboys")["wins"] == 7
+            assert fetcher.fetch_fantasy_data(espn)["wins"] == 4
+            assert fetcher.nba.get_team_record("Dallas Mavericks") is None
+            assert server.stats["served"] == 2 and server.stats["missing"] >= 1
+
+            # While the upstream errors, the last good response is served instead
+            server.error_rate = 1.0
+            assert fetcher.nfl.get_team_record("Dallas Cowboys")["wins"] == 7
+            assert server.stats["errors"] == 1
+            # ...and without one, the failure surfaces as "no data"
+            fresh = SportsDataFetcher(session=UpstreamSession(base_url=server.url, retry=NO_RETRY))
+            assert fresh.nfl.get_team_record("Dallas Cowboys") is None
+            assert server.stats["errors"] == 2
+        archive.close()
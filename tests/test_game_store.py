@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite game store and the calculator reading from it
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.game_store import GameStore
+from src.depression_calculator import DepressionCalculator
+
+
+def game(event_id, days_ago, result, opponent, margin, is_home=True):
+    return {
+        "event_id": event_id,
+        "date": (datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%dT%H:%MZ"),
+        "result": result,
+        "opponent": opponent,
+        "team_score": 20,
+        "opponent_score": 20 + (margin if result == "L" else -margin),
+        "score_margin": margin,
+        "is_home": is_home,
+        "is_overtime": False,
+    }
+
+
+def test_upserts_by_event_and_feeds_calculator():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = GameStore(os.path.join(tmp, "games.sqlite3"))
+        games = [game(str(i), i * 7, "L" if i % 2 else "W", "Philadelphia Eagles" if i == 1 else f"Team {i}", 3)
+                 for i in range(8)]
+        assert store.upsert_games("Dallas Cowboys", "NFL", games) == 8
+        # Re-fetching the same events updates rows instead of duplicating them
+        games[0] = dict(games[0], result="L", score_margin=24)
+        store.upsert_games("Dallas Cowboys", "NFL", games[:2])
+        assert store.count() == 8
+
+        recent = store.recent_games("Dallas Cowboys", "NFL", limit=5)
+        assert [g["event_id"] for g in recent] == ["0", "1", "2", "3", "4"]
+        assert [g["opponent"] for g in store.rivalry_losses("Dallas Cowboys", "NFL", ["philadelphia eagles"])] == \
+            ["Philadelphia Eagles"]
+
+        config_path = os.path.join(tmp, "teams_config.json")
+        with open(config_path, "w") as f:
+            json.dump({"teams": [{
+                "name": "Dallas Cowboys", "sport": "NFL", "record": {"wins": 4, "losses": 4},
+                "rivals": ["Philadelphia Eagles"], "recent_streak": ["W"],
+            }]}, f)
+        calc = DepressionCalculator(config_path, use_espn_api=False, game_store=store)
+        team = calc.teams[0]
+        assert team.recent_streak == ["L", "L", "W", "L", "W"]
+        assert team.recent_score_margins[0] == -24 and team.recent_blowout_losses[0]
+        assert team.recent_rivalry_losses == ["Philadelphia Eagles"]
+        store.close()
+
+
+def test_store_history_without_rivalry_losses_clears_the_configs():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = GameStore(os.path.join(tmp, "games.sqlite3"))
+        store.upsert_games("Dallas Cowboys", "NFL", [game("1", 7, "W", "Philadelphia Eagles", 3),
+                                                     game("2", 14, "L", "Team 2", 3)])
+        config_path = os.path.join(tmp, "teams_config.json")
+        with open(config_path, "w") as f:
+            json.dump({"teams": [{
+                "name": "Dallas Cowboys", "sport": "NFL", "record": {"wins": 1, "losses": 1},
+                "rivals": ["Philadelphia Eagles"], "recent_rivalry_losses": ["Philadelphia Eagles"],
+            }]}, f)
+        calc = DepressionCalculator(config_path, use_espn_api=False, game_store=store)
+        team = calc.teams[0]
+        assert team.recent_streak == ["W", "L"]
+        assert team.recent_rivalry_losses == [] and team.recent_rivalry_loss_timestamps == []
+        store.close()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for the gunicorn worker settings
+"""
+
+import os
+import runpy
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+CONF_PATH = os.path.join(PROJECT_ROOT, "gunicorn.conf.py")
+SETTINGS = ("WEB_WORKER_CLASS", "WEB_CONCURRENCY", "WEB_THREADS", "WEB_TIMEOUT")
+
+
+def load_settings(monkeypatch, **env):
+    for name in SETTINGS:
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(CONF_PATH)
+
+
+def test_async_workers_by_default(monkeypatch):
+    # Streams wait on the event loop; other routes run on WEB_THREADS threads
+    settings = load_settings(monkeypatch)
+    assert settings["worker_class"] == "uvicorn_worker.UvicornWorker"
+    assert (settings["workers"], settings["threads"], settings["timeout"]) == (2, 8, 120)
+
+
+def test_environment_overrides(monkeypatch):
+    settings = load_settings(monkeypatch, WEB_WORKER_CLASS="sync", WEB_CONCURRENCY="4",
+                             WEB_THREADS="16", WEB_TIMEOUT="30")
+    assert settings["worker_class"] == "sync"
+    assert (settings["workers"], settings["threads"], settings["timeout"]) == (4, 16, 30)
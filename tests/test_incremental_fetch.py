@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the time-budgeted, resumable cron fetch
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sports_api import SportsDataFetcher
+from src.checkpoint_store import CheckpointStore
+from src.event_log import default_event_log_path, read_events
+from src.incremental_fetch import CURSOR_KEY, run_incremental_fetch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeFetcher(SportsDataFetcher):
+    """Every source takes 2 (fake) seconds and returns a 3-1 record"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    def fetch_source(self, key):
+        self.calls.append(key)
+        self.clock.now += 2.0
+        return {"wins": 3, "losses": 1}
+
+
+def test_budget_checkpoints_and_resumes():
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "teams_config.json")
+        with open(config_path, "w") as f:
+            json.dump({"teams": [{"name": "Dallas Cowboys", "sport": "NFL", "record": {"wins": 0, "losses": 0}}]}, f)
+        store = CheckpointStore(os.path.join(tmp, "checkpoints.sqlite3"))
+        clock = FakeClock()
+        fetcher = FakeFetcher(clock)
+
+        first = run_incremental_fetch(fetcher, config_path, store, budget_seconds=5, clock=clock)
+        assert first["fetched"] == ["cowboys", "mavericks"]
+        assert not first["finished"]
+        assert store.get(CURSOR_KEY)["pending"][0] == "warriors"
+
+        # Partial progress is already in the config (the Cowboys always get a full W-L-T record)
+        with open(config_path) as f:
+            assert json.load(f)["teams"][0]["record"] == {"wins": 3, "losses": 1, "ties": 0}
+        # ... written through the event log (under its lock) and compacted into the config
+        assert [e["type"] for e in read_events(default_event_log_path(config_path))] == ["checkpoint"]
+
+        # Later triggers resume the same run without refetching
+        while True:
+            summary = run_incremental_fetch(fetcher, config_path, store, budget_seconds=5, clock=clock)
+            assert summary["run_id"] == first["run_id"]
+            if summary["finished"]:
+                break
+        assert fetcher.calls == [key for key, _, _ in SportsDataFetcher.SOURCES]
+        assert store.get(CURSOR_KEY) is None
+
+        # The next run starts with the stalest sources
+        clock.now = 0.0
+        fetcher.calls = []
+        run_incremental_fetch(fetcher, config_path, store, budget_seconds=1, clock=clock)
+        assert fetcher.calls == ["cowboys"]
+        store.close()
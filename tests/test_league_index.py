@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for league-wide scoreboard and standings ingestion
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from src.checkpoint_store import CheckpointStore
+from src.fake_upstream import FakeUpstreamServer
+from src.league_index import LEAGUES, LIVE_TTL, LeagueIndex, scoreboard_url, standings_url
+from src.retry import NO_RETRY
+from src.sports_api import SportsDataFetcher
+from src.upstream import PayloadArchive, UpstreamSession
+from tests.test_refresh_jobs import wait_for
+
+COWBOYS = {"id": "6", "displayName": "Dallas Cowboys", "shortDisplayName": "Cowboys", "abbreviation": "DAL"}
+EAGLES = {"id": "21", "displayName": "Philadelphia Eagles", "shortDisplayName": "Eagles", "abbreviation": "PHI"}
+
+
+def standings_payload():
+    def entry(team, wins, losses):
+        stats = [{"name": "wins", "value": wins}, {"name": "losses", "value": losses}, {"name": "ties", "value": 0}]
+        return {"team": team, "stats": stats}
+    # Conferences nest their entries one level down
+    return {"children": [{"name": "NFC", "standings": {"entries": [entry(COWBOYS, 4, 2), entry(EAGLES, 5, 1)]}}]}
+
+
+def utc(hour, minute=0):
+    return datetime(2026, 10, 19, hour, minute, tzinfo=timezone.utc).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def scoreboard_payload():
+    def event(event_id, day, home, away, home_score, away_score, completed=True):
+        status = {"type": {"name": "STATUS_FINAL" if completed else "STATUS_SCHEDULED", "completed": completed,
+                           "state": "post" if completed else "pre"}}
+        competitors = [
+            {"homeAway": "home", "team": home, "score": str(home_score), "winner": completed and home_score > away_score},
+            {"homeAway": "away", "team": away, "score": str(away_score), "winner": completed and away_score > home_score},
+        ]
+        return {"id": event_id, "date": f"2026-10-{day:02d}T17:00Z",
+                "competitions": [{"status": status, "competitors": competitors}]}
+    return {"events": [
+        event("1", 5, COWBOYS, EAGLES, 20, 27),
+        event("2", 12, EAGLES, COWBOYS, 10, 31),
+        event("3", 19, COWBOYS, EAGLES, 7, 0, completed=False),
+    ]}
+
+
+def record_league(archive, today):
+    archive.start_run("run-a", 1)
+    start = today - timedelta(days=LEAGUES["nfl"]["days"])
+    archive.record("run-a", standings_url("nfl"), 200, "application/json", json.dumps(standings_payload()).encode())
+    archive.record("run-a", scoreboard_url("nfl", start, today), 200, "application/json",
+                   json.dumps(scoreboard_payload()).encode())
+
+
+def test_index_builds_every_teams_record_and_games():
+    today = date(2026, 10, 19)
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        record_league(archive, today)
+        with FakeUpstreamServer(archive) as server:
+            index = LeagueIndex(UpstreamSession(base_url=server.url, retry=NO_RETRY), today=lambda: today,
+                                clock=FakeClock(utc(12)))
+            assert index.ingest("nfl")
+            assert index.ingest("nfl")
+            assert server.stats["requests"] == 2
+
+            assert index.team_record("nfl", "Dallas Cowboys") == {"wins": 4, "losses": 2, "ties": 0,
+                                                                  "win_percentage": 4 / 6}
+            assert index.team_record("nfl", "eagles")["wins"] == 5
+            games = index.recent_games("nfl", "Cowboys")
+            # Newest first; the game still to be played isn't indexed
+            assert [(g["event_id"], g["result"], g["is_home"]) for g in games] == [("2", "W", False), ("1", "L", True)]
+            assert games[0]["opponent"] == "Philadelphia Eagles" and games[0]["score_margin"] == 21
+            assert index.team_record("nfl", "Dallas Mavericks") is None
+        archive.close()
+
+
+def test_index_is_shared_until_the_scoreboard_can_change():
+    today = date(2026, 10, 19)
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        record_league(archive, today)
+        store = CheckpointStore(os.path.join(tmp, "checkpoints.sqlite3"))
+        clock = FakeClock(utc(12))
+        with FakeUpstreamServer(archive) as server:
+            def new_run():
+                session = UpstreamSession(base_url=server.url, retry=NO_RETRY)
+                return LeagueIndex(session, store, today=lambda: today, clock=clock)
+
+            assert new_run().ingest("nfl")
+            # A later run (or another process) reuses it until the next kickoff at 17:00
+            clock.now = utc(16, 59)
+            run = new_run()
+            assert run.ingest("nfl") and run.team_record("nfl", "Cowboys")["wins"] == 4
+            assert server.stats["requests"] == 2
+
+            # Once that game is under way, the index is rebuilt every LIVE_TTL
+            clock.now = utc(17, 1)
+            assert run.ingest("nfl")
+            assert server.stats["requests"] == 4
+            clock.now += LIVE_TTL - 1
+            assert run.ingest("nfl")
+            assert server.stats["requests"] == 4
+            clock.now += 2
+            assert new_run().ingest("nfl")
+            assert server.stats["requests"] == 6
+        store.close()
+        archive.close()
+
+
+def test_league_mode_serves_teams_and_opponents_from_the_index():
+    today = date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        record_league(archive, today)
+        with FakeUpstreamServer(archive) as server:
+            fetcher = SportsDataFetcher(session=UpstreamSession(base_url=server.url, retry=NO_RETRY),
+                                        ingest_mode="league")
+            data = fetcher.fetch_source("cowboys")
+            assert (data["wins"], data["losses"], data["recent_games"]) == (4, 2, ["W", "L"])
+            assert fetcher.get_opponent_record("Philadelphia Eagles", "NFL")["wins"] == 5
+            # Two league-wide calls in all, not one per team and opponent
+            assert server.stats["requests"] == 2
+        archive.close()
+
+
+class BlockingSession:
+    """Serves the NFL payloads for every league; NFL calls wait until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def get(self, url, timeout=None):
+        self.calls.append(url)
+        if "football/nfl" in url:
+            assert self.release.wait(5)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(standings_payload() if "standings" in url else scoreboard_payload()).encode()
+        return response
+
+
+def test_a_slow_league_does_not_block_the_others():
+    session = BlockingSession()
+    index = LeagueIndex(session, today=lambda: date(2026, 10, 19), clock=FakeClock(utc(12)))
+    slow = threading.Thread(target=index.ingest, args=("nfl",))
+    slow.start()
+    try:
+        wait_for(lambda: session.calls)
+        # NFL's standings call is hanging; NBA is ingested and readable meanwhile
+        assert index.ingest("nba")
+        assert index.team_record("nba", "Cowboys")["wins"] == 4
+        assert index.team_record("nfl", "Cowboys") is None
+    finally:
+        session.release.set()
+        slow.join(5)
+    assert index.team_record("nfl", "Cowboys")["wins"] == 4
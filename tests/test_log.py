@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for queue-backed logging and warning rate limits
+"""
+
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import log
+
+
+def make_record(msg, *args, level=logging.WARNING):
+    return logging.LogRecord("dashboard.test", level, __file__, 1, msg, args, None)
+
+
+def test_repeated_warnings_are_rate_limited_by_message():
+    limiter = log.RateLimitFilter(interval=60)
+    assert limiter.filter(make_record("Error fetching %s: %s", "cowboys", "timeout"))
+    assert not limiter.filter(make_record("Error fetching %s: %s", "cowboys", "timeout"))
+    # Same call site, another source or error: not a repeat
+    assert limiter.filter(make_record("Error fetching %s: %s", "rangers", "timeout"))
+    assert limiter.filter(make_record("Error fetching %s: %s", "cowboys", "503"))
+    assert limiter.filter(make_record("Other warning"))
+    # Info and debug records are never limited
+    assert limiter.filter(make_record("Fetching %s", "cowboys", level=logging.INFO))
+    assert limiter.filter(make_record("Fetching %s", "cowboys", level=logging.INFO))
+
+
+def test_next_warning_after_interval_reports_suppressed_count():
+    limiter = log.RateLimitFilter(interval=60)
+    limiter.filter(make_record("Upstream down"))
+    limiter.filter(make_record("Upstream down"))
+    limiter.filter(make_record("Upstream down"))
+    limiter._seen[("dashboard.test", logging.WARNING, "Upstream down")][0] -= 61
+    record = make_record("Upstream down")
+    assert limiter.filter(record)
+    assert record.getMessage() == "Upstream down (2 identical messages suppressed)"
+
+
+def test_module_loggers_share_the_queue_handler():
+    logger = log.get_logger("src.sports_api")
+    assert logger.name == "dashboard.sports_api"
+    root = logging.getLogger(log.ROOT_LOGGER)
+    assert not root.propagate
+    assert any(isinstance(h, log._DroppingQueueHandler) for h in root.handlers)
+
+
+def test_dropped_records_are_counted_and_reported():
+    import io
+    import queue
+    from src.metrics import LOG_RECORDS_DROPPED
+
+    handler = log._DroppingQueueHandler(queue.Queue(1))
+    out = io.StringIO()
+    listener = log._ReportingQueueListener(handler.queue, logging.StreamHandler(out))
+    before = LOG_RECORDS_DROPPED.value()
+    handler.emit(make_record("first"))
+    handler.emit(make_record("second"))
+    assert LOG_RECORDS_DROPPED.value() == before + 1
+
+    listener.handle(handler.queue.get_nowait())
+    assert out.getvalue().splitlines() == ["first", "1 log records dropped (log queue full)"]
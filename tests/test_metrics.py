@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics registry
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import metrics
+from src.fake_upstream import FakeUpstreamServer
+from src.upstream import PayloadArchive, UpstreamSession
+from tests.test_upstream import NFL_TEAM_URL, nfl_team_payload
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    latency = registry.histogram("test_seconds", "Test latency", ("route",), buckets=(0.1, 1.0))
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+    text = registry.render()
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'test_seconds_count{route="/a"} 3' in text
+
+
+def test_endpoint_pattern_collapses_ids():
+    host, endpoint = metrics.endpoint_pattern(
+        "https://site.api.espn.com/apis/site/v2/sports/football/nfl/teams/6/schedule?season=2025")
+    assert host == "site.api.espn.com"
+    assert endpoint == "/apis/site/v2/sports/football/nfl/teams/{id}/schedule"
+
+
+def test_upstream_calls_are_recorded_under_the_real_host():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        archive.start_run("run-a", 1)
+        archive.record("run-a", NFL_TEAM_URL, 200, "application/json", nfl_team_payload(7, 2))
+        host, endpoint = metrics.endpoint_pattern(NFL_TEAM_URL)
+        before = metrics.UPSTREAM_DURATION.count(host=host, endpoint=endpoint, status=200)
+        with FakeUpstreamServer(archive) as server:
+            assert UpstreamSession(base_url=server.url).get(NFL_TEAM_URL).status_code == 200
+        assert metrics.UPSTREAM_DURATION.count(host=host, endpoint=endpoint, status=200) == before + 1
+        assert metrics.UPSTREAM_BYTES.value(host=host, endpoint=endpoint) > 0
+        archive.close()
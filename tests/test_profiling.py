@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for opt-in profile captures
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.profiling import TOKEN_HEADER, ProfileStore
+
+
+def test_nothing_is_profiled_unless_asked():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles = ProfileStore(tmp, targets="", token="")
+        assert profiles.wants("requests", {TOKEN_HEADER: "anything"}) is None
+        with profiles.maybe("fetch", "fetch_all_data") as capture:
+            assert capture is None
+        assert profiles.list() == []
+
+
+def test_token_header_profiles_one_request():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles = ProfileStore(tmp, targets="", token="s3cret", keep=2)
+        assert profiles.wants("requests", {TOKEN_HEADER: "wrong"}) is None
+        assert profiles.wants("requests", {TOKEN_HEADER: "s3cret"}) == "cprofile"
+
+        ids = []
+        for i in range(3):
+            capture = profiles.start(f"GET /api/teams {i}")
+            sum(range(1000))
+            ids.append(capture.stop()["id"])
+
+        listed = profiles.list()
+        assert len(listed) == 2
+        assert ids[0] not in {meta["id"] for meta in listed}
+        summary = open(profiles.path(listed[0]["id"])).read()
+        assert "function calls" in summary
+        assert profiles.path(listed[0]["id"], "prof") is not None
+        assert profiles.path("../../etc/passwd") is None
+
+
+def test_env_targets_profile_every_fetch():
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles = ProfileStore(tmp, targets="fetch", token="")
+        assert profiles.wants("requests") is None
+        with profiles.maybe("fetch", "fetch_all_data") as capture:
+            assert capture is not None
+        assert [meta["name"] for meta in profiles.list()] == ["fetch_all_data"]
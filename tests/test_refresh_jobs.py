@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for background refresh jobs shared between worker processes
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.checkpoint_store import CheckpointStore
+from src.refresh_jobs import ACTIVE_KEY, JOB_PREFIX, RefreshBusy, RefreshJobManager, RefreshLock
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class BlockingRun:
+    """A refresh that reports one source, then waits to be let go"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self, job):
+        self.calls += 1
+        job.update_source("cowboys", "done")
+        assert self.release.wait(5)
+
+
+def test_workers_share_poll_and_join_one_run():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "refresh_jobs.sqlite3")
+        run_a, run_b = BlockingRun(), BlockingRun()
+        # Two workers: separate managers (and flock file handles) on the same store
+        worker_a = RefreshJobManager(run_a, store_path=path)
+        worker_b = RefreshJobManager(run_b, store_path=path)
+
+        job, created = worker_a.submit()
+        assert created
+        wait_for(lambda: worker_b.get(job.id).sources.get("cowboys") == "done")
+        assert worker_b.get(job.id).status == "running"
+
+        joined, created = worker_b.submit()
+        assert (joined.id, created) == (job.id, False)
+
+        run_a.release.set()
+        wait_for(lambda: worker_b.get(job.id).finished)
+        assert worker_b.get(job.id).status == "succeeded"
+        assert (run_a.calls, run_b.calls) == (1, 0)
+
+        # The lock is free again: the next click starts a new run
+        run_b.release.set()
+        second, created = worker_b.submit()
+        assert created and second.id != job.id
+        wait_for(lambda: worker_a.get(second.id).finished)
+        assert worker_a.get("unknown") is None
+
+
+def test_busy_without_a_job_to_join():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "refresh_jobs.sqlite3")
+        run = BlockingRun()
+        run.release.set()
+        manager = RefreshJobManager(run, store_path=path, join_timeout=0.1)
+
+        # e.g. scripts/fetch_all_data.py holding the lock
+        script_lock = RefreshLock(path + ".lock")
+        assert script_lock.acquire()
+        try:
+            manager.submit()
+            assert False, "expected RefreshBusy"
+        except RefreshBusy:
+            pass
+        finally:
+            script_lock.release()
+        job, created = manager.submit()
+        assert created
+        wait_for(lambda: job.finished)
+
+
+def test_run_left_behind_by_a_dead_worker_is_failed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "refresh_jobs.sqlite3")
+        store = CheckpointStore(path)
+        store.set(JOB_PREFIX + "dead", {"job_id": "dead", "status": "running",
+                                        "created_at": "2026-10-19T12:00:00", "sources": {}})
+        store.set(ACTIVE_KEY, "dead")
+
+        run = BlockingRun()
+        run.release.set()
+        manager = RefreshJobManager(run, store_path=path)
+        job, created = manager.submit()
+        assert created
+        wait_for(lambda: job.finished)
+        assert store.get(ACTIVE_KEY) == job.id
+        dead = manager.get("dead")
+        assert (dead.status, dead.error) == ("failed", "Interrupted")
+        store.close()
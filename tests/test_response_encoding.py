@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for sparse fieldsets, rounding and compression of API responses
+"""
+
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.response_encoding import (EncodingError, choose_content_encoding, content_etag, encode_response,
+                                   parse_fields, parse_precision)
+
+
+BODY = json.dumps({
+    "success": True,
+    "teams": [
+        {"name": f"Team {i}", "sport": "NFL", "depression_points": 1.23456, "breakdown": {"record": 0.5}}
+        for i in range(20)
+    ],
+}).encode("utf-8")
+
+
+def test_fields_and_precision_with_gzip():
+    encoded = encode_response(BODY, accept_encoding="gzip, deflate",
+                              fields=parse_fields("depression_points"), precision=parse_precision("1"))
+    assert encoded.content_encoding == "gzip"
+    assert encoded.headers["Vary"] == "Accept, Accept-Encoding"
+    team = json.loads(gzip.decompress(encoded.body))["teams"][0]
+    assert team == {"name": "Team 0", "sport": "NFL", "depression_points": 1.2}
+
+
+def test_default_request_reuses_precomputed_bytes():
+    encoded = encode_response(BODY)
+    assert encoded.body is BODY
+    assert encoded.content_encoding is None
+    try:
+        parse_precision("12")
+        assert False, "expected EncodingError"
+    except EncodingError:
+        pass
+
+
+def test_identical_bodies_share_a_cache_entry_and_etag():
+    encoded = encode_response(BODY)
+    assert encode_response(bytes(BODY)) is encoded
+    assert encoded.etag == content_etag(BODY)
+    other = BODY.replace(b"Team 0", b"Team X")
+    assert encode_response(other).body == other
+
+
+def test_explicit_q0_overrides_wildcard():
+    assert choose_content_encoding("gzip;q=0, *") is None
+    assert choose_content_encoding("*") == "gzip"
+    assert choose_content_encoding("identity") is None
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for upstream retries and per-host pacing
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fake_upstream import FakeUpstreamServer
+from src.retry import HostRateLimiter, RetryPolicy
+from src.upstream import PayloadArchive, UpstreamSession
+from tests.test_upstream import NFL_TEAM_URL, nfl_team_payload
+
+
+def make_response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return response
+
+
+def test_retry_policy_backoff_and_retry_after():
+    policy = RetryPolicy(max_attempts=3, base_delay=1.0, rng=random.Random(1))
+    assert 0 <= policy.delay("GET", 0, make_response(503)) <= 1.0
+    assert 0 <= policy.delay("GET", 1, error=requests.exceptions.ConnectTimeout()) <= 2.0
+    assert policy.delay("GET", 0, make_response(429, {"Retry-After": "4"})) == 4.0
+    # Out of attempts, not retryable, not idempotent, or told to wait too long
+    assert policy.delay("GET", 2, make_response(503)) is None
+    assert policy.delay("GET", 0, make_response(404)) is None
+    assert policy.delay("POST", 0, make_response(503)) is None
+    assert policy.delay("GET", 0, make_response(429, {"Retry-After": "3600"})) is None
+
+
+def test_rate_limiter_paces_each_host_separately():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    limiter = HostRateLimiter(rate=2, burst=2, clock=lambda: now[0], sleep=sleep)
+    assert limiter.acquire("site.api.espn.com") == 0
+    assert limiter.acquire("site.api.espn.com") == 0
+    assert limiter.acquire("site.api.espn.com") == 0.5
+    assert limiter.acquire("api.openf1.org") == 0
+    limiter.pause("api.openf1.org", 3)
+    assert limiter.acquire("api.openf1.org") == 3
+    assert slept == [0.5, 3]
+    # A wait past max_wait (e.g. the caller's deadline) is refused without sleeping
+    limiter.pause("api.openf1.org", 10)
+    assert limiter.acquire("api.openf1.org", max_wait=2) is None
+    assert limiter.acquire("site.api.espn.com", max_wait=2) == 0
+    assert slept == [0.5, 3]
+
+
+def test_session_retries_transient_errors_and_honors_retry_after():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        archive.start_run("run-a", 1)
+        archive.record("run-a", NFL_TEAM_URL, 200, "application/json", nfl_team_payload(7, 2))
+        with FakeUpstreamServer(archive, requests_per_second=1) as server:
+            session = UpstreamSession(base_url=server.url, retry=RetryPolicy(base_delay=0.01))
+            assert session.get(NFL_TEAM_URL).status_code == 200
+            # The bucket is empty: 429 with Retry-After: 1, then a successful retry
+            assert session.get(NFL_TEAM_URL).status_code == 200
+            assert server.stats["throttled"] == 1
+
+        with FakeUpstreamServer(archive, error_rate=0.5, seed=3) as server:
+            session = UpstreamSession(base_url=server.url, retry=RetryPolicy(max_attempts=10, base_delay=0.001))
+            assert session.get(NFL_TEAM_URL).status_code == 200
+            assert server.stats["errors"] >= 1
+        archive.close()
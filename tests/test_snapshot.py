@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for calculator snapshots: atomic rebuilds and delta sync versions
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.event_log import EventLog, source_event
+from src.snapshot import SnapshotStore, entity_key
+
+
+def make_config(teams):
+    return {
+        "teams": [
+            {
+                "name": name,
+                "sport": sport,
+                "record": {"wins": wins, "losses": losses, "ties": 0},
+                "recent_streak": ["W"] * wins,
+            }
+            for name, sport, wins, losses in teams
+        ],
+        "f1_driver": {},
+        "fantasy_team": {"name": "Test Fantasy", "record": {"wins": 1, "losses": 1}},
+    }
+
+
+def write_config(path, config):
+    with open(path, "w") as f:
+        json.dump(config, f)
+
+
+def test_delta_sync_versions_and_tombstones():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "teams_config.json")
+        write_config(path, make_config([("Team A", "NFL", 1, 0), ("Team B", "NBA", 2, 2)]))
+        store = SnapshotStore(path, use_espn_api=False)
+
+        first = store.get()
+        assert first.teams["version"] == first.version
+        assert first.teams_delta(first.version)["teams"] == []
+
+        # Change one team, remove the other
+        write_config(path, make_config([("Team A", "NFL", 2, 0)]))
+        second = store.rebuild()
+        assert second.version > first.version
+
+        delta = second.teams_delta(first.version)
+        assert not delta["full"]
+        changed = {entity_key(t) for t in delta["teams"]}
+        assert changed == {"NFL:Team A"}
+        assert [r["key"] for r in delta["removed"]] == ["NBA:Team B"]
+
+        # Unchanged entities keep their original version
+        assert second.entity_versions["Fantasy:Test Fantasy"] == first.version
+
+        # Clients older than the store's history get a full resync
+        assert second.teams_delta(first.version - 1)["full"]
+
+        # Serialized deltas are cached and match the dict form
+        assert json.loads(second.teams_delta_json(first.version)) == delta
+
+
+def test_readers_keep_old_snapshot_during_rebuild():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "teams_config.json")
+        write_config(path, make_config([("Team A", "NFL", 1, 0)]))
+        store = SnapshotStore(path, use_espn_api=False)
+        old = store.get()
+
+        write_config(path, make_config([("Team A", "NFL", 0, 3)]))
+        new = store.rebuild()
+
+        # The old snapshot is untouched; the store now serves the new one
+        assert json.loads(old.teams_json)["teams"][0]["wins"] == 1
+        assert store.current is new
+        assert json.loads(new.teams_json)["teams"][0]["wins"] == 0
+
+
+def test_concurrent_readers_only_see_complete_snapshots():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "teams_config.json")
+        write_config(path, make_config([("Team A", "NFL", 0, 0)]))
+        store = SnapshotStore(path, use_espn_api=False)
+        store.get()
+        problems = []
+        done = threading.Event()
+
+        def read():
+            # What a gthread worker's request threads do: load current once, use only that
+            seen = 0
+            while not done.is_set():
+                snapshot = store.current
+                body = json.loads(snapshot.teams_json)
+                if (body["version"] != snapshot.version or len(body["teams"]) != len(snapshot.entities)
+                        or snapshot.version < seen):
+                    problems.append(snapshot.version)
+                seen = snapshot.version
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        try:
+            for wins in range(1, 15):
+                write_config(path, make_config([("Team A", "NFL", wins, 0)] + [("Team B", "NBA", wins, 1)] * (wins % 2)))
+                store.rebuild()
+        finally:
+            done.set()
+            for reader in readers:
+                reader.join()
+        assert problems == []
+        assert json.loads(store.current.teams_json)["teams"][0]["wins"] == 14
+
+
+def test_versions_agree_between_workers_and_restarts():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "teams_config.json")
+        write_config(path, make_config([("Dallas Cowboys", "NFL", 1, 0), ("Team B", "NBA", 2, 2)]))
+        log = EventLog(path)
+        # Two workers serving the same files; A rebuilds on every event, B only on the last
+        worker_a = SnapshotStore(path, use_espn_api=False)
+        worker_b = SnapshotStore(path, use_espn_api=False)
+        first = worker_a.get()
+        assert worker_b.get().version == first.version
+
+        log.append(source_event("cowboys", {"wins": 2, "losses": 0}))
+        seen_by_client = worker_a.rebuild().version
+        assert seen_by_client > first.version
+        log.append(source_event("cowboys", {"wins": 3, "losses": 0}))
+        latest = worker_a.rebuild()
+        assert worker_b.rebuild().version == latest.version
+
+        # A client that synced with A mid-way still gets the change from B
+        delta = worker_b.current.teams_delta(seen_by_client)
+        assert not delta["full"] and [t["name"] for t in delta["teams"]] == ["Dallas Cowboys"]
+
+        # A restarted worker lands on the same version; older clients resync in full
+        restarted = SnapshotStore(path, use_espn_api=False).get()
+        assert restarted.version == latest.version
+        assert restarted.teams_delta(latest.version)["teams"] == []
+        assert restarted.teams_delta(seen_by_client)["full"]
+
+        # Rebuilding with nothing changed on disk keeps the version
+        assert worker_a.rebuild().version == latest.version
+        log.close()
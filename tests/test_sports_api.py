@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for merging fetched source data into the config
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sports_api import SportsDataFetcher
+
+
+def make_config():
+    return {"teams": [
+        {"name": "Dallas Cowboys", "sport": "NFL", "record": {}, "recent_streak": ["W"]},
+        {"name": "Dallas Mavericks", "sport": "NBA", "record": {"wins": 1, "losses": 1}, "recent_streak": ["L"]},
+    ]}
+
+
+def test_cowboys_get_a_full_record_and_take_an_empty_streak():
+    config = make_config()
+    SportsDataFetcher.apply_source(config, "cowboys", {"wins": 3, "losses": 1, "recent_games": []})
+    cowboys = config["teams"][0]
+    assert cowboys["record"] == {"wins": 3, "losses": 1, "ties": 0}
+    assert cowboys["recent_streak"] == []
+
+
+def test_other_teams_keep_their_streak_when_no_games_come_back():
+    config = make_config()
+    SportsDataFetcher.apply_source(config, "mavericks", {"wins": 2, "recent_games": []})
+    mavericks = config["teams"][1]
+    assert mavericks["record"] == {"wins": 2, "losses": 1}
+    assert mavericks["recent_streak"] == ["L"]
+    # A failed fetch changes nothing
+    SportsDataFetcher.apply_source(config, "mavericks", None)
+    assert mavericks["record"]["wins"] == 2
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for build-time static API artifacts
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import snapshot as snapshots
+from src.event_log import EventLog, source_event
+from src.game_store import GameStore
+from src.static_artifacts import ArtifactReader, build_artifacts
+from tests.test_snapshot import make_config, write_config
+
+
+def offline(monkeypatch):
+    def no_fetcher():
+        raise RuntimeError("offline")
+    monkeypatch.setattr(snapshots, "get_shared_fetcher", no_fetcher)
+
+
+def test_artifacts_are_served_only_while_the_data_matches(monkeypatch):
+    offline(monkeypatch)
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "teams_config.json")
+        out_dir = os.path.join(tmp, "static_api")
+        write_config(config_path, make_config([("Dallas Cowboys", "NFL", 1, 0)]))
+        manifest = build_artifacts(config_path, out_dir, use_espn_api=False)
+
+        # Live sections (relative dates, upstream data) are never pre-rendered
+        assert sorted(manifest["files"]) == ["depression", "teams"]
+        assert manifest["data"]["event_log_seq"] == 0 and manifest["data"]["game_store_sha256"] is None
+        reader = ArtifactReader(out_dir, config_path)
+        body, etag = reader.get("teams")
+        assert json.loads(body)["teams"][0]["name"] == "Dallas Cowboys"
+        assert reader.get("recent_games") is None
+
+        # New ingest events make the artifacts stale, though the config is unchanged
+        log = EventLog(config_path)
+        log.append(source_event("cowboys", {"wins": 2, "losses": 0}))
+        assert reader.get("teams") is None
+        build_artifacts(config_path, out_dir, use_espn_api=False)
+        assert reader.get("teams") is not None
+
+        # ... and so does new game history
+        store = GameStore(os.path.join(tmp, "games.sqlite3"))
+        store.upsert_games("Dallas Cowboys", "NFL", [{"event_id": "1", "date": "2026-10-12T17:00Z", "result": "W"}])
+        assert reader.get("teams") is None
+        store.close()
+        log.close()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for trace spans
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import tracing
+from src.dashboard_service import DashboardService
+from src.snapshot import SnapshotStore
+from tests.test_snapshot import make_config, write_config
+
+
+def collect_spans(fn):
+    stream = io.StringIO()
+    tracing.configure(stream)
+    try:
+        fn()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+    finally:
+        tracing.configure(None)
+
+
+def test_spans_nest_under_the_current_span():
+    def run():
+        with tracing.span("root", route="x"):
+            with tracing.span("child") as child:
+                child.set_attribute("bytes", 3)
+
+    child, root = collect_spans(run)
+    assert root["name"] == "root" and root["parentSpanId"] is None
+    assert child["parentSpanId"] == root["spanId"]
+    assert child["traceId"] == root["traceId"]
+    assert child["attributes"] == {"bytes": 3}
+    assert root["endTimeUnixNano"] >= child["endTimeUnixNano"]
+
+
+def test_request_breaks_down_into_scoring_and_serialization():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "teams_config.json")
+        write_config(path, make_config([("Team A", "NFL", 3, 1)]))
+        store = SnapshotStore(path, use_espn_api=False)
+        service = DashboardService(store.get)
+        spans = collect_spans(lambda: service.handle("depression", {}, {}))
+
+    by_id = {s["spanId"]: s for s in spans}
+    root = next(s for s in spans if s["parentSpanId"] is None)
+    assert root["name"] == "GET /api/depression"
+    assert root["attributes"]["status"] == 200
+    assert all(s["traceId"] == root["traceId"] for s in spans)
+
+    def ancestors(s):
+        names = []
+        while s["parentSpanId"]:
+            s = by_id[s["parentSpanId"]]
+            names.append(s["name"])
+        return names
+
+    score = next(s for s in spans if s["name"] == "score")
+    assert {"calculator.score", "snapshot.build", "GET /api/depression"} <= set(ancestors(score))
+    assert any(s["name"] == "encode_response" for s in spans)
+
+
+def test_tracing_off_is_a_noop():
+    assert not tracing.enabled()
+    with tracing.span("ignored") as current:
+        current.set_attribute("anything", 1)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the raw payload archive and replaying it through the parsers
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sports_api import PARSER_VERSION, SportsDataFetcher
+from src.upstream import PayloadArchive, ReplaySession
+
+NFL_TEAM_URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/teams/6"
+
+
+def nfl_team_payload(wins, losses):
+    stats = [{"name": "wins", "value": wins}, {"name": "losses", "value": losses}, {"name": "ties", "value": 0}]
+    return json.dumps({"team": {"record": {"items": [{"type": "total", "stats": stats}]}}}).encode()
+
+
+def test_archive_dedupes_and_replays_offline():
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        for run_id in ("run-a", "run-b"):
+            archive.start_run(run_id, PARSER_VERSION)
+        # The same body captured twice is stored once
+        archive.record("run-a", NFL_TEAM_URL, 200, "application/json", nfl_team_payload(3, 5))
+        archive.record("run-b", NFL_TEAM_URL, 200, "application/json", nfl_team_payload(3, 5))
+        objects = [name for _, _, names in os.walk(os.path.join(tmp, "objects")) for name in names]
+        assert len(objects) == 1
+        assert [r["responses"] for r in archive.runs()] == [1, 1]
+
+        fetcher = SportsDataFetcher(session=ReplaySession(archive, "run-a"))
+        assert fetcher.nfl.get_team_record("Dallas Cowboys")["wins"] == 3
+        # Anything not captured in the run is a 404, never a network call
+        assert fetcher.nba.get_team_record("Dallas Mavericks") is None
+        archive.close()
+
+
+def test_replay_never_opens_a_socket(monkeypatch):
+    import socket
+    import pytest
+    from src.circuit_breaker import UpstreamUnavailable
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("replay tried to use the network")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = PayloadArchive(tmp)
+        archive.start_run("run-a", PARSER_VERSION)
+        archive.record("run-a", NFL_TEAM_URL, 200, "application/json", nfl_team_payload(3, 5))
+        fetcher = SportsDataFetcher(session=ReplaySession(archive, "run-a"))
+
+        monkeypatch.setattr(socket.socket, "connect", no_network)
+        monkeypatch.setattr(socket, "create_connection", no_network)
+        data = fetcher.fetch_all_data()
+        assert data["cowboys"]["wins"] == 3
+        # Scraping-library fallbacks do their own HTTP, so they are refused offline
+        with pytest.raises(UpstreamUnavailable):
+            fetcher.nba._fallback_call("stats.nba.com", no_network)
+        archive.close()
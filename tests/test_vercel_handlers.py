@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for the Vercel functions' warm-container state
+"""
+
+import os
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "api"))
+
+import _utils
+from src.event_log import EventLog, source_event
+from tests.test_snapshot import make_config, write_config
+
+
+def warm_container(monkeypatch, config_path):
+    """A container that already resolved config_path and has nothing else cached"""
+    monkeypatch.setattr(_utils, "_config_path", config_path)
+    monkeypatch.setattr(_utils, "_store", None)
+    monkeypatch.setattr(_utils, "_watcher", None)
+    monkeypatch.setattr(_utils, "_service", None)
+
+
+def test_warm_invocations_reuse_the_snapshot_until_data_changes(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "teams_config.json")
+        write_config(path, make_config([("Dallas Cowboys", "NFL", 1, 0)]))
+        warm_container(monkeypatch, path)
+
+        first = _utils.get_snapshot()
+        assert _utils.get_snapshot() is first
+        assert _utils.get_service() is _utils.get_service()
+
+        # A config rewrite and an ingest event each swap in a new snapshot, once
+        write_config(path, make_config([("Dallas Cowboys", "NFL", 2, 0)]))
+        second = _utils.get_snapshot()
+        assert second is not first and second.teams["teams"][0]["wins"] == 2
+        assert _utils.get_snapshot() is second
+
+        log = EventLog(path)
+        log.append(source_event("cowboys", {"wins": 3, "losses": 0}))
+        third = _utils.get_snapshot()
+        assert third is not second and third.teams["teams"][0]["wins"] == 3
+        assert third.version > second.version > first.version
+        log.close()